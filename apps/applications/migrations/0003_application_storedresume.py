@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_storedresume'),
+        ('applications', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='storedResume',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='applications', to='core.storedresume'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0003_application_storedresume'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['applicant', '-appliedAt', '-id'], name='apps_applicant_applied_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['job', 'status', '-appliedAt', '-id'], name='apps_job_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['job', '-appliedAt', '-id'], name='apps_job_applied_idx'),
+        ),
+    ]
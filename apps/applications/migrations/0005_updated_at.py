@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:59
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Existing rows were last changed at some unknown point; appliedAt is the best lower bound
+    apps.get_model('applications', 'Application').objects.update(updatedAt=F('appliedAt'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0004_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='updatedAt',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
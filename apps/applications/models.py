@@ -11,6 +11,20 @@ class Application(models.Model):
         REJECTED = 'Rejected', 'Rejected'
         HIRED = 'Hired', 'Hired'
 
+    # Status changes only go forward and Rejected and Hired are final: the statuses an
+    # application can be moved to each status from (re-setting the current one is a no-op)
+    PREVIOUS_STATUSES = {
+        ApplicationStatus.APPLIED: {ApplicationStatus.APPLIED},
+        ApplicationStatus.REVIEWED: {ApplicationStatus.APPLIED, ApplicationStatus.REVIEWED},
+        ApplicationStatus.INTERVIEW: {ApplicationStatus.APPLIED, ApplicationStatus.REVIEWED, ApplicationStatus.INTERVIEW},
+        ApplicationStatus.REJECTED: {
+            ApplicationStatus.APPLIED, ApplicationStatus.REVIEWED, ApplicationStatus.INTERVIEW, ApplicationStatus.REJECTED,
+        },
+        ApplicationStatus.HIRED: {
+            ApplicationStatus.APPLIED, ApplicationStatus.REVIEWED, ApplicationStatus.INTERVIEW, ApplicationStatus.HIRED,
+        },
+    }
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     applicant = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -20,12 +34,21 @@ class Application(models.Model):
     )
     job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='applications')
     resumeLink = models.URLField()
+    storedResume = models.ForeignKey('core.StoredResume', on_delete=models.SET_NULL, related_name='applications', blank=True, null=True)
     coverLetter = models.TextField(max_length=500, blank=True, null=True)
     status = models.CharField(max_length=10, choices=ApplicationStatus.choices, default=ApplicationStatus.APPLIED)
     appliedAt = models.DateTimeField(auto_now_add=True)
+    updatedAt = models.DateTimeField(auto_now=True) # Bulk .update()s of serialized fields must set it too (ETags)
 
     class Meta:
         unique_together = ('applicant', 'job') # An applicant can apply to a job only once
+        indexes = [
+            # my-applications: an applicant's applications, newest first
+            models.Index(fields=['applicant', '-appliedAt', '-id'], name='apps_applicant_applied_idx'),
+            # applications_for_job, newest first, with and without a status filter
+            models.Index(fields=['job', 'status', '-appliedAt', '-id'], name='apps_job_status_idx'),
+            models.Index(fields=['job', '-appliedAt', '-id'], name='apps_job_applied_idx'),
+        ]
 
     def __str__(self):
         return f"{self.applicant.email} -> {self.job.title}"
\ No newline at end of file
@@ -1,5 +1,7 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import Application
+from apps.core.serializers import ValuesSerializer, datetime_representation, uuid_representation
 from apps.core.utils import upload_to_cloudinary
 
 class ApplicationSerializer(serializers.ModelSerializer):
@@ -16,6 +18,20 @@ class ApplicationSerializer(serializers.ModelSerializer):
             'applicantName', 'jobTitle', 'companyName', 'jobStatus'
         )
 
+class ApplicationListSerializer(ValuesSerializer):
+    """Fast list counterpart of ApplicationSerializer, built from .values() rows (same output)."""
+    fields = (
+        ('id', 'id', uuid_representation),
+        ('status', 'status', str),
+        ('appliedAt', 'appliedAt', datetime_representation),
+        ('resumeLink', 'resumeLink', str),
+        ('coverLetter', 'coverLetter', str),
+        ('applicantName', 'applicant__name', str),
+        ('jobTitle', 'job__title', str),
+        ('companyName', 'job__createdBy__name', str),
+        ('jobStatus', 'job__status', str),
+    )
+
 class ApplicationCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating an Application (applying for a job)."""
     resume = serializers.FileField(write_only=True, required=True)
@@ -27,8 +43,33 @@ class ApplicationCreateSerializer(serializers.ModelSerializer):
             'coverLetter': {'max_length': 2000}
         }
 
+    def create(self, validated_data):
+        # The file itself is stored by the view; only its link is saved on the model
+        validated_data.pop('resume', None)
+        return super().create(validated_data)
+
+def status_change_error(old_status, new_status):
+    """Why an application can't move from `old_status` to `new_status` (see Application.PREVIOUS_STATUSES), or None."""
+    if old_status in Application.PREVIOUS_STATUSES[new_status]:
+        return None
+    if old_status in (Application.ApplicationStatus.REJECTED, Application.ApplicationStatus.HIRED):
+        return f"A '{old_status}' application status cannot be changed."
+    return f"An application can't move back from '{old_status}' to '{new_status}'."
+
 class ApplicationUpdateStatusSerializer(serializers.ModelSerializer):
     """Serializer specifically for a company to update an application's status."""
     class Meta:
         model = Application
-        fields = ('status',)
\ No newline at end of file
+        fields = ('status',)
+
+    def validate_status(self, value):
+        """Forward-only: Applied -> Reviewed -> Interview -> Rejected or Hired, which are final."""
+        error = self.instance and status_change_error(self.instance.status, value)
+        if error:
+            raise serializers.ValidationError(error)
+        return value
+
+class ApplicationBulkUpdateStatusSerializer(serializers.Serializer):
+    """Input for a company moving many applications to one status."""
+    ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False, max_length=settings.BULK_STATUS_UPDATE_MAX_IDS)
+    status = serializers.ChoiceField(choices=Application.ApplicationStatus.choices)
\ No newline at end of file
@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.users.models import User
+
+
+@receiver(post_save, sender=User)
+def touch_applicant_applications(sender, instance, created, update_fields=None, **kwargs):
+    """Applications embed the applicant's name, so a rename changes them (and the my-applications ETag) too."""
+    if created or instance.role != User.Role.APPLICANT or (update_fields and 'name' not in update_fields):
+        return
+    instance.applications.update(updatedAt=timezone.now())
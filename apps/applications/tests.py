@@ -1,3 +1,171 @@
-from django.test import TestCase
+import uuid
 
-# Create your tests here.
+from apps.core.models import OutboundEmail
+from apps.core.testing import BaseAPITestCase, QueryPlanTestMixin
+from apps.jobs.counters import COUNTER_FIELDS, actual_counters, record_new_applications, record_status_change
+from apps.jobs.models import Job
+from .models import Application
+
+
+class ApplicationQueryPlanTests(QueryPlanTestMixin, BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        company = cls.create_company()
+        cls.applicant = cls.create_applicant()
+        for i in range(10):
+            job = Job.objects.create(title=f'Job {i}', description='Description', createdBy=company, status=Job.JobStatus.OPEN)
+            Application.objects.create(applicant=cls.applicant, job=job, resumeLink='https://example.com/cv.pdf')
+
+    def test_my_applications_uses_applicant_index(self):
+        self.authenticate(self.applicant)
+        self.assertEndpointUsesIndex('/api/applications/my-applications/', 'applications_application', ['apps_applicant_applied_idx'])
+
+    def test_my_applications_cursor_mode_uses_applicant_index(self):
+        self.authenticate(self.applicant)
+        self.assertEndpointUsesIndex(
+            '/api/applications/my-applications/', 'applications_application', ['apps_applicant_applied_idx'], {'cursor': ''}
+        )
+
+
+class MyApplicationsConditionalGetTests(BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = cls.create_company()
+        cls.applicant = cls.create_applicant()
+        cls.jobs = [
+            Job.objects.create(title=f'Job {i}', description='Description', createdBy=cls.company, status=Job.JobStatus.OPEN)
+            for i in range(3)
+        ]
+        cls.applications = [
+            Application.objects.create(applicant=cls.applicant, job=job, resumeLink='https://example.com/cv.pdf')
+            for job in cls.jobs[:2]
+        ]
+
+    def assertChanges(self, etag):
+        response = self.client.get('/api/applications/my-applications/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        return response['ETag']
+
+    def test_not_modified_until_an_application_or_its_job_changes(self):
+        self.authenticate(self.applicant)
+        etag = self.client.get('/api/applications/my-applications/')['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/applications/my-applications/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.applications[0].status = Application.ApplicationStatus.REVIEWED
+        self.applications[0].save()
+        etag = self.assertChanges(etag)
+
+        self.jobs[1].status = Job.JobStatus.CLOSED
+        self.jobs[1].save()
+        etag = self.assertChanges(etag)
+
+        Application.objects.create(applicant=self.applicant, job=self.jobs[2], resumeLink='https://example.com/cv.pdf')
+        etag = self.assertChanges(etag)
+
+        self.applications[1].delete()
+        etag = self.assertChanges(etag)
+
+    def test_renames_change_the_etag(self):
+        self.authenticate(self.applicant)
+        etag = self.client.get('/api/applications/my-applications/')['ETag']
+
+        self.applicant.name = 'Jane Smith'
+        self.applicant.save()
+        response = self.client.get('/api/applications/my-applications/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({row['applicantName'] for row in response.json()['object']}, {'Jane Smith'})
+        etag = response['ETag']
+
+        self.company.name = 'Acme Holdings'
+        self.company.save(update_fields=['name'])
+        response = self.client.get('/api/applications/my-applications/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({row['companyName'] for row in response.json()['object']}, {'Acme Holdings'})
+
+        self.applicant.is_verified = False
+        self.applicant.save(update_fields=['is_verified'])
+        self.assertEqual(self.client.get('/api/applications/my-applications/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_etag_depends_on_query_string(self):
+        self.authenticate(self.applicant)
+        etag = self.client.get('/api/applications/my-applications/')['ETag']
+        response = self.client.get('/api/applications/my-applications/', {'pageSize': 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class BulkUpdateApplicationStatusTests(BaseAPITestCase):
+    url = '/api/applications/bulk-update-status/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = cls.create_company()
+        other = cls.create_company('Other')
+        cls.job = Job.objects.create(title='Backend Engineer', description='Django', createdBy=cls.company, status=Job.JobStatus.CLOSED)
+        other_job = Job.objects.create(title='Designer', description='Figma', createdBy=other, status=Job.JobStatus.OPEN)
+        cls.applications = []
+        for i in range(6):
+            applicant = cls.create_applicant(f'Applicant {i}', f'a{i}@example.com')
+            status = Application.ApplicationStatus.REVIEWED if i % 2 else Application.ApplicationStatus.APPLIED
+            cls.applications.append(Application.objects.create(
+                applicant=applicant, job=cls.job, resumeLink='https://example.com/cv.pdf', status=status,
+            ))
+            record_new_applications(cls.job.id, status)
+        cls.applications[5].status = Application.ApplicationStatus.REJECTED
+        cls.applications[5].save()
+        record_status_change(cls.job.id, Application.ApplicationStatus.REVIEWED, Application.ApplicationStatus.REJECTED)
+        cls.foreign = Application.objects.create(applicant=applicant, job=other_job, resumeLink='https://example.com/cv.pdf')
+
+    def test_updates_owned_applications_and_reports_skipped_ids(self):
+        self.authenticate(self.company)
+        missing = uuid.uuid4()
+        ids = [application.id for application in self.applications] + [self.foreign.id, missing]
+        response = self.client.post(self.url, {'ids': [str(i) for i in ids], 'status': 'Rejected'}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+
+        result = response.json()['object']
+        self.assertEqual(sorted(result['updated']), sorted(str(a.id) for a in self.applications[:5]))
+        self.assertEqual(
+            [(item['id'], item['reason']) for item in result['skipped']],
+            [(str(self.applications[5].id), "Application is already 'Rejected'."),
+             (str(self.foreign.id), 'Application not found.'), (str(missing), 'Application not found.')],
+        )
+        self.assertEqual(Application.objects.filter(job=self.job, status='Rejected').count(), 6)
+        self.assertEqual(Application.objects.get(pk=self.foreign.pk).status, 'Applied')
+        self.assertEqual(OutboundEmail.objects.count(), 5)
+
+        job = Job.objects.get(pk=self.job.pk)
+        self.assertEqual(
+            {field: getattr(job, field) for field in COUNTER_FIELDS},
+            actual_counters([self.job.id])[self.job.id],
+        )
+
+    def test_skips_applications_that_cannot_move_back(self):
+        self.authenticate(self.company)
+        Application.objects.filter(pk=self.applications[0].pk).update(status=Application.ApplicationStatus.HIRED)
+        Application.objects.filter(pk=self.applications[1].pk).update(status=Application.ApplicationStatus.INTERVIEW)
+        ids = [str(application.id) for application in self.applications]
+        response = self.client.post(self.url, {'ids': ids, 'status': 'Reviewed'}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+
+        result = response.json()['object']
+        self.assertEqual(sorted(result['updated']), sorted([ids[2], ids[4]]))
+        self.assertEqual([(item['id'], item['reason']) for item in result['skipped']], [
+            (ids[0], "A 'Hired' application status cannot be changed."),
+            (ids[1], "An application can't move back from 'Interview' to 'Reviewed'."),
+            (ids[3], "Application is already 'Reviewed'."),
+            (ids[5], "A 'Rejected' application status cannot be changed."),
+        ])
+        self.assertEqual(
+            list(Application.objects.filter(job=self.job).order_by('applicant__email').values_list('status', flat=True)),
+            ['Hired', 'Interview', 'Reviewed', 'Reviewed', 'Reviewed', 'Rejected'],
+        )
+
+    def test_validates_input(self):
+        self.authenticate(self.company)
+        self.assertEqual(self.client.post(self.url, {'ids': [], 'status': 'Rejected'}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(self.url, {'ids': [str(self.foreign.id)], 'status': 'Fired'}, format='json').status_code, 400)
+        self.authenticate(self.applications[0].applicant)
+        self.assertEqual(self.client.post(self.url, {'ids': [str(self.foreign.id)], 'status': 'Rejected'}, format='json').status_code, 403)
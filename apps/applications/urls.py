@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import MyApplicationsView, UpdateApplicationStatusView
+from .views import MyApplicationsView, AsyncMyApplicationsView, UpdateApplicationStatusView, BulkUpdateApplicationStatusView
+from apps.core.routing import async_reads
 
 urlpatterns = [
-    path('my-applications/', MyApplicationsView.as_view(), name='my-applications'),
+    path('my-applications/', async_reads(MyApplicationsView.as_view(), AsyncMyApplicationsView.as_view()), name='my-applications'),
     path('<uuid:pk>/update-status/', UpdateApplicationStatusView.as_view(), name='update-application-status'),
+    path('bulk-update-status/', BulkUpdateApplicationStatusView.as_view(), name='bulk-update-application-status'),
 ]
\ No newline at end of file
@@ -1,70 +1,100 @@
 from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from django.db import IntegrityError
-from django.core.mail import send_mail
-from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import OrderingFilter
 
 
 from .models import Application
 from apps.jobs.models import Job
-from .serializers import ApplicationSerializer, ApplicationCreateSerializer, ApplicationUpdateStatusSerializer
+from apps.jobs.counters import record_new_applications, record_status_change, record_status_changes
+from .serializers import (
+    ApplicationSerializer, ApplicationListSerializer, ApplicationCreateSerializer, ApplicationUpdateStatusSerializer,
+    ApplicationBulkUpdateStatusSerializer, status_change_error,
+)
 from apps.core.permissions import IsApplicantUser, IsCompanyUser, IsJobOwnerForApplication
-from apps.core.utils import upload_to_cloudinary
+from apps.core.utils import build_email, queue_email, queue_emails, get_idempotent_response, save_idempotent_response
+from apps.core.storage import store_resume
+from apps.core.mixins import FastListMixin, ConditionalGetMixin, AsyncAPIViewMixin
 from .filters import ApplicationFilter
 
 class ApplyForJobView(generics.CreateAPIView):
     """
     US6: Apply for a job (Applicant only).
-    Handles resume upload to Cloudinary.
+    Streams the resume to the configured storage, reusing the applicant's earlier upload
+    of the same file; with RESUME_UPLOAD_DEFERRED the upload finishes in a worker.
+    Retries carrying the same `Idempotency-Key` header replay the original response.
     """
     serializer_class = ApplicationCreateSerializer
     permission_classes = [permissions.IsAuthenticated, IsApplicantUser]
+    # Max queries per request, asserted in apps/core/tests.py (transaction statements excluded)
+    query_budgets = {'create': 10}
 
     def create(self, request, *args, **kwargs):
+        replayed = get_idempotent_response(request)
+        if replayed is not None:
+            return replayed
+
         job_id = self.kwargs.get('job_id')
-        job = get_object_or_404(Job, id=job_id)
+        job = get_object_or_404(Job.objects.select_related('createdBy'), id=job_id)
 
         if job.status != Job.JobStatus.OPEN:
             return Response({"success": False, "message": "This job is not open for applications.", "object": None, "errors": ["Job not open."]}, status=status.HTTP_400_BAD_REQUEST)
 
+        # Cheap duplicate check so retries don't pay for a resume upload
+        if Application.objects.filter(applicant_id=request.user.pk, job=job).exists():
+            return self.duplicate_response()
+
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         try:
-            # Upload resume to Cloudinary
-            resume_file = serializer.validated_data['resume']
-            resume_url = upload_to_cloudinary(resume_file)
-
-            # Create the application
-            application = serializer.save(
-                applicant=request.user,
-                job=job,
-                resumeLink=resume_url
-            )
+            # Stage (and, unless deferred, upload) the resume
+            resume = store_resume(request.user.pk, serializer.validated_data['resume'])
 
-            # Notify company
-            send_mail(
-                subject=f"New Application for {job.title}",
-                message=f"A new applicant, {request.user.name}, has applied for your job posting: '{job.title}'.",
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[job.createdBy.email]
-            )
+            with transaction.atomic():
+                # Create the application; a deferred upload fills in resumeLink later
+                application = serializer.save(
+                    applicant_id=request.user.pk,
+                    job=job,
+                    resumeLink=resume.url,
+                    storedResume=resume
+                )
+                record_new_applications(job.pk, application.status)
 
-            response_data = ApplicationSerializer(application).data
-            return Response({
-                "success": True, "message": "Application submitted successfully.", "object": response_data, "errors": None
-            }, status=status.HTTP_201_CREATED)
+                # Notify company (delivered by the outbox worker)
+                queue_email(
+                    subject=f"New Application for {job.title}",
+                    message=f"A new applicant, {request.user.name}, has applied for your job posting: '{job.title}'.",
+                    recipient_list=[job.createdBy.email]
+                )
+
+                response_data = {
+                    "success": True, "message": "Application submitted successfully.", "object": ApplicationSerializer(application).data, "errors": None
+                }
+                save_idempotent_response(request, response_data, status.HTTP_201_CREATED)
+
+            return Response(response_data, status=status.HTTP_201_CREATED)
 
         except IntegrityError:
-            return Response({"success": False, "message": "You have already applied for this job.", "object": None, "errors": ["Duplicate application."]}, status=status.HTTP_400_BAD_REQUEST)
+            # A concurrent retry with the same Idempotency-Key may have won the race: replay its response
+            replayed = get_idempotent_response(request)
+            if replayed is not None:
+                return replayed
+            return self.duplicate_response()
         except Exception as e:
             return Response({"success": False, "message": "An error occurred.", "object": None, "errors": [str(e)]}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def duplicate_response(self):
+        return Response({"success": False, "message": "You have already applied for this job.", "object": None, "errors": ["Duplicate application."]}, status=status.HTTP_400_BAD_REQUEST)
+
 
-class MyApplicationsView(generics.ListAPIView):
+class MyApplicationsView(FastListMixin, ConditionalGetMixin, generics.ListAPIView):
     """
     US7: Track my applications (Applicant only).
     Supports filtering and sorting.
@@ -74,19 +104,67 @@ class MyApplicationsView(generics.ListAPIView):
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_class = ApplicationFilter
     ordering_fields = ['appliedAt', 'job__createdBy__name', 'status', 'job__title']
+    cursor_ordering = ('appliedAt', 'id') # Keyset for CustomPagination's cursor mode
+    query_budgets = {'list': 3}
+    # The ETag version: changes whenever an application (or the job it shows) is added, removed or updated.
+    # Renaming the applicant or the company touches them too (see the signals in applications and jobs).
+    version_aggregates = {'count': Count('id'), 'updated': Max('updatedAt'), 'jobUpdated': Max('job__updatedAt')}
 
     def get_queryset(self):
-        return Application.objects.filter(applicant=self.request.user).select_related('job', 'job__createdBy').order_by('-appliedAt')
+        return Application.objects.filter(applicant_id=self.request.user.pk).select_related('applicant', 'job__createdBy').order_by('-appliedAt')
+
+    def list(self, request, *args, **kwargs):
+        # Polled by clients: one aggregate tells whether anything changed since the client's ETag
+        version = Application.objects.filter(applicant_id=request.user.pk).aggregate(**self.version_aggregates)
+
+        def build_response():
+            queryset = self.filter_queryset(self.get_queryset())
+            return self.list_response(queryset, ApplicationSerializer, ApplicationListSerializer)
+
+        return self.conditional_response(request, version, build_response)
+
+
+class AsyncMyApplicationsView(AsyncAPIViewMixin, MyApplicationsView):
+    """
+    Async version of MyApplicationsView with the same responses and ETags, served on its
+    URL for GET/HEAD when ASYNC_READ_VIEWS is on (see apps/applications/urls.py).
+    """
+
+    async def get(self, request, *args, **kwargs):
+        version = await Application.objects.filter(applicant_id=request.user.pk).aaggregate(**self.version_aggregates)
+
+        async def build_response():
+            queryset = self.filter_queryset(self.get_queryset())
+            return await self.alist_response(queryset, ApplicationSerializer, ApplicationListSerializer)
+
+        return await self.aconditional_response(request, version, build_response)
+
+
+def build_status_email(applicant, job, new_status):
+    """Returns the unsaved notification for an application moving to `new_status`, or None if it doesn't notify."""
+    message_map = {
+        "Interview": f"Good news! You've been selected for an interview for the {job.title} position.",
+        "Rejected": f"We regret to inform you that we will not be moving forward with your application for the {job.title} position.",
+        "Hired": f"Congratulations! You've been hired for the {job.title} position at {job.createdBy.name}!"
+    }
+    if new_status not in message_map:
+        return None
+    return build_email(
+        subject=f"Update on your application for {job.title}",
+        message=f"Hi {applicant.name},\n\n{message_map[new_status]}\n\nBest regards,\n{job.createdBy.name}",
+        recipient_list=[applicant.email]
+    )
 
 
 class UpdateApplicationStatusView(generics.UpdateAPIView):
     """
     US11: Update application status (Company that owns the job only).
-    Sends email notification to applicant on status change.
+    Queues an email notification to the applicant on status change.
     """
-    queryset = Application.objects.select_related('applicant', 'job').all()
+    queryset = Application.objects.select_related('applicant', 'job__createdBy').all()
     serializer_class = ApplicationUpdateStatusSerializer
     permission_classes = [permissions.IsAuthenticated, IsCompanyUser, IsJobOwnerForApplication]
+    query_budgets = {'update': 4, 'partial_update': 4}
 
     def update(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -94,26 +172,86 @@ class UpdateApplicationStatusView(generics.UpdateAPIView):
         serializer = self.get_serializer(instance, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         new_status = serializer.validated_data.get('status')
-        self.perform_update(serializer)
-
-        # Send email notification if status changes to a key state
-        if new_status and old_status != new_status:
-            if new_status in [Application.ApplicationStatus.INTERVIEW, Application.ApplicationStatus.REJECTED, Application.ApplicationStatus.HIRED]:
-                applicant = instance.applicant
-                job = instance.job
-                message_map = {
-                    "Interview": f"Good news! You've been selected for an interview for the {job.title} position.",
-                    "Rejected": f"We regret to inform you that we will not be moving forward with your application for the {job.title} position.",
-                    "Hired": f"Congratulations! You've been hired for the {job.title} position at {job.createdBy.name}!"
-                }
-                send_mail(
-                    subject=f"Update on your application for {job.title}",
-                    message=f"Hi {applicant.name},\n\n{message_map.get(new_status)}\n\nBest regards,\n{job.createdBy.name}",
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[applicant.email]
-                )
+
+        with transaction.atomic():
+            if new_status:
+                # The counters move from the status the row had when it changed: the UPDATE only applies
+                # while it still has the status read, so a concurrent change is re-read (and checked
+                # against the allowed transitions again) instead of overwritten
+                now = timezone.now()
+                while not Application.objects.filter(pk=instance.pk, status=old_status).update(status=new_status, updatedAt=now):
+                    old_status = Application.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+                    if old_status is None:
+                        raise Http404
+                    error = status_change_error(old_status, new_status)
+                    if error:
+                        raise ValidationError({'status': [error]})
+                instance.status, instance.updatedAt = new_status, now
+                record_status_change(instance.job_id, old_status, new_status)
+
+            # Queue email notification if status changes to a key state
+            if new_status and old_status != new_status:
+                email = build_status_email(instance.applicant, instance.job, new_status)
+                if email:
+                    queue_emails([email])
 
         response_data = ApplicationSerializer(instance).data
         return Response({
             "success": True, "message": "Application status updated successfully.", "object": response_data, "errors": None
+        })
+
+
+class BulkUpdateApplicationStatusView(generics.GenericAPIView):
+    """
+    US11 in bulk: move many applications to one status (Company that owns the jobs only).
+    Ownership is checked with one query, the change is a single UPDATE and the
+    notifications are queued in one batch, all in one transaction. Ids that are not the
+    company's (or don't exist), are already in that status or can't move to it (see
+    Application.PREVIOUS_STATUSES) are skipped and reported.
+    """
+    serializer_class = ApplicationBulkUpdateStatusSerializer
+    permission_classes = [permissions.IsAuthenticated, IsCompanyUser]
+    query_budgets = {'post': 4} # For applications of one job
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data['ids'])) # De-duplicated, in request order
+        new_status = serializer.validated_data['status']
+
+        with transaction.atomic():
+            # Locks the rows so their current status can't change before the UPDATE
+            applications = {
+                application.id: application
+                for application in Application.objects.select_for_update(of=('self',))
+                .filter(id__in=ids, job__createdBy_id=request.user.pk)
+                .select_related('applicant', 'job__createdBy')
+            }
+            allowed = Application.PREVIOUS_STATUSES[new_status] - {new_status}
+            changed = [application for application in applications.values() if application.status in allowed]
+            Application.objects.filter(id__in=[application.id for application in changed], status__in=allowed).update(
+                status=new_status, updatedAt=timezone.now()
+            )
+
+            old_status_counts = {}
+            for application in changed:
+                counts = old_status_counts.setdefault(application.job_id, {})
+                counts[application.status] = counts.get(application.status, 0) + 1
+            for job_id, counts in old_status_counts.items():
+                record_status_changes(job_id, counts, new_status)
+
+            emails = [build_status_email(application.applicant, application.job, new_status) for application in changed]
+            queue_emails([email for email in emails if email])
+
+        skipped = []
+        for application_id in ids:
+            if application_id not in applications:
+                skipped.append({"id": application_id, "reason": "Application not found."})
+            elif applications[application_id].status == new_status:
+                skipped.append({"id": application_id, "reason": f"Application is already '{new_status}'."})
+            elif applications[application_id].status not in allowed:
+                skipped.append({"id": application_id, "reason": status_change_error(applications[application_id].status, new_status)})
+        return Response({
+            "success": True, "message": f"{len(changed)} application(s) updated.",
+            "object": {"updated": [application.id for application in changed], "skipped": skipped}, "errors": None
         })
\ No newline at end of file
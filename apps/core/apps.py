@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
+
+    def ready(self):
+        from django.conf import settings
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+
+        from .middleware import install_query_timer
+
+        if settings.PERFORMANCE_INSTRUMENTATION or settings.METRICS_ENABLED:
+            connection_created.connect(install_query_timer, dispatch_uid='apps.core.install_query_timer')
+            for connection in connections.all(initialized_only=True):
+                install_query_timer(connection=connection)
@@ -0,0 +1,73 @@
+import contextlib
+import statistics
+import time
+
+from django.db import connection, transaction
+
+
+@contextlib.contextmanager
+def isolated_database(verbosity=0):
+    """
+    Runs the block against a freshly migrated test database which is destroyed afterwards,
+    so benchmarks never touch the development database.
+    """
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+
+
+@contextlib.contextmanager
+def rolled_back():
+    """
+    Runs the block in one transaction that is rolled back at the end, so benchmarks that
+    write leave the configured database as they found it.
+    """
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def time_calls(func, args_list):
+    """Calls func once per args tuple and returns the wall-clock durations in seconds."""
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def summarize(samples):
+    """Returns p50/p95/p99/mean latency in milliseconds for a list of durations in seconds."""
+    if not samples:
+        return {'count': 0, 'p50': None, 'p95': None, 'p99': None, 'mean': None}
+    ordered = sorted(samples)
+
+    def pct(p):
+        return round(ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))] * 1000, 3)
+
+    return {
+        'count': len(ordered),
+        'p50': pct(0.50),
+        'p95': pct(0.95),
+        'p99': pct(0.99),
+        'mean': round(statistics.fmean(ordered) * 1000, 3),
+    }
+
+
+def format_summary(label, summary):
+    return (
+        f"{label:<32} n={summary['count']:<6} p50={summary['p50']}ms "
+        f"p95={summary['p95']}ms p99={summary['p99']}ms mean={summary['mean']}ms"
+    )
+
+
+TRANSACTION_STATEMENTS = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+
+def count_queries(captured_queries):
+    """Number of real queries in a CaptureQueriesContext capture (transaction control statements excluded)."""
+    return sum(1 for query in captured_queries if not query['sql'].startswith(TRANSACTION_STATEMENTS))
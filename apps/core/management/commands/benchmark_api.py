@@ -0,0 +1,293 @@
+import contextlib
+import datetime
+import json
+import random
+import re
+import subprocess
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext, setup_test_environment
+from rest_framework.test import APIClient
+
+from apps.applications.models import Application
+from apps.core.benchmark import count_queries, format_summary, isolated_database, rolled_back, summarize
+from apps.core.seeding import LOCATIONS, SENIORITY, SKILLS, TITLES, seed
+from apps.jobs.models import Job
+from apps.users.models import User
+from apps.users.serializers import CustomTokenObtainPairSerializer
+
+SCENARIOS = (
+    'browse', 'browse_cursor', 'search', 'filter', 'job_detail', 'my_jobs', 'applications_for_job', 'my_applications', 'apply', 'update_status',
+)
+WRITE_SCENARIOS = ('apply', 'update_status')
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+class Command(BaseCommand):
+    help = (
+        "Drives the real API routes through the Django test client and reports p50/p95/p99 latency and queries "
+        "per request for each scenario. Seeds a throwaway database by default; --use-existing-db runs against "
+        "the configured one (e.g. after seed_data) inside a transaction that is rolled back at the end, so the "
+        "apply/update_status scenarios leave no users, applications or status changes behind (their COMMIT is not timed). "
+        "With --url the read scenarios are sent over HTTP to a running server (WSGI or ASGI) using the "
+        "configured database, --concurrency requests at a time, and throughput is reported too."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Measured requests per scenario")
+        parser.add_argument('--warmup', type=int, default=10, help="Unmeasured requests per scenario")
+        parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+        parser.add_argument('--cold-cache', action='store_true', help="Clear the cache before every request")
+        parser.add_argument('--output', help="Write the results as a JSON baseline to this file")
+        parser.add_argument('--compare', help="Compare the results with a JSON baseline written by --output")
+        parser.add_argument('--use-existing-db', action='store_true')
+        parser.add_argument('--companies', type=int, default=200)
+        parser.add_argument('--applicants', type=int, default=5000)
+        parser.add_argument('--jobs', type=int, default=20_000)
+        parser.add_argument('--applications', type=int, default=100_000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--url', help="Base URL of a running server to benchmark over HTTP, e.g. http://127.0.0.1:8000")
+        parser.add_argument('--concurrency', type=int, default=1, help="Requests in flight at once with --url")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as baseline_file:
+                baseline = json.load(baseline_file)
+
+        if options['url']:
+            options['scenarios'] = [name for name in options['scenarios'] if name not in WRITE_SCENARIOS]
+            results = self.run_live(options)
+            options['use_existing_db'] = True
+            return self.report(options, results, baseline)
+
+        setup_test_environment() # Lets the test client's 'testserver' host through ALLOWED_HOSTS
+        with contextlib.ExitStack() as stack:
+            if options['use_existing_db']:
+                stack.enter_context(rolled_back())
+            else:
+                stack.enter_context(isolated_database())
+                self.stdout.write('Seeding a throwaway database...')
+                seed(
+                    options['companies'], options['applicants'], options['jobs'], options['applications'],
+                    random_seed=options['seed'], prefix='bench',
+                )
+            media = stack.enter_context(tempfile.TemporaryDirectory())
+            stack.enter_context(override_settings(
+                RESUME_STORAGE='apps.core.storage.LocalResumeStorage', RESUME_UPLOAD_DEFERRED=False,
+                MEDIA_ROOT=media, RESUME_STAGING_DIR=f'{media}/staging',
+            ))
+            results = self.run_scenarios(options)
+        self.report(options, results, baseline)
+
+    def report(self, options, results, baseline):
+        report = {
+            'createdAt': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'revision': self.git_revision(),
+            'database': connection.vendor,
+            'options': {
+                key: options[key]
+                for key in ('requests', 'cold_cache', 'use_existing_db', 'jobs', 'applications', 'url', 'concurrency')
+            },
+            'scenarios': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                json.dump(report, output_file, indent=2)
+            self.stdout.write(f"Baseline written to {options['output']}")
+        if baseline:
+            self.compare(baseline, report)
+
+    def run_scenarios(self, options):
+        rng = random.Random(options['seed'])
+        fixtures = Fixtures(rng, options['requests'] + options['warmup'] if 'apply' in options['scenarios'] else 0)
+        results = {}
+        for name in options['scenarios']:
+            scenario = getattr(fixtures, name)
+            samples, queries, failures = [], [], 0
+            for i in range(options['warmup'] + options['requests']):
+                user, method, path, kwargs = scenario()
+                client = fixtures.client_for(user)
+                if options['cold_cache']:
+                    cache.clear()
+                with CaptureQueriesContext(connection) as captured:
+                    start = time.perf_counter()
+                    response = getattr(client, method)(path, **kwargs)
+                    elapsed = time.perf_counter() - start
+                if name == 'browse_cursor':
+                    fixtures.next_cursor = response.json().get('nextCursor') or ''
+                if i < options['warmup']:
+                    continue
+                samples.append(elapsed)
+                queries.append(count_queries(captured.captured_queries))
+                failures += response.status_code >= 400
+
+            summary = summarize(samples)
+            summary['queries'] = round(sum(queries) / len(queries), 2) if queries else None
+            summary['errors'] = failures
+            results[name] = summary
+            self.stdout.write(f"{format_summary(name, summary)} queries={summary['queries']} errors={failures}")
+        return results
+
+    def run_live(self, options):
+        """Sends each scenario's requests to --url from --concurrency threads (one connection per request)."""
+        rng = random.Random(options['seed'])
+        fixtures = Fixtures(rng, 0)
+        base_url = options['url'].rstrip('/')
+
+        def fetch(spec):
+            url, token = spec
+            request = urllib.request.Request(url, headers={'Authorization': f'Bearer {token}'})
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    response.read()
+                    status_code, server_timing = response.status, response.headers.get('Server-Timing', '')
+            except urllib.error.HTTPError as exc:
+                status_code, server_timing = exc.code, ''
+            except OSError:
+                status_code, server_timing = 599, '' # Connection refused/reset or timed out
+            match = SERVER_TIMING_QUERIES.search(server_timing)
+            return time.perf_counter() - start, status_code, int(match.group(1)) if match else None
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            for name in options['scenarios']:
+                specs = []
+                for _ in range(options['warmup'] + options['requests']):
+                    user, method, path, kwargs = getattr(fixtures, name)()
+                    query = urllib.parse.urlencode(kwargs.get('data', {}))
+                    specs.append((f'{base_url}{path}?{query}', fixtures.token_for(user)))
+                list(executor.map(fetch, specs[:options['warmup']]))
+
+                start = time.perf_counter()
+                outcomes = list(executor.map(fetch, specs[options['warmup']:]))
+                elapsed = time.perf_counter() - start
+
+                summary = summarize([duration for duration, _, _ in outcomes])
+                queries = [count for _, _, count in outcomes if count is not None]
+                summary['queries'] = round(sum(queries) / len(queries), 2) if queries else None
+                summary['errors'] = sum(status_code >= 400 for _, status_code, _ in outcomes)
+                summary['throughput'] = round(len(outcomes) / elapsed, 1)
+                results[name] = summary
+                self.stdout.write(
+                    f"{format_summary(name, summary)} queries={summary['queries']} errors={summary['errors']} "
+                    f"req/s={summary['throughput']}"
+                )
+        return results
+
+    def compare(self, baseline, report):
+        self.stdout.write(f"\nCompared with {baseline.get('revision') or 'baseline'} ({baseline.get('createdAt')}):")
+        for name, current in report['scenarios'].items():
+            previous = baseline['scenarios'].get(name)
+            if not previous:
+                continue
+            changes = []
+            for metric in ('p50', 'p95', 'p99', 'queries', 'throughput'):
+                before, after = previous.get(metric), current.get(metric)
+                if before and after is not None:
+                    changes.append(f'{metric} {before} -> {after} ({(after - before) / before:+.0%})')
+            self.stdout.write(f"{name:<32} " + ', '.join(changes))
+
+    def git_revision(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+
+class Fixtures:
+    """Picks the users and rows each scenario requests, favouring the busiest ones (worst cases)."""
+
+    def __init__(self, rng, apply_count):
+        self.rng = rng
+        self.clients = {}
+        self.tokens = {}
+        self.next_cursor = ''
+
+        top_applicant = (
+            Application.objects.values('applicant_id').annotate(total=Count('id')).order_by('-total').first()
+        )
+        top_company = Job.objects.values('createdBy_id').annotate(total=Count('id')).order_by('-total').first()
+        self.popular_job = Job.objects.filter(status=Job.JobStatus.OPEN).order_by('-applicationCount').first()
+        if not (top_applicant and top_company and self.popular_job):
+            raise CommandError('The database has no applications to benchmark; run seed_data first.')
+        self.applicant = User.objects.get(pk=top_applicant['applicant_id'])
+        self.company = User.objects.get(pk=top_company['createdBy_id'])
+        self.popular_owner = self.popular_job.createdBy
+        self.open_job_ids = list(Job.objects.filter(status=Job.JobStatus.OPEN).values_list('id', flat=True)[:1000])
+        self.application_ids = list( # Ones that can move to Interview (status changes only go forward)
+            Application.objects.filter(job=self.popular_job, status__in=Application.PREVIOUS_STATUSES[Application.ApplicationStatus.INTERVIEW])
+            .values_list('id', flat=True)[:1000]
+        )
+
+        # Fresh applicants, so every apply request creates an application
+        stamp = int(time.time())
+        self.new_applicants = iter(User.objects.bulk_create([
+            User(email=f'bench-apply-{stamp}-{i}@example.com', name=f'Bench Applicant {i}', role=User.Role.APPLICANT, is_verified=True)
+            for i in range(apply_count)
+        ]))
+
+    def token_for(self, user):
+        if user.pk not in self.tokens:
+            self.tokens[user.pk] = str(CustomTokenObtainPairSerializer.get_token(user).access_token)
+        return self.tokens[user.pk]
+
+    def client_for(self, user):
+        if user.pk not in self.clients:
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_for(user)}')
+            self.clients[user.pk] = client
+        return self.clients[user.pk]
+
+    def browse(self):
+        return self.applicant, 'get', '/api/jobs/', {'data': {'page': self.rng.randint(1, 20)}}
+
+    def browse_cursor(self):
+        # Crawls the keyset pages in order; run_scenarios hands back each response's nextCursor
+        return self.applicant, 'get', '/api/jobs/', {'data': {'cursor': self.next_cursor, 'includeTotal': 'false'}}
+
+    def search(self):
+        terms = f'{self.rng.choice(SKILLS)} {self.rng.choice(TITLES).split()[0].lower()}'
+        return self.applicant, 'get', '/api/jobs/', {'data': {'q': terms}}
+
+    def filter(self):
+        params = {'location': self.rng.choice(LOCATIONS), 'title': self.rng.choice(SENIORITY)}
+        return self.applicant, 'get', '/api/jobs/', {'data': params}
+
+    def job_detail(self):
+        return self.applicant, 'get', f'/api/jobs/{self.rng.choice(self.open_job_ids)}/', {}
+
+    def my_jobs(self):
+        return self.company, 'get', '/api/jobs/my-jobs/', {'data': {'page': self.rng.randint(1, 3)}}
+
+    def applications_for_job(self):
+        path = f'/api/jobs/{self.popular_job.id}/applications/'
+        return self.popular_owner, 'get', path, {'data': {'page': self.rng.randint(1, 20)}}
+
+    def my_applications(self):
+        return self.applicant, 'get', '/api/applications/my-applications/', {}
+
+    def apply(self):
+        applicant = next(self.new_applicants)
+        resume = SimpleUploadedFile('resume.pdf', b'%PDF-1.4 ' + applicant.email.encode(), content_type='application/pdf')
+        path = f'/api/jobs/{self.rng.choice(self.open_job_ids)}/apply/'
+        return applicant, 'post', path, {'data': {'resume': resume, 'coverLetter': 'Hello'}, 'format': 'multipart'}
+
+    def update_status(self):
+        path = f'/api/applications/{self.rng.choice(self.application_ids)}/update-status/'
+        return self.popular_owner, 'patch', path, {'data': {'status': Application.ApplicationStatus.INTERVIEW}, 'format': 'json'}
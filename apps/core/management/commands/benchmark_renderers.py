@@ -0,0 +1,63 @@
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from apps.core.benchmark import time_calls, summarize, format_summary
+from apps.core.renderers import ORJSONRenderer, orjson
+from apps.jobs.models import Job
+from apps.jobs.serializers import JobSerializer, JobListSerializer
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = "Benchmarks rendering a page of jobs with DRF's JSONRenderer against the orjson renderer (no database needed)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stderr.write('orjson is not installed; ORJSONRenderer would just be JSONRenderer.')
+
+        company = User(name='Acme Ltd', role=User.Role.COMPANY)
+        now = timezone.now()
+        rows = [
+            {
+                'id': uuid.uuid4(), 'title': f'Senior Backend Engineer {i}', 'description': 'We are hiring. ' * 20,
+                'location': 'Lagos', 'status': Job.JobStatus.OPEN, 'createdAt': now, 'createdBy__name': company.name,
+            }
+            for i in range(options['page_size'])
+        ]
+        jobs = [
+            Job(id=row['id'], title=row['title'], description=row['description'], location=row['location'],
+                status=row['status'], createdAt=row['createdAt'], createdBy=company)
+            for row in rows
+        ]
+        pages = {
+            'ModelSerializer': lambda: JobSerializer(jobs, many=True).data,
+            'values()': lambda: JobListSerializer(rows).data,
+        }
+
+        calls = [()] * options['repeat']
+        for label, serialize in pages.items():
+            page = serialize()
+            for renderer in (JSONRenderer(), ORJSONRenderer()):
+                name = type(renderer).__name__
+
+                def render_only():
+                    renderer.render(self.envelope(page))
+
+                def serialize_and_render():
+                    renderer.render(self.envelope(serialize()))
+
+                self.stdout.write(format_summary(f'{label} + {name}', summarize(time_calls(render_only, calls))))
+                self.stdout.write(format_summary('  incl. serialization', summarize(time_calls(serialize_and_render, calls))))
+
+    def envelope(self, page):
+        return {
+            'success': True, 'message': 'Data retrieved successfully.', 'object': page,
+            'pageNumber': 1, 'pageSize': len(page), 'totalSize': len(page), 'errors': None,
+        }
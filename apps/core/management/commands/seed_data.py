@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.seeding import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds the database with synthetic companies, applicants, jobs and applications (bulk_create, "
+        "Zipf-skewed popularity). The defaults are production-like volumes and take hours; scale them down for local runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=100_000)
+        parser.add_argument('--applicants', type=int, default=1_000_000)
+        parser.add_argument('--jobs', type=int, default=1_000_000)
+        parser.add_argument('--applications', type=int, default=20_000_000)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='seed', help="Email prefix; use a new one to seed the same database again")
+
+    def handle(self, *args, **options):
+        counts = seed(
+            options['companies'], options['applicants'], options['jobs'], options['applications'],
+            batch_size=options['batch_size'], random_seed=options['seed'], prefix=options['prefix'],
+            log=lambda message: self.stdout.write(message, ending='\r'),
+        )
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(', '.join(f'{count} {name}' for name, count in counts.items()) + ' created.'))
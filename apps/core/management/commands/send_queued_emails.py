@@ -0,0 +1,110 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.core.models import OutboundEmail
+
+
+class Command(BaseCommand):
+    help = "Delivers queued outbox emails in batches over a single reused email connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 100))
+        parser.add_argument('--max-attempts', type=int, default=getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5))
+        parser.add_argument('--backoff', type=int, default=getattr(settings, 'EMAIL_OUTBOX_BACKOFF_SECONDS', 30),
+                            help="Base retry delay in seconds; doubled after every failed attempt.")
+        parser.add_argument('--lease', type=int, default=300,
+                            help="Seconds a claimed batch is hidden from other workers while it is being sent.")
+        parser.add_argument('--loop', action='store_true', help="Keep polling instead of exiting when the outbox is empty.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Polling interval in seconds when looping.")
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            batch = self.claim_batch(options['batch_size'], options['lease'])
+            if batch:
+                total += self.deliver(batch, options['max_attempts'], options['backoff'])
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f"Sent {total} emails."))
+
+    def claim_batch(self, batch_size, lease):
+        """
+        Picks due emails and pushes their nextAttemptAt forward by the lease, in one short
+        transaction, so concurrent workers skip them and a crashed worker's batch is retried.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            queryset = OutboundEmail.objects.filter(
+                status=OutboundEmail.EmailStatus.PENDING, nextAttemptAt__lte=now
+            ).order_by('id')
+            if connection.features.has_select_for_update_skip_locked:
+                batch = list(queryset.select_for_update(skip_locked=True)[:batch_size])
+                OutboundEmail.objects.filter(id__in=[email.id for email in batch]).update(
+                    nextAttemptAt=now + timedelta(seconds=lease)
+                )
+                return batch
+            return self.lease(list(queryset[:batch_size]), now + timedelta(seconds=lease))
+
+    def lease(self, emails, until):
+        """
+        Claims `emails` without row locks (e.g. SQLite): each UPDATE only applies while the
+        email still has the nextAttemptAt it was read with, so of two workers that read the
+        same due rows, only the first to update each one sends it. Returns the claimed emails.
+        """
+        claimed = []
+        for email in emails:
+            if OutboundEmail.objects.filter(
+                pk=email.pk, status=OutboundEmail.EmailStatus.PENDING, nextAttemptAt=email.nextAttemptAt
+            ).update(nextAttemptAt=until):
+                email.nextAttemptAt = until
+                claimed.append(email)
+        return claimed
+
+    def deliver(self, batch, max_attempts, backoff):
+        sent_ids = []
+        email_connection = get_connection()
+        try:
+            email_connection.open()
+            for email in batch:
+                try:
+                    EmailMessage(
+                        subject=email.subject,
+                        body=email.message,
+                        from_email=email.fromEmail,
+                        to=email.recipients,
+                        connection=email_connection,
+                    ).send()
+                    sent_ids.append(email.id)
+                except Exception as e:
+                    self.record_failure(email, e, max_attempts, backoff)
+        except Exception as e:
+            # Could not connect at all: every unsent email in the batch counts as a failed attempt
+            for email in batch:
+                if email.id not in sent_ids:
+                    self.record_failure(email, e, max_attempts, backoff)
+        finally:
+            email_connection.close()
+
+        OutboundEmail.objects.filter(id__in=sent_ids).update(
+            status=OutboundEmail.EmailStatus.SENT, sentAt=timezone.now(), attempts=F('attempts') + 1, lastError=''
+        )
+        return len(sent_ids)
+
+    def record_failure(self, email, error, max_attempts, backoff):
+        email.attempts += 1
+        email.lastError = str(error)
+        if email.attempts >= max_attempts:
+            email.status = OutboundEmail.EmailStatus.FAILED
+        else:
+            email.nextAttemptAt = timezone.now() + timedelta(seconds=backoff * 2 ** (email.attempts - 1))
+        email.save(update_fields=['attempts', 'lastError', 'status', 'nextAttemptAt'])
+        self.stderr.write(f"Email {email.id} failed (attempt {email.attempts}): {error}")
@@ -0,0 +1,81 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.core.models import StoredResume
+from apps.core.storage import upload_stored_resume
+
+
+class Command(BaseCommand):
+    help = "Uploads staged resumes (RESUME_UPLOAD_DEFERRED) to the configured storage."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--max-attempts', type=int, default=getattr(settings, 'RESUME_UPLOAD_MAX_ATTEMPTS', 5))
+        parser.add_argument('--backoff', type=int, default=getattr(settings, 'RESUME_UPLOAD_BACKOFF_SECONDS', 30),
+                            help="Base retry delay in seconds; doubled after every failed attempt.")
+        parser.add_argument('--lease', type=int, default=300,
+                            help="Seconds a claimed batch is hidden from other workers while it is being uploaded.")
+        parser.add_argument('--loop', action='store_true', help="Keep polling instead of exiting when nothing is pending.")
+        parser.add_argument('--interval', type=float, default=2.0, help="Polling interval in seconds when looping.")
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            batch = self.claim_batch(options['batch_size'], options['lease'])
+            for stored in batch:
+                try:
+                    upload_stored_resume(stored)
+                    total += 1
+                except Exception as e:
+                    self.record_failure(stored, e, options['max_attempts'], options['backoff'])
+            if batch:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f"Uploaded {total} resumes."))
+
+    def claim_batch(self, batch_size, lease):
+        """
+        Picks due staged resumes and pushes their nextAttemptAt forward by the lease, as
+        `send_queued_emails` does, so concurrent workers skip them and a crashed worker's
+        batch is retried.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            queryset = StoredResume.objects.filter(
+                status=StoredResume.UploadStatus.PENDING, nextAttemptAt__lte=now
+            ).order_by('nextAttemptAt', 'id')
+            if connection.features.has_select_for_update_skip_locked:
+                batch = list(queryset.select_for_update(skip_locked=True)[:batch_size])
+                StoredResume.objects.filter(id__in=[stored.id for stored in batch]).update(
+                    nextAttemptAt=now + timedelta(seconds=lease)
+                )
+                return batch
+            return self.lease(list(queryset[:batch_size]), now + timedelta(seconds=lease))
+
+    def lease(self, resumes, until):
+        """Claims `resumes` without row locks: see `send_queued_emails`' Command.lease."""
+        claimed = []
+        for stored in resumes:
+            if StoredResume.objects.filter(
+                pk=stored.pk, status=StoredResume.UploadStatus.PENDING, nextAttemptAt=stored.nextAttemptAt
+            ).update(nextAttemptAt=until):
+                stored.nextAttemptAt = until
+                claimed.append(stored)
+        return claimed
+
+    def record_failure(self, stored, error, max_attempts, backoff):
+        stored.attempts += 1
+        stored.lastError = str(error)
+        if stored.attempts >= max_attempts:
+            stored.status = StoredResume.UploadStatus.FAILED
+        else:
+            stored.nextAttemptAt = timezone.now() + timedelta(seconds=backoff * 2 ** (stored.attempts - 1))
+        stored.save(update_fields=['attempts', 'lastError', 'status', 'nextAttemptAt'])
+        self.stderr.write(f"Resume {stored.pk} failed (attempt {stored.attempts}): {error}")
@@ -0,0 +1,229 @@
+import glob
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+from .sharedfiles import exclusive_lock, write_atomically
+
+# Prometheus-style counters and histograms, safe under gunicorn's worker processes without
+# a lock per request:
+# - each thread records into its own dicts (registered once per thread), so an increment
+#   never races another thread's;
+# - each process periodically writes its totals to METRICS_DIR/<pid>-<start>.json (atomic
+#   rename), at most every METRICS_FLUSH_INTERVAL seconds, checked at the end of a request;
+# - /metrics sums every file in METRICS_DIR. Files of exited workers are folded into
+#   METRICS_DIR/exited.json first, so counters never go backwards and the directory doesn't
+#   grow with every worker restart. Worker pids are checked locally: METRICS_DIR must not
+#   be shared between hosts.
+# Without METRICS_DIR (runserver, tests) /metrics reports the current process only.
+
+EXITED_FILE = 'exited.json' # Summed totals of workers that have exited
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+HISTOGRAM_BUCKETS = {
+    'http_request_duration_seconds': LATENCY_BUCKETS,
+    'http_request_db_queries': QUERY_COUNT_BUCKETS,
+}
+DESCRIPTIONS = {
+    'http_requests_total': ('counter', 'Requests served, by route name and status code.'),
+    'http_request_duration_seconds': ('histogram', 'Request latency in seconds, by route name and status code.'),
+    'http_request_db_queries': ('histogram', 'SQL statements per request, by route name.'),
+    'http_request_db_seconds_total': ('counter', 'Time spent in SQL, by route name.'),
+    'cache_requests_total': ('counter', 'Response/count cache lookups, by cache and result (hit or miss).'),
+    'cache_hit_ratio': ('gauge', 'Share of cache lookups that were hits since the metrics directory was created.'),
+    'email_outbox_depth': ('gauge', 'Outbox emails by status (Pending includes those waiting for a retry).'),
+    'resume_upload_queue_depth': ('gauge', 'Staged resumes waiting for the deferred upload worker.'),
+}
+
+
+class _Process:
+    """This process's per-thread metric stores."""
+
+    def __init__(self):
+        self.name = f'{os.getpid()}-{time.time_ns()}'
+        self.stores = []
+        self.register_lock = threading.Lock() # Taken once per thread, never per request
+        self.local = threading.local()
+        self.next_flush = 0.0
+
+    def store(self):
+        store = getattr(self.local, 'store', None)
+        if store is None:
+            store = self.local.store = ({}, {}) # counters, histograms
+            with self.register_lock:
+                self.stores.append(store)
+        return store
+
+
+_process = _Process()
+# A forked worker (gunicorn --preload) must not report its parent's numbers as its own
+os.register_at_fork(after_in_child=lambda: globals().update(_process=_Process()))
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items())))
+
+
+def increment(name, value=1, **labels):
+    counters = _process.store()[0]
+    key = _key(name, labels)
+    counters[key] = counters.get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    histograms = _process.store()[1]
+    key = _key(name, labels)
+    buckets = HISTOGRAM_BUCKETS[name]
+    histogram = histograms.get(key)
+    if histogram is None:
+        histogram = histograms[key] = [0] * (len(buckets) + 2) # per-bucket counts, +Inf, then the sum
+    for index, bound in enumerate(buckets):
+        if value <= bound:
+            histogram[index] += 1
+            break
+    else:
+        histogram[-2] += 1
+    histogram[-1] += value
+
+
+def observe_request(route, status_code, duration, queries, db_time):
+    """Records one finished request (called by PerformanceMiddleware)."""
+    status_code = str(status_code)
+    increment('http_requests_total', route=route, status=status_code)
+    observe('http_request_duration_seconds', duration, route=route, status=status_code)
+    observe('http_request_db_queries', queries, route=route)
+    increment('http_request_db_seconds_total', db_time, route=route)
+    if settings.METRICS_DIR and time.monotonic() >= _process.next_flush:
+        flush()
+
+
+def snapshot():
+    """This process's totals: {'counters': [[name, labels, value]], 'histograms': [[name, labels, values]]}."""
+    counters, histograms = {}, {}
+    for thread_counters, thread_histograms in list(_process.stores):
+        for key, value in thread_counters.copy().items():
+            counters[key] = counters.get(key, 0) + value
+        for key, values in thread_histograms.copy().items():
+            total = histograms.setdefault(key, [0] * len(values))
+            for index, value in enumerate(list(values)):
+                total[index] += value
+    return _as_snapshot(counters, histograms)
+
+
+def _as_snapshot(counters, histograms):
+    return {
+        'counters': [[name, dict(labels), value] for (name, labels), value in counters.items()],
+        'histograms': [[name, dict(labels), values] for (name, labels), values in histograms.items()],
+    }
+
+
+def flush():
+    """Writes this process's totals to METRICS_DIR, replacing its previous file atomically."""
+    _process.next_flush = time.monotonic() + settings.METRICS_FLUSH_INTERVAL
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=settings.METRICS_DIR, suffix='.tmp')
+    with os.fdopen(fd, 'w') as temp_file:
+        json.dump(snapshot(), temp_file)
+    os.replace(temp_path, os.path.join(settings.METRICS_DIR, f'{_process.name}.json'))
+
+
+def _read(path):
+    try:
+        with open(path) as metrics_file:
+            return json.load(metrics_file)
+    except (OSError, ValueError): # Removed or half-written by a cleanup meanwhile
+        return None
+
+
+def _sum(snapshots):
+    counters, histograms = {}, {}
+    for data in snapshots:
+        for name, labels, value in data['counters']:
+            key = _key(name, labels)
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, values in data['histograms']:
+            total = histograms.setdefault(_key(name, labels), [0] * len(values))
+            for index, value in enumerate(values):
+                total[index] += value
+    return counters, histograms
+
+
+def _running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError: # Alive, owned by another user
+        pass
+    return True
+
+
+def merge_exited():
+    """Folds the files of workers that are no longer running into EXITED_FILE and removes them."""
+    exited_path = os.path.join(settings.METRICS_DIR, EXITED_FILE)
+    with exclusive_lock(settings.METRICS_DIR):
+        paths = []
+        for path in glob.glob(os.path.join(settings.METRICS_DIR, '*-*.json')):
+            pid = os.path.basename(path).split('-')[0]
+            if pid.isdigit() and not _running(int(pid)):
+                paths.append(path)
+        if not paths:
+            return
+        snapshots = [data for data in map(_read, [exited_path, *paths]) if data is not None]
+        write_atomically(exited_path, json.dumps(_as_snapshot(*_sum(snapshots))).encode())
+        for path in paths:
+            os.remove(path)
+
+
+def collect():
+    """Sums every process's metrics, flushing this one's first so they are current."""
+    if not settings.METRICS_DIR:
+        return _sum([snapshot()])
+    flush()
+    merge_exited()
+    paths = glob.glob(os.path.join(settings.METRICS_DIR, '*.json'))
+    return _sum([data for data in map(_read, paths) if data is not None])
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float) and math.isinf(value):
+        return '+Inf'
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render(counters, histograms, gauges):
+    """Prometheus text exposition (format 0.0.4). `gauges` maps (name, labels) keys to values."""
+    families = {}
+    for (name, labels), value in sorted({**counters, **gauges}.items()):
+        families.setdefault(name, []).append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+    for (name, labels), values in sorted(histograms.items()):
+        lines = families.setdefault(name, [])
+        cumulative = 0
+        for bound, count in zip(HISTOGRAM_BUCKETS[name] + (math.inf,), values[:-1]):
+            cumulative += count
+            bucket_labels = labels + (('le', _format_value(float(bound))),)
+            lines.append(f'{name}_bucket{_format_labels(bucket_labels)} {cumulative}')
+        lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(values[-1])}')
+        lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+
+    output = []
+    for name in sorted(families):
+        kind, description = DESCRIPTIONS[name]
+        output.append(f'# HELP {name} {description}')
+        output.append(f'# TYPE {name} {kind}')
+        output.extend(families[name])
+    return '\n'.join(output) + '\n'
@@ -0,0 +1,154 @@
+import contextlib
+import json
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import metrics
+
+logger = logging.getLogger('apps.core.performance')
+
+_timings = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """What one request spent its time on: named sections (see timed()) and every SQL statement."""
+
+    def __init__(self):
+        self.sections = {}
+        self.queries = []
+
+    def add(self, name, duration):
+        total, count = self.sections.get(name, (0.0, 0))
+        self.sections[name] = (total + duration, count + 1)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Execute wrapper on every database connection (see install_query_timer()). It finds the
+    request through a context variable, so it also sees the queries async views run in
+    worker threads, and only costs that lookup outside an instrumented request.
+    """
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries.append((time.perf_counter() - start, sql))
+
+
+def install_query_timer(sender=None, connection=None, **kwargs):
+    """connection_created receiver (connected in CoreConfig.ready() when instrumentation or metrics are on)."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextlib.contextmanager
+def timed(name):
+    """
+    Adds the block's duration to the current request's `name` section (Server-Timing and
+    the slow-request log). Outside an instrumented request it only costs a lookup.
+    """
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+class PerformanceMiddleware:
+    """
+    Times each request, its SQL (through record_query()) and its timed()
+    sections, then logs requests slower than SLOW_REQUEST_THRESHOLD_MS with their
+    SLOW_REQUEST_TOP_QUERIES most expensive statements and, with SERVER_TIMING_HEADER,
+    reports them in a `Server-Timing` header.
+    With METRICS_ENABLED it also feeds the per-route metrics served at /metrics, whether
+    or not PERFORMANCE_INSTRUMENTATION is on; with both off it removes itself at startup.
+    Timing stops when get_response() returns, so a streaming response's content, which is
+    generated while it is sent, is not included. Works in both sync and async stacks, so
+    it never forces async views onto a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not (settings.PERFORMANCE_INSTRUMENTATION or settings.METRICS_ENABLED):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.report(request, response, time.perf_counter() - start, timings)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.report(request, response, time.perf_counter() - start, timings)
+
+    def report(self, request, response, total, timings):
+        if settings.PERFORMANCE_INSTRUMENTATION:
+            if settings.SERVER_TIMING_HEADER:
+                response['Server-Timing'] = self.server_timing(total, timings)
+            if total * 1000 >= settings.SLOW_REQUEST_THRESHOLD_MS:
+                self.log_slow_request(request, response, total, timings)
+        if settings.METRICS_ENABLED:
+            match = request.resolver_match
+            metrics.observe_request(
+                match.view_name if match else 'unmatched', response.status_code, total,
+                len(timings.queries), sum(duration for duration, _ in timings.queries),
+            )
+        return response
+
+    def server_timing(self, total, timings):
+        db_time = sum(duration for duration, _ in timings.queries)
+        entries = [
+            f'total;dur={total * 1000:.2f}',
+            f'db;dur={db_time * 1000:.2f};desc="{len(timings.queries)} queries"',
+        ]
+        entries.extend(f'{name};dur={duration * 1000:.2f}' for name, (duration, _) in timings.sections.items())
+        return ', '.join(entries)
+
+    def log_slow_request(self, request, response, total, timings):
+        match = request.resolver_match
+        slowest = sorted(timings.queries, key=lambda query: query[0], reverse=True)[:settings.SLOW_REQUEST_TOP_QUERIES]
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'userId': str(request.user.pk) if getattr(request, 'user', None) and request.user.is_authenticated else None,
+            'totalMs': round(total * 1000, 2),
+            'dbMs': round(sum(duration for duration, _ in timings.queries) * 1000, 2),
+            'queries': len(timings.queries),
+            'sections': {
+                name: {'ms': round(duration * 1000, 2), 'calls': calls}
+                for name, (duration, calls) in timings.sections.items()
+            },
+            'topQueries': [{'ms': round(duration * 1000, 2), 'sql': sql[:2000]} for duration, sql in slowest],
+        }
+        logger.warning(json.dumps(record), extra={'performance': record})
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0002_idempotencyrecord'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredResume',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64)),
+                ('size', models.PositiveIntegerField()),
+                ('fileName', models.CharField(max_length=255)),
+                ('stagingPath', models.CharField(blank=True, max_length=500)),
+                ('url', models.URLField(blank=True, max_length=500)),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Stored', 'Stored'), ('Failed', 'Failed')], default='Pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('lastError', models.TextField(blank=True)),
+                ('createdAt', models.DateTimeField(auto_now_add=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'id'], name='core_resume_status_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='storedresume',
+            constraint=models.UniqueConstraint(fields=('owner', 'sha256'), name='core_resume_owner_sha256_uniq'),
+        ),
+    ]
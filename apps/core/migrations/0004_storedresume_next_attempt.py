@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_storedresume'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='storedresume',
+            name='core_resume_status_idx',
+        ),
+        migrations.AddField(
+            model_name='storedresume',
+            name='nextAttemptAt',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='storedresume',
+            index=models.Index(fields=['status', 'nextAttemptAt'], name='core_resume_due_idx'),
+        ),
+    ]
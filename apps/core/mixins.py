@@ -0,0 +1,138 @@
+import hashlib
+
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponse
+from django.template.response import SimpleTemplateResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from .middleware import timed
+
+
+class FastListMixin:
+    """
+    Lets list endpoints serialize `.values()` rows through a ValuesSerializer instead of
+    building model instances for a ModelSerializer. The output is identical; set
+    FAST_LIST_SERIALIZERS = False to fall back to the ModelSerializer path.
+    """
+
+    def list_response(self, queryset, serializer_class, values_serializer_class):
+        queryset, serialize = self.list_serializer(queryset, serializer_class, values_serializer_class)
+        page = self.paginate_queryset(queryset)
+        rows = queryset if page is None else page
+        with timed('serialize'):
+            data = serialize(rows)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    async def alist_response(self, queryset, serializer_class, values_serializer_class):
+        queryset, serialize = self.list_serializer(queryset, serializer_class, values_serializer_class)
+        page = None
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+        rows = [row async for row in queryset] if page is None else page
+        with timed('serialize'):
+            data = serialize(rows)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def list_serializer(self, queryset, serializer_class, values_serializer_class):
+        """Returns the queryset to page through and a function serializing a page of its rows."""
+        if getattr(settings, 'FAST_LIST_SERIALIZERS', True):
+            return values_serializer_class.values(queryset), lambda rows: values_serializer_class(rows).data
+        return queryset, lambda rows: serializer_class(rows, many=True, context=self.get_serializer_context()).data
+
+
+
+class ConditionalGetMixin:
+    """
+    Conditional GETs for polled endpoints. The view first computes a cheap `version` of
+    the resource (a timestamp, a count, ...); a request whose If-None-Match (or
+    If-Modified-Since, when `last_modified` is given) still matches gets a 304 before
+    `build_response` runs the real queries and serialization.
+    """
+
+    def conditional_response(self, request, version, build_response, last_modified=None):
+        etag, timestamp, response = self.check_validators(request, version, last_modified)
+        if response is None:
+            response = build_response()
+        return self.add_validators(response, etag, timestamp)
+
+    async def aconditional_response(self, request, version, build_response, last_modified=None):
+        """conditional_response() for async views: `build_response` is a coroutine function."""
+        etag, timestamp, response = self.check_validators(request, version, last_modified)
+        if response is None:
+            response = await build_response()
+        return self.add_validators(response, etag, timestamp)
+
+    def check_validators(self, request, version, last_modified):
+        """Returns the ETag, the Last-Modified timestamp and a 304 response if the client's copy is current."""
+        # The body also depends on the query string and the negotiated format (json/api)
+        tag = repr((version, request.get_full_path(), request.accepted_renderer.format))
+        etag = quote_etag(hashlib.md5(tag.encode()).hexdigest())
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        return etag, timestamp, get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+    def add_validators(self, response, etag, timestamp):
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+            # Responses are per user: shared caches must not hand them to someone else
+            patch_vary_headers(response, ('Authorization',))
+        return response
+
+
+class AsyncAPIViewMixin:
+    """
+    Async dispatch for read-only DRF views served under ASGI (see apps/core/routing.py).
+    Authentication, permissions, content negotiation, exception handling and rendering
+    are DRF's own and run inline, as they need no I/O besides the JWT revocation lookup
+    in the cache. The handlers are `async def` and query through the async ORM.
+    """
+
+    @classmethod
+    def as_view(cls, *args, **initkwargs):
+        # DRF's ViewSet.as_view doesn't know about async handlers
+        return markcoroutinefunction(super().as_view(*args, **initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        # APIView.dispatch, awaiting the handler
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            self.initial(request, *args, **kwargs)
+            handler = None
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), None)
+            if handler is None:
+                self.http_method_not_allowed(request, *args, **kwargs) # Raises MethodNotAllowed
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+
+        if isinstance(self.response, SimpleTemplateResponse):
+            # Render here: Django would hand a deferred render to a worker thread
+            self.response.render()
+            return HttpResponse(self.response.content, status=self.response.status_code, headers=self.response.headers)
+        return self.response
+
+    async def aget_object(self):
+        """GenericAPIView.get_object() through the async ORM."""
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+        self.check_object_permissions(self.request, obj)
+        return obj
@@ -1,3 +1,88 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+class OutboundEmail(models.Model):
+    """
+    Transactional email outbox. Rows are written in the same transaction as the change
+    that triggers them and delivered by the `send_queued_emails` worker.
+    """
+    class EmailStatus(models.TextChoices):
+        PENDING = 'Pending', 'Pending'
+        SENT = 'Sent', 'Sent'
+        FAILED = 'Failed', 'Failed'
+
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    fromEmail = models.EmailField()
+    recipients = models.JSONField()
+    status = models.CharField(max_length=10, choices=EmailStatus.choices, default=EmailStatus.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    nextAttemptAt = models.DateTimeField(default=timezone.now)
+    lastError = models.TextField(blank=True)
+    createdAt = models.DateTimeField(auto_now_add=True)
+    sentAt = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'nextAttemptAt'], name='core_outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)}"
+
+
+class IdempotencyRecord(models.Model):
+    """
+    The stored response of a request sent with an `Idempotency-Key` header,
+    replayed when a client retries with the same key.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    key = models.CharField(max_length=255)
+    path = models.CharField(max_length=255)
+    statusCode = models.PositiveSmallIntegerField()
+    response = models.JSONField(encoder=DjangoJSONEncoder)
+    createdAt = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='core_idempotency_user_key_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.path})"
+
+
+class StoredResume(models.Model):
+    """
+    A resume file, stored once per applicant and content hash and shared by every
+    application that uploads the same file.
+    """
+    class UploadStatus(models.TextChoices):
+        PENDING = 'Pending', 'Pending'
+        STORED = 'Stored', 'Stored'
+        FAILED = 'Failed', 'Failed'
+
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='resumes')
+    sha256 = models.CharField(max_length=64)
+    size = models.PositiveIntegerField()
+    fileName = models.CharField(max_length=255)
+    stagingPath = models.CharField(max_length=500, blank=True)
+    url = models.URLField(max_length=500, blank=True)
+    status = models.CharField(max_length=10, choices=UploadStatus.choices, default=UploadStatus.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    nextAttemptAt = models.DateTimeField(default=timezone.now)
+    lastError = models.TextField(blank=True)
+    createdAt = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'sha256'], name='core_resume_owner_sha256_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'nextAttemptAt'], name='core_resume_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.fileName} ({self.sha256[:12]})"
@@ -1,12 +1,176 @@
+import base64
+import hashlib
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.core.paginator import InvalidPage
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 
+from . import metrics
+
 class CustomPagination(PageNumberPagination):
+    """
+    Page-number pagination by default. Views that declare `cursor_ordering`
+    (a `(timestamp_field, 'id')` pair, newest first) also support an opt-in keyset
+    mode: pass `?cursor=` for the first page, then the returned `nextCursor`.
+    Keyset pages never run OFFSET, and `totalSize` comes from a cached count
+    (or is omitted with `includeTotal=false`). Keyset pages are always newest first, so
+    parameters that order the results otherwise (`q` relevance, `ordering`) are rejected
+    in cursor mode. `apaginate_queryset` is the same for async views, through the async ORM.
+    """
     page_size = 10
     page_size_query_param = 'pageSize'
     max_page_size = 100
+    cursor_query_param = 'cursor'
+    include_total_query_param = 'includeTotal'
+    invalid_cursor_message = 'Invalid cursor.'
+    cursor_incompatible_params = ('q', 'ordering') # Reorder the results, which keyset pages cannot follow
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = False
+        ordering = getattr(view, 'cursor_ordering', None)
+        if ordering and self.cursor_query_param in request.query_params:
+            self.check_cursor_params(request)
+            return self.paginate_queryset_by_cursor(queryset, request, ordering)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = False
+        ordering = getattr(view, 'cursor_ordering', None)
+        if ordering and self.cursor_query_param in request.query_params:
+            self.check_cursor_params(request)
+            return await self.apaginate_queryset_by_cursor(queryset, request, ordering)
+
+        # PageNumberPagination.paginate_queryset, with the count and the page fetched asynchronously
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount() # Paginator.count is a cached_property
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        return [row async for row in self.page.object_list]
+
+    def check_cursor_params(self, request):
+        errors = {
+            param: [f'`{param}` cannot be combined with `{self.cursor_query_param}`; use page numbers instead.']
+            for param in self.cursor_incompatible_params if request.query_params.get(param)
+        }
+        if errors:
+            raise ValidationError(errors)
+
+    def paginate_queryset_by_cursor(self, queryset, request, ordering):
+        total_size = None
+        if self.wants_total(request):
+            total_size = self.get_cached_count(queryset)
+        queryset = self.start_cursor_page(queryset, request, ordering, total_size)
+        return self.finish_cursor_page(list(queryset[:self.page_size_value + 1]), ordering)
+
+    async def apaginate_queryset_by_cursor(self, queryset, request, ordering):
+        total_size = None
+        if self.wants_total(request):
+            total_size = await self.aget_cached_count(queryset)
+        queryset = self.start_cursor_page(queryset, request, ordering, total_size)
+        return self.finish_cursor_page([row async for row in queryset[:self.page_size_value + 1]], ordering)
+
+    def wants_total(self, request):
+        return request.query_params.get(self.include_total_query_param, 'true').lower() != 'false'
+
+    def start_cursor_page(self, queryset, request, ordering, total_size):
+        """Records the page's state and returns the queryset of rows after the cursor."""
+        self.cursor_mode = True
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        self.total_size = total_size
+        time_field, id_field = ordering
+
+        queryset = queryset.order_by(f'-{time_field}', f'-{id_field}')
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            position, last_id = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(**{f'{time_field}__lt': position}) |
+                Q(**{time_field: position, f'{id_field}__lt': last_id})
+            )
+        return queryset
+
+    def finish_cursor_page(self, rows, ordering):
+        """Trims the page_size + 1 fetched rows to the page and sets `nextCursor` from the last one."""
+        time_field, id_field = ordering
+        self.next_cursor = None
+        if len(rows) > self.page_size_value:
+            rows = rows[:self.page_size_value]
+            last = rows[-1]
+            if not isinstance(last, dict): # .values() rows from the fast list serializers
+                last = {time_field: getattr(last, time_field), id_field: getattr(last, id_field)}
+            self.next_cursor = self.encode_cursor(last[time_field], last[id_field])
+        return rows
+
+    def encode_cursor(self, position, last_id):
+        raw = f'{position.isoformat()}|{last_id}'
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+            position, last_id = raw.split('|')
+            position = parse_datetime(position)
+            if position is None:
+                raise ValueError(raw)
+            return position, uuid.UUID(last_id)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_cached_count(self, queryset):
+        """
+        Counts the unpaginated queryset at most once per PAGINATION_COUNT_CACHE_TIMEOUT
+        seconds per distinct query, so crawling deep pages doesn't re-run COUNT(*).
+        """
+        key = self.count_cache_key(queryset)
+        count = cache.get(key)
+        metrics.increment('cache_requests_total', cache='pagination_count', result='miss' if count is None else 'hit')
+        if count is None:
+            count = queryset.order_by().count()
+            cache.set(key, count, getattr(settings, 'PAGINATION_COUNT_CACHE_TIMEOUT', 60))
+        return count
+
+    async def aget_cached_count(self, queryset):
+        # Compiling SQL may need a live connection (e.g. PostgreSQL's server version)
+        key = await sync_to_async(self.count_cache_key)(queryset)
+        count = await cache.aget(key)
+        metrics.increment('cache_requests_total', cache='pagination_count', result='miss' if count is None else 'hit')
+        if count is None:
+            count = await queryset.order_by().acount()
+            await cache.aset(key, count, getattr(settings, 'PAGINATION_COUNT_CACHE_TIMEOUT', 60))
+        return count
+
+    def count_cache_key(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        return 'pagination-count:' + hashlib.md5(f'{sql}|{params!r}'.encode()).hexdigest()
 
     def get_paginated_response(self, data):
+        if self.cursor_mode:
+            return Response({
+                'success': True,
+                'message': 'Data retrieved successfully.',
+                'object': data,
+                'pageSize': self.page_size_value,
+                'nextCursor': self.next_cursor,
+                'totalSize': self.total_size,
+                'errors': None,
+            })
         return Response({
             'success': True,
             'message': 'Data retrieved successfully.',
@@ -16,19 +16,19 @@ class IsOwnerOrReadOnly(BasePermission):
         if request.method in SAFE_METHODS:
             return True
         # For jobs, the owner is 'createdBy'
-        if hasattr(obj, 'createdBy'):
-            return obj.createdBy == request.user
+        if hasattr(obj, 'createdBy_id'):
+            return obj.createdBy_id == request.user.pk
         # For applications, the owner is 'applicant'
-        if hasattr(obj, 'applicant'):
-            return obj.applicant == request.user
+        if hasattr(obj, 'applicant_id'):
+            return obj.applicant_id == request.user.pk
         return False
 
 class IsJobOwner(BasePermission):
     """Permission to check if the user is the owner of the job."""
     def has_object_permission(self, request, view, obj):
-        return obj.createdBy == request.user
+        return obj.createdBy_id == request.user.pk
 
 class IsJobOwnerForApplication(BasePermission):
     """Permission to check if the user owns the job associated with the application."""
     def has_object_permission(self, request, view, obj):
-        return obj.job.createdBy == request.user
\ No newline at end of file
+        return obj.job.createdBy_id == request.user.pk
\ No newline at end of file
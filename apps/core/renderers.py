@@ -0,0 +1,32 @@
+from rest_framework.renderers import JSONRenderer
+
+from .middleware import timed
+
+try:
+    import orjson
+except ImportError: # Optional: without it responses are rendered by DRF's stdlib-json renderer
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Renders JSON with orjson, which encodes UUIDs and aware datetimes natively
+    (datetimes in UTC get a 'Z' suffix, like DRF). Anything orjson doesn't know
+    (lazy strings, Decimals, ...) goes through DRF's encoder, and U+2028/U+2029
+    are escaped as DRF does, so compact output matches JSONRenderer.
+    Indented output (the browsable API, `; indent=`) and a missing orjson fall back to JSONRenderer.
+    """
+    options = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed('render'):
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type, renderer_context):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
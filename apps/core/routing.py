@@ -0,0 +1,44 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.urls import URLPattern
+
+# With ASYNC_READ_VIEWS on (for ASGI servers such as uvicorn), GET/HEAD requests to the
+# read-heavy endpoints are served by async views on the same URLs, while every other method
+# still goes to the synchronous DRF view. Off, the URLconf is exactly the synchronous one.
+
+READ_METHODS = ('GET', 'HEAD')
+
+
+def async_reads(sync_view, async_view):
+    """Returns one view serving reads with `async_view` and everything else with `sync_view`."""
+    if not settings.ASYNC_READ_VIEWS:
+        return sync_view
+    write_view = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method in READ_METHODS:
+            return await async_view(request, *args, **kwargs)
+        return await write_view(request, *args, **kwargs)
+
+    view.csrf_exempt = True # As DRF's views are
+    for attr in ('cls', 'initkwargs', 'actions'): # Read by the OpenAPI schema generator
+        if hasattr(sync_view, attr):
+            setattr(view, attr, getattr(sync_view, attr))
+    return view
+
+
+def with_async_reads(patterns, async_viewset):
+    """
+    Router URL patterns with the GET actions listed in `async_viewset.async_actions`
+    served by `async_viewset` (same regexes, names and ViewSet initkwargs).
+    """
+    if not settings.ASYNC_READ_VIEWS:
+        return patterns
+    routed = []
+    for pattern in patterns:
+        actions = getattr(pattern.callback, 'actions', None) or {}
+        if actions.get('get') in async_viewset.async_actions:
+            async_view = async_viewset.as_view({'get': actions['get']}, **pattern.callback.initkwargs)
+            pattern = URLPattern(pattern.pattern, async_reads(pattern.callback, async_view), pattern.default_args, pattern.name)
+        routed.append(pattern)
+    return routed
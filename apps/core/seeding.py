@@ -0,0 +1,171 @@
+import contextlib
+import datetime
+import itertools
+import random
+import uuid
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from apps.applications.models import Application
+from apps.jobs import autocomplete, recommendations, search
+from apps.jobs.counters import reconcile_counters
+from apps.jobs.locations import resolve
+from apps.jobs.models import Job
+from apps.users.models import User
+
+# Synthetic but realistically shaped data for benchmarks: a few companies post most of
+# the jobs and a few jobs get most of the applications (Zipf-like), most jobs are Open,
+# and most applications never get past Applied.
+
+TITLES = [
+    'Backend Engineer', 'Frontend Developer', 'Data Scientist', 'Product Manager', 'DevOps Engineer',
+    'Mobile Developer', 'QA Analyst', 'Technical Writer', 'Sales Executive', 'Account Manager',
+    'Graphic Designer', 'Customer Support Agent', 'Machine Learning Engineer', 'Security Analyst',
+    'Site Reliability Engineer', 'Marketing Lead', 'HR Generalist', 'Finance Analyst',
+]
+SENIORITY = ['Junior', 'Mid-level', 'Senior', 'Lead', 'Principal', 'Intern']
+SKILLS = [
+    'python', 'django', 'react', 'kotlin', 'swift', 'postgres', 'kubernetes', 'terraform', 'excel',
+    'figma', 'pytorch', 'golang', 'rust', 'salesforce', 'aws', 'gcp', 'azure', 'selenium', 'spark',
+]
+LOCATIONS = ['Lagos', 'Abuja', 'Nairobi', 'Accra', 'Cairo', 'Kigali', 'Cape Town', 'Remote', 'London', 'Berlin']
+
+JOB_STATUS_WEIGHTS = {Job.JobStatus.OPEN: 80, Job.JobStatus.CLOSED: 12, Job.JobStatus.DRAFT: 8}
+APPLICATION_STATUS_WEIGHTS = {
+    Application.ApplicationStatus.APPLIED: 60,
+    Application.ApplicationStatus.REVIEWED: 20,
+    Application.ApplicationStatus.INTERVIEW: 8,
+    Application.ApplicationStatus.REJECTED: 10,
+    Application.ApplicationStatus.HIRED: 2,
+}
+ZIPF_EXPONENT = 0.8 # With 1M jobs the most popular one gets ~1.3% of all applications
+HISTORY_DAYS = 365
+
+
+def zipf_weights(count, exponent=ZIPF_EXPONENT):
+    return [1 / rank ** exponent for rank in range(1, count + 1)]
+
+
+@contextlib.contextmanager
+def explicit_timestamps(*fields):
+    """auto_now/auto_now_add overwrite any given value, even in bulk_create; seeded rows need their own."""
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def seed(companies, applicants, jobs, applications, batch_size=10_000, random_seed=42, prefix='seed', log=None):
+    """
+    Inserts the given volumes with bulk_create and returns the number of rows created per
+    model (applications are approximate: per-job counts are rounded and capped at the
+    number of applicants). Emails are `{prefix}-company{i}@example.com` etc., so use a
+    new prefix to seed the same database twice.
+    """
+    log = log or (lambda message: None)
+    rng = random.Random(random_seed)
+    now = timezone.now()
+
+    company_ids = _create_users(User.Role.COMPANY, companies, prefix, batch_size, log)
+    applicant_ids = _create_users(User.Role.APPLICANT, applicants, prefix, batch_size, log)
+
+    job_fields = [Job._meta.get_field('createdAt'), Job._meta.get_field('updatedAt')]
+    application_fields = [Application._meta.get_field('appliedAt'), Application._meta.get_field('updatedAt')]
+    with explicit_timestamps(*job_fields, *application_fields):
+        created_jobs = _create_jobs(rng, company_ids, jobs, now, batch_size, log)
+        published = [(job_id, created) for job_id, created, status in created_jobs if status != Job.JobStatus.DRAFT]
+        created_applications = _create_applications(rng, applicant_ids, published, applications, now, batch_size, log)
+
+    log('Reconciling job application counters...')
+    reconcile_counters(batch_size=batch_size)
+    autocomplete.rebuild() # bulk_create skipped the signals that keep these current
+    recommendations.rebuild()
+    return {'companies': len(company_ids), 'applicants': len(applicant_ids), 'jobs': len(created_jobs), 'applications': created_applications}
+
+
+def _create_users(role, count, prefix, batch_size, log):
+    password = make_password(None) # Unusable: seeded users can't log in with a password
+    ids = []
+    for start in range(0, count, batch_size):
+        users = [
+            User(id=uuid.uuid4(), email=f'{prefix}-{role}{i}@example.com', name=f'{role.title()} {i}', role=role, password=password, is_verified=True)
+            for i in range(start, min(start + batch_size, count))
+        ]
+        User.objects.bulk_create(users)
+        ids.extend(user.id for user in users)
+        log(f'{role}: {len(ids)}/{count}')
+    return ids
+
+
+def _create_jobs(rng, company_ids, count, now, batch_size, log):
+    # Company popularity ranks are shuffled so they don't follow creation order
+    companies = company_ids[:]
+    rng.shuffle(companies)
+    cumulative = list(itertools.accumulate(zipf_weights(len(companies))))
+    statuses, status_weights = zip(*JOB_STATUS_WEIGHTS.items())
+
+    created_jobs = []
+    for start in range(0, count, batch_size):
+        size = min(batch_size, count - start)
+        owners = rng.choices(companies, cum_weights=cumulative, k=size)
+        jobs = []
+        for owner, status in zip(owners, rng.choices(statuses, status_weights, k=size)):
+            title = f'{rng.choice(SENIORITY)} {rng.choice(TITLES)}'
+            created = now - datetime.timedelta(seconds=rng.uniform(0, HISTORY_DAYS * 86400))
+            description = f'We are hiring a {title.lower()} with experience in {", ".join(rng.sample(SKILLS, 4))}.'
+            location = rng.choice(LOCATIONS)
+            jobs.append(Job(
+                id=uuid.uuid4(), title=title, status=status, createdBy_id=owner, description=description,
+                location=location, place_id=resolve(location), createdAt=created, updatedAt=created,
+            ))
+        with transaction.atomic():
+            Job.objects.bulk_create(jobs)
+            # bulk_create skips model signals, so index explicitly
+            search.index_jobs((job.id, job.title, job.description, job.location) for job in jobs)
+        created_jobs.extend((job.id, job.createdAt, job.status) for job in jobs)
+        log(f'jobs: {len(created_jobs)}/{count}')
+    return created_jobs
+
+
+def _create_applications(rng, applicant_ids, jobs, total, now, batch_size, log):
+    """Spreads ~`total` applications over `jobs` ((id, createdAt) pairs) by Zipf popularity."""
+    if not jobs or not applicant_ids:
+        return 0
+    order = list(range(len(jobs)))
+    rng.shuffle(order) # Popularity rank -> job
+    weights = zipf_weights(len(order))
+    scale = total / sum(weights)
+    statuses, status_weights = zip(*APPLICATION_STATUS_WEIGHTS.items())
+
+    created = 0
+    batch = []
+    for rank, job_index in enumerate(order):
+        count = min(int(weights[rank] * scale + rng.random()), len(applicant_ids)) # Randomized rounding
+        if not count:
+            continue
+        job_id, job_created_at = jobs[job_index]
+        window = (now - job_created_at).total_seconds()
+        for applicant_index, status in zip(rng.sample(range(len(applicant_ids)), count), rng.choices(statuses, status_weights, k=count)):
+            applied = job_created_at + datetime.timedelta(seconds=rng.uniform(0, window))
+            batch.append(Application(
+                id=uuid.uuid4(), applicant_id=applicant_ids[applicant_index], job_id=job_id, status=status,
+                resumeLink=f'https://example.com/resumes/{applicant_index}.pdf',
+                coverLetter='I would love to join your team.' if rng.random() < 0.5 else None,
+                appliedAt=applied, updatedAt=applied,
+            ))
+            if len(batch) >= batch_size:
+                Application.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+                log(f'applications: {created}/~{total}')
+    Application.objects.bulk_create(batch)
+    created += len(batch)
+    log(f'applications: {created}/~{total}')
+    return created
+
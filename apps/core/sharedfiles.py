@@ -0,0 +1,46 @@
+import contextlib
+import fcntl
+import json
+import os
+import tempfile
+
+# Files through which gunicorn workers keep their in-process indexes in step (job
+# autocomplete, recommendations): writers hold an exclusive flock on the directory's
+# `lock` file, snapshots are replaced atomically and changes are appended to a log, one
+# JSON record per line, that every process reads on from where it stopped.
+
+
+@contextlib.contextmanager
+def exclusive_lock(directory):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, 'lock'), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def write_atomically(path, data):
+    """Replaces `path` with `data` (bytes) so readers see either the old or the new file."""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as temp_file:
+        temp_file.write(data)
+    os.replace(temp_path, path)
+
+
+def append_records(path, records):
+    with open(path, 'ab') as log_file:
+        log_file.write(b''.join(json.dumps(record).encode() + b'\n' for record in records))
+
+
+def read_records(path, offset):
+    """
+    The records appended to the log at `path` after byte `offset`, and the offset to read
+    from next time. Raises FileNotFoundError once the log has been replaced.
+    """
+    with open(path, 'rb') as log_file:
+        log_file.seek(offset)
+        data = log_file.read()
+    end = data.rfind(b'\n') + 1 # A writer may be halfway through the last line
+    return [json.loads(line) for line in data[:end].splitlines()], offset + end
@@ -0,0 +1,132 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .middleware import timed
+from .models import StoredResume
+from .utils import upload_to_cloudinary
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ResumeStorage:
+    """Base class for resume storage backends, selected with the RESUME_STORAGE setting."""
+
+    def save(self, name, path):
+        """Stores the local file at `path` under `name` and returns its public URL."""
+        raise NotImplementedError
+
+
+class LocalResumeStorage(ResumeStorage):
+    """Keeps resumes on the local filesystem under MEDIA_ROOT. Works offline."""
+
+    def save(self, name, path):
+        destination = os.path.join(settings.MEDIA_ROOT, name)
+        with timed('storage'):
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            shutil.move(path, destination)
+        # Stored in Application.resumeLink (a URLField) and emailed: must be absolute
+        return urljoin(settings.SITE_URL, f'{settings.MEDIA_URL}{name}')
+
+
+class CloudinaryResumeStorage(ResumeStorage):
+    """Uploads resumes to Cloudinary in chunks."""
+
+    def save(self, name, path):
+        public_id, _ = os.path.splitext(name)
+        url = upload_to_cloudinary(path, public_id=public_id, overwrite=True)
+        os.remove(path)
+        return url
+
+
+def get_resume_storage():
+    return import_string(settings.RESUME_STORAGE)()
+
+
+def stage_resume(owner_id, uploaded_file):
+    """
+    Streams an uploaded resume to the staging directory chunk by chunk, hashing it on the way.
+    Returns the owner's StoredResume for that content, reusing an existing one when the
+    applicant has uploaded the same file before.
+    """
+    os.makedirs(settings.RESUME_STAGING_DIR, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, staging_path = tempfile.mkstemp(dir=settings.RESUME_STAGING_DIR)
+    with os.fdopen(fd, 'wb') as staged:
+        for chunk in uploaded_file.chunks(CHUNK_SIZE):
+            digest.update(chunk)
+            staged.write(chunk)
+            size += len(chunk)
+    sha256 = digest.hexdigest()
+
+    existing = StoredResume.objects.filter(owner_id=owner_id, sha256=sha256).first()
+    if existing is not None and existing.status != StoredResume.UploadStatus.FAILED:
+        os.remove(staging_path)
+        return existing
+    if existing is not None:
+        # Retry a failed upload with the fresh copy, replacing the failed one's staged file
+        # (only once: a concurrent re-upload of the same file keeps its own copy)
+        now = timezone.now()
+        replaced = StoredResume.objects.filter(
+            pk=existing.pk, status=StoredResume.UploadStatus.FAILED, stagingPath=existing.stagingPath
+        ).update(stagingPath=staging_path, status=StoredResume.UploadStatus.PENDING, attempts=0, nextAttemptAt=now)
+        if not replaced:
+            os.remove(staging_path)
+            return StoredResume.objects.get(pk=existing.pk)
+        if existing.stagingPath:
+            try:
+                os.remove(existing.stagingPath)
+            except FileNotFoundError:
+                pass
+        existing.stagingPath, existing.status, existing.attempts, existing.nextAttemptAt = (
+            staging_path, StoredResume.UploadStatus.PENDING, 0, now
+        )
+        return existing
+
+    try:
+        with transaction.atomic():
+            return StoredResume.objects.create(
+                owner_id=owner_id, sha256=sha256, size=size,
+                fileName=os.path.basename(uploaded_file.name)[:255], stagingPath=staging_path,
+            )
+    except IntegrityError:
+        # The same file was staged concurrently by another request
+        os.remove(staging_path)
+        return StoredResume.objects.get(owner_id=owner_id, sha256=sha256)
+
+
+def upload_stored_resume(stored):
+    """
+    Moves a staged resume into the configured storage and fills in the link on every
+    application waiting for it.
+    """
+    _, extension = os.path.splitext(stored.fileName)
+    name = f'resumes/{stored.owner_id}/{stored.sha256}{extension.lower()}'
+    url = get_resume_storage().save(name, stored.stagingPath)
+
+    with transaction.atomic():
+        StoredResume.objects.filter(pk=stored.pk).update(
+            url=url, status=StoredResume.UploadStatus.STORED, stagingPath='', lastError=''
+        )
+        stored.applications.filter(resumeLink='').update(resumeLink=url, updatedAt=timezone.now())
+    stored.url, stored.status, stored.stagingPath = url, StoredResume.UploadStatus.STORED, ''
+    return stored
+
+
+def store_resume(owner_id, uploaded_file):
+    """
+    Stages and deduplicates a resume, then uploads it right away unless
+    RESUME_UPLOAD_DEFERRED is set, in which case `upload_pending_resumes` does it later.
+    """
+    stored = stage_resume(owner_id, uploaded_file)
+    if stored.status == StoredResume.UploadStatus.PENDING and not settings.RESUME_UPLOAD_DEFERRED:
+        stored = upload_stored_resume(stored)
+    return stored
@@ -0,0 +1,90 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from apps.users.models import User
+from apps.users.serializers import CustomTokenObtainPairSerializer
+
+# Shared bases for the apps' API tests.
+
+# The configured caches are shared stores (files under BASE_DIR/tmp by default): clearing
+# them between tests would wipe a development server's cache and un-revoke its tokens
+TEST_CACHES = {
+    **settings.CACHES,
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-default'},
+    settings.JWT_REVOCATION_CACHE: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-revocations'},
+}
+# Likewise for the indexes shared through files
+TEST_SHARED_DIR = tempfile.mkdtemp(prefix='job-portal-tests-')
+atexit.register(shutil.rmtree, TEST_SHARED_DIR, ignore_errors=True)
+
+
+@override_settings(
+    CACHES=TEST_CACHES, AUTOCOMPLETE_DIR=os.path.join(TEST_SHARED_DIR, 'autocomplete'),
+    RECOMMENDATION_INDEX_DIR=os.path.join(TEST_SHARED_DIR, 'recommendations'),
+)
+class BaseAPITestCase(APITestCase):
+    """
+    Starts every test with empty caches (process-local ones, not the configured shared
+    stores) and authenticates requests with a real JWT.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear() # Cached responses would leak between tests and skip the queries under test
+        caches[settings.JWT_REVOCATION_CACHE].clear()
+
+    def authenticate(self, user):
+        token = CustomTokenObtainPairSerializer.get_token(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    @staticmethod
+    def create_user(role, name, email=None, **fields):
+        email = email or f"{name.lower().replace(' ', '.')}@example.com"
+        return User.objects.create(email=email, name=name, role=role, is_verified=True, **fields)
+
+    @classmethod
+    def create_company(cls, name='Acme', email=None, **fields):
+        return cls.create_user(User.Role.COMPANY, name, email, **fields)
+
+    @classmethod
+    def create_applicant(cls, name='Jane Doe', email=None, **fields):
+        return cls.create_user(User.Role.APPLICANT, name, email, **fields)
+
+
+class QueryPlanTestMixin:
+    """
+    Runs an endpoint, then EXPLAINs the SQL it issued against the given table to check
+    that the planner picks one of the indexes declared for that query shape.
+    """
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # Tiny test tables would otherwise always be sequentially scanned
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute(f'EXPLAIN {sql}')
+            else:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+
+    def assertEndpointUsesIndex(self, url, table, index_names, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+
+        selects = [
+            q['sql'] for q in queries.captured_queries
+            if q['sql'].startswith('SELECT') and not q['sql'].startswith('SELECT COUNT(*)') and f'FROM "{table}"' in q['sql']
+        ]
+        self.assertTrue(selects, f'No SELECT on {table} for {url}')
+        plan = self.explain(selects[-1])
+        self.assertTrue(any(name in plan for name in index_names), f'{url} did not use {index_names}:\n{plan}')
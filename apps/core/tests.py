@@ -1,3 +1,675 @@
-from django.test import TestCase
+import datetime
+import decimal
+import io
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import uuid
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction
+
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, resolve
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from apps.applications.models import Application
+from apps.applications.views import (
+    ApplyForJobView, AsyncMyApplicationsView, BulkUpdateApplicationStatusView, MyApplicationsView,
+    UpdateApplicationStatusView,
+)
+from apps.jobs.counters import record_new_applications
+from apps.jobs.models import Job
+from apps.jobs import autocomplete, recommendations, urls as job_urls
+from apps.jobs.views import AsyncJobViewSet, JobViewSet
+from apps.core import metrics
+from apps.core.benchmark import TRANSACTION_STATEMENTS
+from apps.core.management.commands.send_queued_emails import Command as SendQueuedEmails
+from apps.core.models import IdempotencyRecord, OutboundEmail, StoredResume
+from apps.core.parsers import ORJSONParser
+from apps.core.renderers import ORJSONRenderer
+from apps.core.routing import async_reads, with_async_reads
+from apps.core.storage import CloudinaryResumeStorage, LocalResumeStorage, store_resume
+from apps.core.testing import BaseAPITestCase
+from apps.core.utils import queue_email
+
+
+class PortalTestCase(BaseAPITestCase):
+    """One company with five jobs, and five applicants who each applied to three of them."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = cls.create_company()
+        cls.applicants = [
+            cls.create_applicant(f'Applicant {i}', f'applicant{i}@example.com')
+            for i in range(5)
+        ]
+        cls.jobs = [
+            Job.objects.create(
+                title=f'Job {i}', description='Description', createdBy=cls.company, status=Job.JobStatus.OPEN,
+                location=None if i % 2 else 'Lagos',
+            )
+            for i in range(5)
+        ]
+        for applicant in cls.applicants:
+            for job in cls.jobs[:3]:
+                Application.objects.create(
+                    applicant=applicant, job=job, resumeLink='https://example.com/cv.pdf',
+                    coverLetter=None if job is cls.jobs[0] else 'Hire me',
+                )
+        for job in cls.jobs[:3]:
+            record_new_applications(job.id, Application.ApplicationStatus.APPLIED, count=len(cls.applicants))
+
+    def setUp(self):
+        super().setUp()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings_override = override_settings(
+            RESUME_STORAGE='apps.core.storage.LocalResumeStorage', RESUME_UPLOAD_DEFERRED=False,
+            MEDIA_ROOT=media, RESUME_STAGING_DIR=f'{media}/staging', SITE_URL='http://testserver',
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class QueryBudgetTests(PortalTestCase):
+    """
+    Every endpoint declares `query_budgets` on its view; these tests fail when a change
+    (typically an N+1 from a serializer field) makes a request exceed it. Pages hold
+    several rows from different users so per-row queries can't hide.
+    """
+
+    def assertWithinBudget(self, view_class, action, method, url, data=None, **kwargs):
+        budget = view_class.query_budgets[action]
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data, **kwargs)
+        self.assertLess(response.status_code, 300, response.content)
+        statements = [q['sql'] for q in queries.captured_queries if not q['sql'].startswith(TRANSACTION_STATEMENTS)]
+        self.assertLessEqual(
+            len(statements), budget,
+            f'{view_class.__name__}.{action} ran {len(statements)} queries (budget {budget}):\n' + '\n'.join(statements),
+        )
+        return response
+
+    def test_job_list(self):
+        self.authenticate(self.applicants[0])
+        self.assertWithinBudget(JobViewSet, 'list', 'get', '/api/jobs/')
+        self.assertWithinBudget(JobViewSet, 'list', 'get', '/api/jobs/', {'cursor': ''})
+        self.assertWithinBudget(JobViewSet, 'list', 'get', '/api/jobs/', {'q': 'job'})
+
+    def test_job_autocomplete(self):
+        self.authenticate(self.applicants[0])
+        self.addCleanup(autocomplete.reset)
+        autocomplete.reset()
+        self.assertWithinBudget(JobViewSet, 'autocomplete', 'get', '/api/jobs/autocomplete/', {'q': 'jo'})
+
+    def test_job_recommended(self):
+        self.authenticate(self.applicants[0])
+        self.addCleanup(recommendations.reset)
+        recommendations.reset()
+        call_command('build_recommendation_index', stdout=io.StringIO())
+        self.assertWithinBudget(JobViewSet, 'recommended', 'get', '/api/jobs/recommended/')
+
+    def test_job_retrieve(self):
+        self.authenticate(self.applicants[0])
+        self.assertWithinBudget(JobViewSet, 'retrieve', 'get', f'/api/jobs/{self.jobs[0].id}/')
+
+    def test_job_create_update_destroy(self):
+        self.authenticate(self.company)
+        self.assertWithinBudget(JobViewSet, 'create', 'post', '/api/jobs/', {'title': 'New', 'description': 'D'}, format='json')
+        self.assertWithinBudget(JobViewSet, 'partial_update', 'patch', f'/api/jobs/{self.jobs[4].id}/', {'title': 'Renamed'}, format='json')
+        self.assertWithinBudget(
+            JobViewSet, 'update', 'put', f'/api/jobs/{self.jobs[4].id}/',
+            {'title': 'Renamed', 'description': 'D', 'status': Job.JobStatus.OPEN}, format='json',
+        )
+        self.assertWithinBudget(JobViewSet, 'destroy', 'delete', f'/api/jobs/{self.jobs[0].id}/')
+
+    def test_my_jobs(self):
+        self.authenticate(self.company)
+        self.assertWithinBudget(JobViewSet, 'my_jobs', 'get', '/api/jobs/my-jobs/')
+
+    def test_applications_for_job(self):
+        self.authenticate(self.company)
+        url = f'/api/jobs/{self.jobs[0].id}/applications/'
+        self.assertWithinBudget(JobViewSet, 'applications_for_job', 'get', url)
+        self.assertWithinBudget(JobViewSet, 'applications_for_job', 'get', url, {'status': Application.ApplicationStatus.APPLIED})
+
+    def test_my_applications(self):
+        self.authenticate(self.applicants[0])
+        self.assertWithinBudget(MyApplicationsView, 'list', 'get', '/api/applications/my-applications/')
+
+    def test_update_application_status(self):
+        self.authenticate(self.company)
+        application = Application.objects.filter(job=self.jobs[0]).first()
+        self.assertWithinBudget(
+            UpdateApplicationStatusView, 'partial_update', 'patch',
+            f'/api/applications/{application.id}/update-status/', {'status': Application.ApplicationStatus.HIRED}, format='json',
+        )
+
+    def test_bulk_update_application_status(self):
+        self.authenticate(self.company)
+        ids = [str(application_id) for application_id in Application.objects.filter(job=self.jobs[0]).values_list('id', flat=True)]
+        self.assertWithinBudget(
+            BulkUpdateApplicationStatusView, 'post', 'post', '/api/applications/bulk-update-status/',
+            {'ids': ids, 'status': Application.ApplicationStatus.REJECTED}, format='json',
+        )
+
+    def test_apply(self):
+        self.authenticate(self.applicants[0])
+        self.assertWithinBudget(
+            ApplyForJobView, 'create', 'post', f'/api/jobs/{self.jobs[4].id}/apply/',
+            {'resume': SimpleUploadedFile('cv.pdf', b'%PDF-1.4'), 'coverLetter': 'Hello'}, format='multipart',
+        )
+
+
+class ApplyIdempotencyTests(PortalTestCase):
+    """Retries of an application carrying the same Idempotency-Key replay the first response."""
+
+    def apply(self, job, key='retry-1'):
+        return self.client.post(
+            f'/api/jobs/{job.id}/apply/', {'resume': SimpleUploadedFile('cv.pdf', b'%PDF-1.4'), 'coverLetter': 'Hello'},
+            format='multipart', HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_replays_the_response(self):
+        self.authenticate(self.applicants[0])
+        first = self.apply(self.jobs[4])
+        self.assertEqual(first.status_code, 201, first.content)
+        retry = self.apply(self.jobs[4])
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Application.objects.filter(job=self.jobs[4]).count(), 1)
+
+    def test_key_reused_for_another_job(self):
+        self.authenticate(self.applicants[0])
+        self.assertEqual(self.apply(self.jobs[4]).status_code, 201)
+        self.assertEqual(self.apply(self.jobs[3]).status_code, 422)
+        self.assertFalse(Application.objects.filter(job=self.jobs[3]).exists())
+
+    def test_expired_key_is_not_replayed(self):
+        self.authenticate(self.applicants[0])
+        self.assertEqual(self.apply(self.jobs[4]).status_code, 201)
+        IdempotencyRecord.objects.update(createdAt=timezone.now() - datetime.timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL + 1))
+        response = self.apply(self.jobs[4])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], ['Duplicate application.'])
+        self.assertFalse(IdempotencyRecord.objects.exists())
+
+    def test_duplicate_is_rejected_before_the_upload(self):
+        self.authenticate(self.applicants[0])
+        with mock.patch('apps.applications.views.store_resume') as store_resume:
+            response = self.apply(self.jobs[0], key='other')
+        self.assertEqual(response.status_code, 400)
+        store_resume.assert_not_called()
+
+    def test_concurrent_retry_replays_the_winner(self):
+        self.authenticate(self.applicants[0])
+        applicant, job = self.applicants[0], self.jobs[4]
+        winner = {'success': True, 'message': 'Application submitted successfully.', 'object': None, 'errors': None}
+
+        def store_resume_after_concurrent_retry(owner_id, uploaded_file):
+            # The other request commits its application and response while this one uploads
+            Application.objects.create(applicant=applicant, job=job, resumeLink='https://example.com/cv.pdf')
+            IdempotencyRecord.objects.create(
+                user=applicant, key='retry-1', path=f'/api/jobs/{job.id}/apply/', statusCode=201, response=winner,
+            )
+            return store_resume(owner_id, uploaded_file)
+
+        with mock.patch('apps.applications.views.store_resume', side_effect=store_resume_after_concurrent_retry):
+            response = self.apply(job)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
+        self.assertEqual(response.json(), winner)
+
+
+class ResumeStorageTests(PortalTestCase):
+    """Resumes are stored once per applicant and file, inline or by the `upload_pending_resumes` worker."""
+
+    def apply(self, job, applicant=None, content=b'%PDF-1.4 resume'):
+        self.authenticate(applicant or self.applicants[0])
+        response = self.client.post(
+            f'/api/jobs/{job.id}/apply/', {'resume': SimpleUploadedFile('CV.PDF', content)}, format='multipart',
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        return Application.objects.get(pk=response.json()['object']['id'])
+
+    def upload_pending(self, **options):
+        call_command('upload_pending_resumes', stdout=io.StringIO(), stderr=io.StringIO(), **options)
+
+    def test_same_file_is_stored_once_per_applicant(self):
+        first = self.apply(self.jobs[3])
+        second = self.apply(self.jobs[4])
+        other = self.apply(self.jobs[4], applicant=self.applicants[1])
+        self.assertEqual(first.storedResume_id, second.storedResume_id)
+        self.assertNotEqual(first.storedResume_id, other.storedResume_id)
+        self.assertEqual(first.resumeLink, second.resumeLink)
+        stored = first.storedResume
+        self.assertEqual(
+            first.resumeLink, f'http://testserver/media/resumes/{self.applicants[0].pk}/{stored.sha256}.pdf'
+        )
+        with open(f'{settings.MEDIA_ROOT}/resumes/{self.applicants[0].pk}/{stored.sha256}.pdf', 'rb') as stored_file:
+            self.assertEqual(stored_file.read(), b'%PDF-1.4 resume')
+
+    def test_deferred_upload(self):
+        with override_settings(RESUME_UPLOAD_DEFERRED=True):
+            application = self.apply(self.jobs[4])
+        self.assertEqual(application.resumeLink, '')
+        self.assertEqual(application.storedResume.status, StoredResume.UploadStatus.PENDING)
+
+        self.upload_pending()
+        application.refresh_from_db()
+        stored = application.storedResume
+        self.assertEqual(stored.status, StoredResume.UploadStatus.STORED)
+        self.assertEqual(stored.stagingPath, '')
+        self.assertEqual(application.resumeLink, stored.url)
+        self.assertTrue(application.resumeLink.startswith('http://testserver/media/resumes/'))
+
+    def test_failed_uploads_back_off_then_fail(self):
+        with override_settings(RESUME_UPLOAD_DEFERRED=True):
+            stored = self.apply(self.jobs[4]).storedResume
+        with mock.patch.object(LocalResumeStorage, 'save', side_effect=OSError('disk full')) as save:
+            self.upload_pending(max_attempts=2, backoff=30)
+            stored.refresh_from_db()
+            self.assertEqual((stored.status, stored.attempts, stored.lastError), ('Pending', 1, 'disk full'))
+            self.assertGreater(stored.nextAttemptAt, timezone.now() + datetime.timedelta(seconds=25))
+            self.upload_pending(max_attempts=2, backoff=30) # Not due yet
+            self.assertEqual(save.call_count, 1)
+
+            StoredResume.objects.filter(pk=stored.pk).update(nextAttemptAt=timezone.now())
+            self.upload_pending(max_attempts=2, backoff=30)
+        stored.refresh_from_db()
+        self.assertEqual((stored.status, stored.attempts), ('Failed', 2))
+
+        # Uploading the same file again retries it, with the fresh copy replacing the failed one
+        failed_copy = stored.stagingPath
+        with override_settings(RESUME_UPLOAD_DEFERRED=True):
+            self.apply(self.jobs[3])
+        stored.refresh_from_db()
+        self.assertNotEqual(stored.stagingPath, failed_copy)
+        self.assertEqual(sorted(os.listdir(settings.RESUME_STAGING_DIR)), [os.path.basename(stored.stagingPath)])
+        self.upload_pending()
+        stored.refresh_from_db()
+        self.assertEqual(stored.status, StoredResume.UploadStatus.STORED)
+        self.assertEqual(Application.objects.filter(storedResume=stored, resumeLink=stored.url).count(), 2)
+
+    def test_cloudinary_storage(self):
+        staged = tempfile.NamedTemporaryFile(dir=settings.MEDIA_ROOT, delete=False)
+        staged.close()
+        with mock.patch('apps.core.storage.upload_to_cloudinary', return_value='https://res.cloudinary.com/cv.pdf') as upload:
+            url = CloudinaryResumeStorage().save('resumes/1/abc.pdf', staged.name)
+        self.assertEqual(url, 'https://res.cloudinary.com/cv.pdf')
+        upload.assert_called_once_with(staged.name, public_id='resumes/1/abc', overwrite=True)
+        self.assertFalse(os.path.exists(staged.name))
+
+
+class FastListSerializerTests(PortalTestCase):
+    """The .values() list serializers must render exactly what the ModelSerializers render."""
+
+    def assertSameOutput(self, user, url, params=None):
+        self.authenticate(user)
+        with override_settings(FAST_LIST_SERIALIZERS=False):
+            cache.clear()
+            expected = self.client.get(url, params)
+        with override_settings(FAST_LIST_SERIALIZERS=True):
+            cache.clear()
+            actual = self.client.get(url, params)
+        self.assertEqual(expected.status_code, 200, expected.content)
+        self.assertEqual(actual.content, expected.content)
+        return actual
+
+    def test_job_lists(self):
+        self.assertSameOutput(self.applicants[0], '/api/jobs/')
+        self.assertSameOutput(self.applicants[0], '/api/jobs/', {'q': 'job', 'pageSize': 2})
+        response = self.assertSameOutput(self.applicants[0], '/api/jobs/', {'cursor': '', 'pageSize': 2})
+        self.assertSameOutput(self.applicants[0], '/api/jobs/', {'cursor': response.json()['nextCursor'], 'pageSize': 2})
+        self.assertSameOutput(self.company, '/api/jobs/my-jobs/')
+
+    def test_application_lists(self):
+        response = self.assertSameOutput(self.company, f'/api/jobs/{self.jobs[0].id}/applications/')
+        self.assertEqual(len(response.json()['object']), len(self.applicants))
+        self.assertSameOutput(self.company, f'/api/jobs/{self.jobs[1].id}/applications/', {'cursor': '', 'pageSize': 2})
+        self.assertSameOutput(self.applicants[0], '/api/applications/my-applications/')
+        self.assertSameOutput(self.applicants[0], '/api/applications/my-applications/', {'ordering': 'job__title'})
+        self.assertSameOutput(self.applicants[0], '/api/applications/my-applications/', {'cursor': ''})
+
+    def test_without_orjson(self):
+        with mock.patch('apps.core.serializers.NATIVE_JSON', False), mock.patch('apps.core.renderers.orjson', None):
+            self.assertSameOutput(self.applicants[0], '/api/jobs/')
+            self.assertSameOutput(self.applicants[0], '/api/applications/my-applications/')
+
+
+class CursorPaginationTests(PortalTestCase):
+    """Keyset pages walk the list newest first without gaps or repeats."""
+
+    def walk(self, url, params):
+        ids, cursor = [], ''
+        while cursor is not None:
+            body = self.client.get(url, {**params, 'cursor': cursor}).json()
+            ids.extend(item['id'] for item in body['object'])
+            cursor = body['nextCursor']
+        return ids, body
+
+    def test_pages_match_the_page_number_order(self):
+        self.authenticate(self.applicants[0])
+        expected = [job['id'] for job in self.client.get('/api/jobs/', {'pageSize': 100}).json()['object']]
+        ids, last_page = self.walk('/api/jobs/', {'pageSize': 2})
+        self.assertEqual(ids, expected)
+        self.assertEqual(last_page['totalSize'], len(self.jobs))
+        ids, last_page = self.walk('/api/jobs/', {'pageSize': 2, 'includeTotal': 'false'})
+        self.assertEqual(ids, expected)
+        self.assertIsNone(last_page['totalSize'])
+
+    def test_rejects_invalid_cursors_and_reordering_params(self):
+        self.authenticate(self.applicants[0])
+        self.assertEqual(self.client.get('/api/jobs/', {'cursor': 'not-a-cursor'}).status_code, 404)
+        response = self.client.get('/api/jobs/', {'cursor': '', 'q': 'job'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('q', str(response.json()['errors']))
+        response = self.client.get('/api/applications/my-applications/', {'cursor': '', 'ordering': 'job__title'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get('/api/jobs/', {'q': 'job', 'page': 1}).status_code, 200)
+
+
+class ORJSONRendererTests(APITestCase):
+    """orjson must render what DRF's JSONRenderer renders, and step aside when it can't."""
+
+    data = {
+        'success': True,
+        'message': gettext_lazy('Data retrieved successfully.'),
+        'object': [{
+            'id': uuid.UUID('6f1c2b4e-8a9d-4c3b-9e7f-1a2b3c4d5e6f'),
+            'createdAt': datetime.datetime(2024, 5, 1, 9, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            'appliedAt': datetime.datetime(2024, 5, 1, 9, 30, tzinfo=datetime.timezone.utc),
+            'title': 'Ingénieur \u2028 backend',
+            'salary': decimal.Decimal('1200.50'),
+            'location': None,
+        }],
+        'errors': None,
+    }
+
+    def test_matches_json_renderer(self):
+        self.assertEqual(ORJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_indent_and_missing_orjson_fall_back(self):
+        expected = JSONRenderer().render(self.data, 'application/json; indent=4')
+        self.assertEqual(ORJSONRenderer().render(self.data, 'application/json; indent=4'), expected)
+        with mock.patch('apps.core.renderers.orjson', None):
+            self.assertEqual(ORJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_parser(self):
+        body = '{"title": "Ingénieur", "ids": [1, 2]}'.encode()
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(body)), {'title': 'Ingénieur', 'ids': [1, 2]})
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"title": '))
+        with mock.patch('apps.core.parsers.orjson', None):
+            self.assertEqual(ORJSONParser().parse(io.BytesIO(body)), {'title': 'Ingénieur', 'ids': [1, 2]})
+
+
+class PerformanceMiddlewareTests(PortalTestCase):
+    """Requests report their timings in Server-Timing and slow ones are logged with their SQL."""
+
+    @override_settings(SERVER_TIMING_HEADER=True)
+    def test_server_timing_header(self):
+        self.authenticate(self.applicants[0])
+        response = self.client.get('/api/applications/my-applications/')
+        self.assertEqual(response.status_code, 200)
+        metrics = {metric.split(';')[0]: metric for metric in response['Server-Timing'].split(', ')}
+        self.assertIn('total', metrics)
+        self.assertIn('render', metrics)
+        self.assertIn('serialize', metrics)
+        self.assertIn('desc="3 queries"', metrics['db'])
+
+    def test_server_timing_header_is_opt_in(self):
+        self.authenticate(self.applicants[0])
+        self.assertNotIn('Server-Timing', self.client.get('/api/applications/my-applications/'))
+
+    @override_settings(SLOW_REQUEST_THRESHOLD_MS=0, SLOW_REQUEST_TOP_QUERIES=2)
+    def test_slow_request_log(self):
+        self.authenticate(self.company)
+        with self.assertLogs('apps.core.performance', 'WARNING') as logs:
+            self.client.get(f'/api/jobs/{self.jobs[0].id}/applications/')
+        record = logs.records[0].performance
+        self.assertEqual(record['view'], 'job-applications-for-job')
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record['userId'], str(self.company.id))
+        self.assertEqual(len(record['topQueries']), 2)
+        self.assertGreaterEqual(record['topQueries'][0]['ms'], record['topQueries'][1]['ms'])
+        self.assertIn('SELECT', record['topQueries'][0]['sql'])
+
+    @override_settings(PERFORMANCE_INSTRUMENTATION=False, SLOW_REQUEST_THRESHOLD_MS=0)
+    def test_disabled(self):
+        self.authenticate(self.applicants[0])
+        with self.assertNoLogs('apps.core.performance'):
+            response = self.client.get('/api/jobs/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Server-Timing', response)
+
+
+class EmailOutboxTests(BaseAPITestCase):
+    """The outbox worker sends each due email once, leases what it works on and backs off on failures."""
+
+    def send(self, **options):
+        out = io.StringIO()
+        call_command('send_queued_emails', stdout=out, stderr=io.StringIO(), **options)
+        return out.getvalue()
+
+    def test_sends_due_emails(self):
+        queue_email('Welcome', 'Hello', ['a@example.com'])
+        queue_email('Update', 'Hi', ['b@example.com'])
+        later = queue_email('Later', 'Soon', ['c@example.com'])
+        OutboundEmail.objects.filter(pk=later.pk).update(nextAttemptAt=timezone.now() + datetime.timedelta(hours=1))
+        self.assertIn('Sent 2 emails', self.send(batch_size=1))
+        self.assertEqual(sorted(message.subject for message in mail.outbox), ['Update', 'Welcome'])
+        self.assertEqual(OutboundEmail.objects.filter(status='Sent', attempts=1).exclude(sentAt=None).count(), 2)
+        self.assertEqual(OutboundEmail.objects.get(pk=later.pk).status, 'Pending')
+
+    def test_claimed_emails_are_leased(self):
+        email = queue_email('Welcome', 'Hello', ['a@example.com'])
+        self.assertEqual(SendQueuedEmails().claim_batch(10, lease=300), [email])
+        self.assertEqual(SendQueuedEmails().claim_batch(10, lease=300), []) # Another worker skips it
+        OutboundEmail.objects.filter(pk=email.pk).update(nextAttemptAt=timezone.now()) # The lease ran out
+        self.assertEqual(SendQueuedEmails().claim_batch(10, lease=300), [email])
+
+    def test_workers_reading_the_same_rows_claim_each_once(self):
+        queue_email('Welcome', 'Hello', ['a@example.com'])
+        stale = list(OutboundEmail.objects.all()) # Read by a second worker before the first one claims
+        self.assertEqual(len(SendQueuedEmails().claim_batch(10, lease=300)), 1)
+        self.assertEqual(SendQueuedEmails().lease(stale, timezone.now() + datetime.timedelta(seconds=300)), [])
+
+    def test_failures_back_off_then_fail(self):
+        email = queue_email('Welcome', 'Hello', ['a@example.com'])
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('SMTP down')):
+            self.send(max_attempts=2, backoff=30)
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts, email.lastError), ('Pending', 1, 'SMTP down'))
+            self.assertGreater(email.nextAttemptAt, timezone.now() + datetime.timedelta(seconds=25))
+            OutboundEmail.objects.filter(pk=email.pk).update(nextAttemptAt=timezone.now())
+            self.send(max_attempts=2, backoff=30)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('Failed', 2))
+        self.assertIn('Sent 0 emails', self.send())
+
+    def test_queued_email_is_rolled_back_with_its_transaction(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            queue_email('Welcome', 'Hello', ['a@example.com'])
+            raise RuntimeError('the change failed')
+        self.assertFalse(OutboundEmail.objects.exists())
+
+
+class MetricsTests(PortalTestCase):
+    """/metrics sums every worker's request and cache metrics and reports the queues."""
+
+    def setUp(self):
+        super().setUp()
+        metrics_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, metrics_dir, ignore_errors=True)
+        settings_override = override_settings(METRICS_DIR=metrics_dir, METRICS_TOKEN='secret')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # Each test starts from an empty process and directory
+        patcher = mock.patch('apps.core.metrics._process', metrics._Process())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def scrape(self):
+        # A client of its own: the test client may carry a user's JWT
+        response = self.client_class().get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode().splitlines()
+
+    def test_request_and_cache_metrics(self):
+        self.authenticate(self.applicants[0])
+        self.client.get('/api/jobs/')
+        self.client.get('/api/jobs/')
+        self.client.get(f'/api/jobs/{uuid.uuid4()}/')
+
+        lines = self.scrape()
+        self.assertIn('http_requests_total{route="job-list",status="200"} 2', lines)
+        self.assertIn('http_requests_total{route="job-detail",status="404"} 1', lines)
+        self.assertIn('http_request_duration_seconds_count{route="job-list",status="200"} 2', lines)
+        self.assertIn('http_request_duration_seconds_bucket{route="job-list",status="200",le="+Inf"} 2', lines)
+        self.assertIn('http_request_db_queries_bucket{route="job-list",le="2.0"} 2', lines)
+        self.assertIn('cache_requests_total{cache="job_list",result="hit"} 1', lines)
+        self.assertIn('cache_hit_ratio{cache="job_list"} 0.5', lines)
+        self.assertIn('# TYPE http_request_duration_seconds histogram', lines)
+
+    def write_worker_file(self, pid, requests):
+        with open(f'{settings.METRICS_DIR}/{pid}-1.json', 'w') as worker_file:
+            json.dump({
+                'counters': [['http_requests_total', {'route': 'job-list', 'status': '200'}, requests]],
+                'histograms': [],
+            }, worker_file)
+
+    def test_aggregates_worker_files(self):
+        self.write_worker_file(os.getppid(), 5) # A running worker's flushed totals
+        self.authenticate(self.applicants[0])
+        self.client.get('/api/jobs/')
+        self.assertIn('http_requests_total{route="job-list",status="200"} 6', self.scrape())
+
+    def test_folds_exited_workers_into_one_file(self):
+        exited = subprocess.Popen(['true'])
+        exited.wait()
+        self.write_worker_file(exited.pid, 5)
+        self.write_worker_file(os.getppid(), 1)
+        self.assertIn('http_requests_total{route="job-list",status="200"} 6', self.scrape())
+        self.assertEqual(
+            sorted(os.listdir(settings.METRICS_DIR)),
+            sorted(['exited.json', 'lock', f'{os.getppid()}-1.json', f'{metrics._process.name}.json']),
+        )
+        # A later exit adds to the folded totals
+        self.write_worker_file(exited.pid, 2)
+        self.assertIn('http_requests_total{route="job-list",status="200"} 8', self.scrape())
+
+    def test_queue_depths(self):
+        queue_email('Subject', 'Body', ['someone@example.com'])
+        lines = self.scrape()
+        self.assertIn('email_outbox_depth{status="Pending"} 1', lines)
+        self.assertIn('email_outbox_depth{status="Failed"} 0', lines)
+        self.assertIn('resume_upload_queue_depth 0', lines)
+
+    def test_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        with override_settings(METRICS_TOKEN=None):
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+            with override_settings(DEBUG=True):
+                self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    @override_settings(PERFORMANCE_INSTRUMENTATION=False)
+    def test_recorded_without_performance_instrumentation(self):
+        self.authenticate(self.applicants[0])
+        self.client.get('/api/jobs/')
+        self.assertIn('http_requests_total{route="job-list",status="200"} 1', self.scrape())
+
+
+class AsyncURLConf:
+    """The project's URLs with ASYNC_READ_VIEWS on (built in AsyncReadViewTests.setUpClass)."""
+    urlpatterns = []
+
+
+class AsyncReadViewTests(PortalTestCase):
+    """The async read views must answer exactly as the sync ones, and hand writes to them."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with override_settings(ASYNC_READ_VIEWS=True):
+            AsyncURLConf.urlpatterns = [
+                path('api/jobs/', include(with_async_reads(job_urls.router.urls, AsyncJobViewSet))),
+                path(
+                    'api/applications/my-applications/',
+                    async_reads(MyApplicationsView.as_view(), AsyncMyApplicationsView.as_view()), name='my-applications',
+                ),
+                path('', include('job_portal.urls')),
+            ]
+
+    def assertSameResponse(self, user, url, params=None, **headers):
+        self.authenticate(user)
+        cache.clear()
+        expected = self.client.get(url, params, **headers)
+        cache.clear()
+        with override_settings(ROOT_URLCONF=AsyncURLConf):
+            self.assertTrue(iscoroutinefunction(resolve(url).func))
+            actual = self.client.get(url, params, **headers)
+        self.assertEqual(actual.status_code, expected.status_code)
+        self.assertEqual(actual.content, expected.content)
+        self.assertEqual(actual.get('ETag'), expected.get('ETag'))
+        return actual
+
+    def test_job_list_and_detail(self):
+        self.assertSameResponse(self.applicants[0], '/api/jobs/')
+        self.assertSameResponse(self.applicants[0], '/api/jobs/', {'location': 'lagos', 'pageSize': 2, 'page': 2})
+        self.assertSameResponse(self.applicants[0], '/api/jobs/', {'page': 9})
+        response = self.assertSameResponse(self.applicants[0], '/api/jobs/', {'cursor': '', 'pageSize': 2})
+        self.assertSameResponse(self.applicants[0], '/api/jobs/', {'cursor': response.json()['nextCursor'], 'pageSize': 2})
+        self.assertSameResponse(self.company, '/api/jobs/', {'q': 'job'})
+        self.assertSameResponse(self.company, '/api/jobs/', {'q': 'job', 'cursor': ''})
+        self.assertSameResponse(self.company, '/api/jobs/', {'facets': 'status,companyName', 'pageSize': 2})
+        self.assertSameResponse(self.applicants[0], '/api/jobs/', {'facets': 'location'})
+        self.assertSameResponse(self.applicants[0], '/api/jobs/', {'near': '6.5,3.4', 'radius': '100'})
+        self.assertSameResponse(self.applicants[0], '/api/jobs/', {'near': 'lagos'})
+        response = self.assertSameResponse(self.applicants[0], f'/api/jobs/{self.jobs[0].id}/')
+        self.assertSameResponse(self.applicants[0], f'/api/jobs/{self.jobs[0].id}/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertSameResponse(self.applicants[0], f'/api/jobs/{uuid.uuid4()}/')
+        self.assertSameResponse(self.applicants[0], '/api/jobs/not-a-uuid/')
+
+    def test_applications(self):
+        self.assertSameResponse(self.company, f'/api/jobs/{self.jobs[0].id}/applications/')
+        self.assertSameResponse(self.company, f'/api/jobs/{self.jobs[1].id}/applications/', {'cursor': '', 'status': 'Applied'})
+        self.assertSameResponse(self.applicants[0], f'/api/jobs/{self.jobs[0].id}/applications/')
+        response = self.assertSameResponse(self.applicants[0], '/api/applications/my-applications/', {'ordering': 'job__title'})
+        self.assertSameResponse(
+            self.applicants[0], '/api/applications/my-applications/', {'ordering': 'job__title'},
+            HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        self.assertSameResponse(self.company, '/api/applications/my-applications/')
+
+    def test_unauthenticated(self):
+        with override_settings(ROOT_URLCONF=AsyncURLConf):
+            response = self.client.get('/api/jobs/')
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(response.json()['success'])
+
+    def test_writes_use_sync_views(self):
+        self.authenticate(self.company)
+        with override_settings(ROOT_URLCONF=AsyncURLConf):
+            response = self.client.post('/api/jobs/', {'title': 'Async', 'description': 'Posted'}, format='json')
+            self.assertEqual(response.status_code, 200, response.content)
+            response = self.client.patch(f'/api/jobs/{self.jobs[4].id}/', {'status': 'Closed'}, format='json')
+            self.assertEqual(response.status_code, 200, response.content)
+        self.assertTrue(Job.objects.filter(title='Async').exists())
@@ -1,23 +1,87 @@
+from datetime import timedelta
+
 import cloudinary.uploader
-from django.core.mail import send_mail
 from django.conf import settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
 from django.core.signing import TimestampSigner, SignatureExpired, BadSignature
 from rest_framework.reverse import reverse
 
-def upload_to_cloudinary(file_obj):
+from .middleware import timed
+from .models import OutboundEmail, IdempotencyRecord
+
+def upload_to_cloudinary(file_obj, **options):
     """
-    Uploads a file to Cloudinary and returns the secure URL.
+    Uploads a file (path or file object) to Cloudinary in chunks and returns the secure URL.
     """
     try:
-        upload_result = cloudinary.uploader.upload(file_obj)
+        with timed('cloudinary'):
+            upload_result = cloudinary.uploader.upload_large(
+                file_obj, resource_type='auto', chunk_size=settings.CLOUDINARY_UPLOAD_CHUNK_SIZE, **options
+            )
         return upload_result['secure_url']
     except Exception as e:
         # Handle exceptions, maybe log them
         raise e
 
+def build_email(subject, message, recipient_list, from_email=None):
+    """Returns an unsaved outbox email, for queue_emails()."""
+    return OutboundEmail(
+        subject=subject,
+        message=message,
+        fromEmail=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipient_list),
+    )
+
+def queue_email(subject, message, recipient_list, from_email=None):
+    """
+    Adds an email to the outbox instead of sending it inline. Call it inside the
+    transaction that makes the change, so the email exists if and only if the change does.
+    """
+    email = build_email(subject, message, recipient_list, from_email)
+    email.save()
+    return email
+
+def queue_emails(emails):
+    """Adds several build_email() emails to the outbox with one INSERT per EMAIL_OUTBOX_BATCH_SIZE."""
+    return OutboundEmail.objects.bulk_create(emails, batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE)
+
+def get_idempotent_response(request):
+    """
+    Returns the stored response for the request's `Idempotency-Key` header, or None
+    when there is no key or it hasn't been used yet. Keys expire after IDEMPOTENCY_KEY_TTL.
+    """
+    key = request.headers.get('Idempotency-Key')
+    if not key:
+        return None
+    if len(key) > 255:
+        return Response({"success": False, "message": "Idempotency-Key is too long.", "object": None, "errors": ["Idempotency-Key must be at most 255 characters."]}, status=status.HTTP_400_BAD_REQUEST)
+
+    record = IdempotencyRecord.objects.filter(user_id=request.user.pk, key=key).first()
+    if record is None:
+        return None
+    if record.createdAt < timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL):
+        record.delete()
+        return None
+    if record.path != request.path:
+        return Response({"success": False, "message": "Idempotency-Key was already used for a different request.", "object": None, "errors": ["Idempotency-Key reused."]}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    return Response(record.response, status=record.statusCode, headers={'Idempotent-Replayed': 'true'})
+
+def save_idempotent_response(request, data, status_code):
+    """
+    Stores a response body under the request's `Idempotency-Key` header, if any.
+    Call it inside the transaction that performs the change.
+    """
+    key = request.headers.get('Idempotency-Key')
+    if key:
+        IdempotencyRecord.objects.create(
+            user_id=request.user.pk, key=key, path=request.path, statusCode=status_code, response=data
+        )
+
 def send_verification_email(user, request):
     """
-    Generates a verification token and sends it to the user's email.
+    Generates a verification token and queues it for delivery to the user's email.
     """
     signer = TimestampSigner()
     token = signer.sign(str(user.id))
@@ -33,4 +97,4 @@ def send_verification_email(user, request):
         'This link will expire in 1 hour.\n\n'
         'Thanks,\nThe Job Portal Team'
     )
-    send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [user.email])
\ No newline at end of file
+    queue_email(subject, message, [user.email])
\ No newline at end of file
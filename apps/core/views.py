@@ -1,3 +1,42 @@
-from django.shortcuts import render
+import hmac
 
-# Create your views here.
+from django.conf import settings
+from django.db.models import Count
+from django.http import HttpResponse, HttpResponseForbidden
+
+from . import metrics
+from .models import OutboundEmail, StoredResume
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint: every worker's request/cache metrics plus queue depths read
+    from the database. METRICS_TOKEN must be sent as a Bearer token; without DEBUG the
+    endpoint stays closed until one is configured.
+    """
+    if settings.METRICS_TOKEN:
+        expected = f'Bearer {settings.METRICS_TOKEN}'
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), expected):
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        return HttpResponseForbidden('Set METRICS_TOKEN to enable /metrics.')
+
+    counters, histograms = metrics.collect()
+    gauges = {}
+    outbox = dict(OutboundEmail.objects.order_by().values_list('status').annotate(total=Count('id')))
+    for status in (OutboundEmail.EmailStatus.PENDING, OutboundEmail.EmailStatus.FAILED):
+        gauges[('email_outbox_depth', (('status', status),))] = outbox.get(status, 0)
+    gauges[('resume_upload_queue_depth', ())] = StoredResume.objects.filter(status=StoredResume.UploadStatus.PENDING).count()
+
+    lookups = {}
+    for (name, labels), value in counters.items():
+        if name == 'cache_requests_total':
+            labels = dict(labels)
+            hits, total = lookups.get(labels['cache'], (0, 0))
+            lookups[labels['cache']] = (hits + value * (labels['result'] == 'hit'), total + value)
+    for cache_name, (hits, total) in lookups.items():
+        gauges[('cache_hit_ratio', (('cache', cache_name),))] = round(hits / total, 4)
+
+    return HttpResponse(
+        metrics.render(counters, histograms, gauges), content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
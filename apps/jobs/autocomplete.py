@@ -0,0 +1,356 @@
+import bisect
+import glob
+import heapq
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from apps.core import sharedfiles
+
+# Search-box suggestions: the titles and company names of Open jobs, matched by the
+# prefix of any of their words, most common first. gunicorn workers share them through
+# AUTOCOMPLETE_DIR (required, system check jobs.E002): snapshot.json holds the whole index
+# and the changes-<n>.log it names one JSON line per change since (see record_changes()).
+# Writers append under an exclusive flock; every AUTOCOMPLETE_COMPACT_EVERY lines the writer
+# folds the log into a new snapshot and starts a fresh log.
+#
+# Each process reads them into an immutable Suggestions: a sorted list of (normalized
+# words, key) entries, plus the best keys of every prefix of up to TOP_PREFIX_LENGTH
+# characters, which would otherwise scan a large share of the entries. Lookups take no
+# lock: they stat the log and, when it has grown, one thread applies the new lines to a
+# copy and swaps it in while the others keep reading the current one.
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+TITLE, COMPANY = 't', 'c'
+KINDS = {TITLE: 'title', COMPANY: 'company'}
+MEMO_SIZE = 10000 # Remembered lookups of longer prefixes, per Suggestions
+TOP_PREFIX_LENGTH = 3 # Prefixes up to this many characters have their best keys precomputed
+
+
+def normalize(text):
+    """Lower-cased words without accents: 'Senior  Back-End Engineer' -> 'senior back end engineer'."""
+    text = text or ''
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(TOKEN_RE.findall(text.casefold()))
+
+
+def _word_suffixes(normalized):
+    words = normalized.split(' ')
+    return {' '.join(words[index:]) for index in range(len(words))}
+
+
+def _normalized(key, label):
+    return key[1] if key[0] == TITLE else normalize(label) # Title keys are already normalized
+
+
+def _short_prefixes(normalized):
+    return {suffix[:length] for suffix in _word_suffixes(normalized) for length in range(1, min(len(suffix), TOP_PREFIX_LENGTH) + 1)}
+
+
+class Suggestions:
+    """
+    The suggestions at one point of the log. Never modified once published: changed()
+    returns a new one, so lookups need no lock.
+    """
+
+    def __init__(self, counts, labels, entries=None, top=None):
+        self.counts = counts # key -> open jobs; keys are (TITLE, normalized title) or (COMPANY, company id)
+        self.labels = labels # key -> the title or company name shown
+        if entries is None:
+            entries = sorted((suffix, key) for key, label in labels.items() for suffix in _word_suffixes(_normalized(key, label)))
+        self.entries = entries # sorted (word suffix, key)
+        self.top = self._top_lists() if top is None else top # short prefix -> best keys (AUTOCOMPLETE_MAX_LIMIT)
+        self.memo = {} # (prefix, limit) -> suggestions
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        counts, labels = {}, {}
+        for label, count in snapshot['titles']:
+            key = (TITLE, normalize(label))
+            labels.setdefault(key, label)
+            counts[key] = counts.get(key, 0) + count
+        for company_id, name, count in snapshot['companies']:
+            counts[(COMPANY, company_id)], labels[(COMPANY, company_id)] = count, name
+        return cls(counts, labels)
+
+    def _rank(self, key):
+        return -self.counts[key], self.labels[key]
+
+    def _best(self, keys, limit):
+        return tuple(heapq.nsmallest(limit, keys, key=self._rank))
+
+    def _scan(self, prefix):
+        keys = set()
+        for suffix, key in self.entries[bisect.bisect_left(self.entries, (prefix,)):]:
+            if not suffix.startswith(prefix):
+                break
+            keys.add(key)
+        return keys
+
+    def _top_lists(self):
+        """Every key, best first, appended to the lists of its short prefixes until they are full."""
+        top, limit = {}, settings.AUTOCOMPLETE_MAX_LIMIT
+        for key in sorted(self.counts, key=self._rank):
+            for prefix in _short_prefixes(_normalized(key, self.labels[key])):
+                keys = top.setdefault(prefix, [])
+                if len(keys) < limit:
+                    keys.append(key)
+        return {prefix: tuple(keys) for prefix, keys in top.items()}
+
+    def lookup(self, prefix, limit):
+        memo_key = (prefix, limit)
+        suggestions = self.memo.get(memo_key)
+        if suggestions is None:
+            if len(prefix) <= TOP_PREFIX_LENGTH:
+                best = self.top.get(prefix, ())[:limit]
+            else:
+                best = self._best(self._scan(prefix), limit)
+            suggestions = [{'type': KINDS[key[0]], 'value': self.labels[key], 'jobCount': self.counts[key]} for key in best]
+            if len(self.memo) >= MEMO_SIZE:
+                self.memo.clear()
+            self.memo[memo_key] = suggestions
+        return suggestions
+
+    def changed(self, changes):
+        """A new Suggestions with `changes` (log records) applied; entries and top lists are updated, not rebuilt."""
+        counts, labels, entries = dict(self.counts), dict(self.labels), list(self.entries)
+
+        def insert(key):
+            for suffix in _word_suffixes(_normalized(key, labels[key])):
+                bisect.insort(entries, (suffix, key))
+
+        def remove(key):
+            for suffix in _word_suffixes(_normalized(key, labels[key])):
+                index = bisect.bisect_left(entries, (suffix, key))
+                if index < len(entries) and entries[index] == (suffix, key):
+                    del entries[index]
+
+        touched, prefixes = set(), set()
+        for change in changes:
+            if change[0] == 'rename':
+                key, label, delta = (COMPANY, change[1]), change[2], 0
+            elif change[0] == TITLE:
+                key, label, delta = (TITLE, normalize(change[1])), change[1], change[2]
+            else:
+                key, label, delta = (COMPANY, change[1]), change[2], change[3]
+            if key in labels:
+                prefixes |= _short_prefixes(_normalized(key, labels[key]))
+            count = counts.get(key, 0) + delta
+            if key in counts and (count <= 0 or (change[0] == 'rename' and label != labels[key])):
+                remove(key)
+            if count > 0:
+                if key not in counts or change[0] == 'rename' and label != labels[key]:
+                    labels[key] = label
+                    insert(key)
+                counts[key] = count
+                prefixes |= _short_prefixes(_normalized(key, label))
+            else:
+                counts.pop(key, None)
+                labels.pop(key, None)
+            touched.add(key)
+
+        suggestions = Suggestions(counts, labels, entries, dict(self.top))
+        limit = settings.AUTOCOMPLETE_MAX_LIMIT
+        for prefix in prefixes:
+            old = self.top.get(prefix, ())
+            matching = {key for key in touched if key in counts and prefix in _short_prefixes(_normalized(key, labels[key]))}
+            # A full list that lost or demoted a key may now include one it left out: rescan
+            if len(old) >= limit and any(
+                key in touched and (key not in matching or suggestions._rank(key) > self._rank(key)) for key in old
+            ):
+                keys = suggestions._scan(prefix)
+            else:
+                keys = {key for key in old if key not in touched} | matching
+            if keys:
+                suggestions.top[prefix] = suggestions._best(keys, limit)
+            else:
+                suggestions.top.pop(prefix, None)
+        return suggestions
+
+
+class AutocompleteIndex:
+    """One process's copy of the shared suggestions and how far it has read their log."""
+
+    def __init__(self):
+        self.lock = threading.Lock() # Held by the one thread loading or applying changes
+        self.suggestions = None
+        self.log_name = None # The shared log this index has read up to `offset` (`lines` lines)
+        self.offset = self.lines = 0
+
+    def load(self, snapshot, log_path):
+        """Replaces the suggestions with `snapshot` plus the changes already in its log."""
+        self.log_name = snapshot['log']
+        self.offset = self.lines = 0
+        suggestions = Suggestions.from_snapshot(snapshot)
+        changes, self.offset = sharedfiles.read_records(log_path, 0)
+        self.lines = len(changes)
+        self.suggestions = suggestions.changed(changes) if changes else suggestions
+
+    def read_changes(self, log_path):
+        """Applies the changes appended to the log since the last call (FileNotFoundError once replaced)."""
+        changes, self.offset = sharedfiles.read_records(log_path, self.offset)
+        if changes:
+            self.suggestions = self.suggestions.changed(changes)
+        self.lines += len(changes)
+
+
+_index = AutocompleteIndex()
+os.register_at_fork(after_in_child=lambda: globals().update(_index=AutocompleteIndex()))
+
+
+def _path(name):
+    return os.path.join(settings.AUTOCOMPLETE_DIR, name)
+
+
+def _open_jobs_snapshot():
+    from .models import Job
+    open_jobs = Job.objects.filter(status=Job.JobStatus.OPEN).order_by()
+    titles = {}
+    for row in open_jobs.values('title').annotate(count=Count('pk')):
+        label, count = titles.get(normalize(row['title']), (row['title'], 0))
+        titles[normalize(row['title'])] = (label, count + row['count'])
+    return {
+        'titles': list(titles.values()),
+        'companies': [
+            (str(row['createdBy_id']), row['createdBy__name'], row['count'])
+            for row in open_jobs.values('createdBy_id', 'createdBy__name').annotate(count=Count('pk'))
+        ],
+    }
+
+
+def _write_snapshot(snapshot):
+    """
+    Replaces the shared index with `snapshot` and a new, empty log. Logs are never reused,
+    so a process still reading the previous one finds it gone and reloads. Call with the lock held.
+    """
+    snapshot['log'] = f'changes-{time.time_ns()}.log'
+    open(_path(snapshot['log']), 'wb').close()
+    sharedfiles.write_atomically(_path('snapshot.json'), json.dumps(snapshot).encode())
+    for old_log in glob.glob(_path('changes-*.log')):
+        if os.path.basename(old_log) != snapshot['log']:
+            os.remove(old_log)
+
+
+def _load_shared():
+    """Call with the lock held."""
+    if not os.path.exists(_path('snapshot.json')):
+        _write_snapshot(_open_jobs_snapshot())
+    with open(_path('snapshot.json')) as snapshot_file:
+        snapshot = json.load(snapshot_file)
+    _index.load(snapshot, _path(snapshot['log']))
+
+
+def _catch_up(locked=False):
+    """Brings this process's suggestions up to date. Call with _index.lock held."""
+    if _index.suggestions is not None:
+        try:
+            _index.read_changes(_path(_index.log_name))
+            return
+        except FileNotFoundError: # Compacted or rebuilt by another process
+            pass
+    if locked:
+        _load_shared()
+    else:
+        with sharedfiles.exclusive_lock(settings.AUTOCOMPLETE_DIR):
+            _load_shared()
+
+
+def _behind():
+    """Whether the log has grown or been replaced since this process last read it (one stat())."""
+    if _index.suggestions is None:
+        return True
+    try:
+        return os.stat(_path(_index.log_name)).st_size != _index.offset
+    except FileNotFoundError:
+        return True
+
+
+def suggest(query, limit=None):
+    """Up to `limit` [{'type': 'title'|'company', 'value', 'jobCount'}] whose words start with `query`."""
+    prefix = normalize(query)
+    if not prefix:
+        return []
+    limit = min(limit or settings.AUTOCOMPLETE_LIMIT, settings.AUTOCOMPLETE_MAX_LIMIT)
+    index = _index
+    if _behind():
+        # Only a process with nothing to serve yet waits; otherwise one thread catches up
+        # while the others answer from the current suggestions
+        if index.lock.acquire(blocking=index.suggestions is None):
+            try:
+                _catch_up()
+            finally:
+                index.lock.release()
+    return index.suggestions.lookup(prefix, limit)
+
+
+def record_changes(removed=(), added=(), renamed=()):
+    """
+    Queues index changes for when the current transaction commits: `removed` and `added`
+    are (title, company id) pairs of Open jobs that stopped/started being listed, `renamed`
+    (company id, new name) pairs. Company names are looked up only for companies the
+    index does not list yet.
+    """
+    changes = []
+    for pairs, delta in ((removed, -1), (added, 1)):
+        for title, company_id in pairs:
+            changes.append([TITLE, title, delta])
+            changes.append([COMPANY, str(company_id), None, delta])
+    changes.extend(['rename', str(company_id), name] for company_id, name in renamed)
+    if changes:
+        transaction.on_commit(lambda: _publish(changes))
+
+
+def _publish(changes):
+    with _index.lock, sharedfiles.exclusive_lock(settings.AUTOCOMPLETE_DIR):
+        if not os.path.exists(_path('snapshot.json')):
+            return # The first lookup builds it from the database
+        _catch_up(locked=True)
+        _name_companies(changes)
+        sharedfiles.append_records(_path(_index.log_name), changes)
+        _catch_up(locked=True)
+        if _index.lines >= settings.AUTOCOMPLETE_COMPACT_EVERY:
+            _compact()
+
+
+def _name_companies(changes):
+    from apps.users.models import User
+    labels = _index.suggestions.labels
+    unknown = {change[1] for change in changes if change[0] == COMPANY and (COMPANY, change[1]) not in labels}
+    names = {str(pk): name for pk, name in User.objects.filter(pk__in=unknown).values_list('pk', 'name')} if unknown else {}
+    for change in changes:
+        if change[0] == COMPANY:
+            change[2] = labels.get((COMPANY, change[1])) or names.get(change[1], '')
+
+
+def _compact():
+    """Folds the log into a new snapshot. Call with both locks held and the index in sync."""
+    suggestions = _index.suggestions
+    _write_snapshot({
+        'titles': [(suggestions.labels[key], count) for key, count in suggestions.counts.items() if key[0] == TITLE],
+        'companies': [(key[1], suggestions.labels[key], count) for key, count in suggestions.counts.items() if key[0] == COMPANY],
+    })
+    _load_shared()
+
+
+def rebuild():
+    """Rebuilds the shared index from the database, e.g. after bulk writes that skipped record_changes()."""
+    with _index.lock, sharedfiles.exclusive_lock(settings.AUTOCOMPLETE_DIR):
+        _write_snapshot(_open_jobs_snapshot())
+        _load_shared()
+
+
+def reset():
+    """Forgets the shared index and this process's copy (tests); the next lookup rebuilds it."""
+    with _index.lock, sharedfiles.exclusive_lock(settings.AUTOCOMPLETE_DIR):
+        for name in glob.glob(_path('snapshot.json')) + glob.glob(_path('changes-*.log')):
+            os.remove(name)
+        _index.suggestions = None
@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.core import metrics
+
+# Response cache for the job data every non-company user sees alike (Open jobs only).
+# Keys embed versions instead of being deleted, so cached data that could be stale is
+# simply never read again and expires on its own:
+# - listings: a global version, bumped after every committed job write. It starts from
+#   time.time_ns(), so an evicted version can't restart at a number whose keys still hold old data;
+# - details: the job's updatedAt, which the view reads anyway for its ETag.
+# Works with any Django cache backend (locmem, file, ...). The `a`-prefixed functions are
+# the same for async views.
+
+LIST_VERSION_KEY = 'jobs:version:list'
+RESPONSE_PARAMS = ('page', 'pageSize', 'cursor', 'includeTotal', 'facets') # Non-filter parameters, kept verbatim
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+async def _aget_version(key):
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), None)
+        version = await cache.aget(key)
+    return version
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError: # Never read (or evicted): any fresh version will do
+        cache.set(key, time.time_ns(), None)
+
+
+def invalidate_job_listings():
+    """
+    Makes cached listings stale once the current transaction commits
+    (bumping earlier would let a concurrent request re-cache old rows).
+    """
+    transaction.on_commit(lambda: _bump(LIST_VERSION_KEY))
+
+
+def list_cache_key(query_params, filter_names):
+    """
+    Cache key for one listing page. Only filter, pagination and facet parameters count; filter
+    values are case-insensitive so they are lower-cased, and empty ones are dropped.
+    """
+    return f'jobs:list:{_get_version(LIST_VERSION_KEY)}:{_list_digest(query_params, filter_names)}'
+
+
+async def alist_cache_key(query_params, filter_names):
+    return f'jobs:list:{await _aget_version(LIST_VERSION_KEY)}:{_list_digest(query_params, filter_names)}'
+
+
+def _list_digest(query_params, filter_names):
+    params = []
+    for name in sorted(set(filter_names) | set(RESPONSE_PARAMS)):
+        value = query_params.get(name, '').strip()
+        if value:
+            params.append((name, value if name in RESPONSE_PARAMS else value.lower()))
+    return hashlib.md5(repr(params).encode()).hexdigest()
+
+
+def detail_cache_key(job_id, updated_at):
+    """Cache key for one job's detail response as of its `updatedAt`."""
+    return f'jobs:detail:{job_id}:{updated_at.timestamp()}'
+
+
+def get_or_compute(key, compute):
+    """
+    Returns the cached value for `key`, computing and caching it on a miss. Only one
+    caller computes a missing key at a time (single-flight): the others wait up to
+    JOB_CACHE_LOCK_WAIT seconds for its result before giving up and computing it themselves.
+    """
+    data = cache.get(key)
+    _record_lookup(key, data)
+    if data is not None:
+        return data
+
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, 1, settings.JOB_CACHE_LOCK_TIMEOUT):
+        deadline = time.monotonic() + settings.JOB_CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(0.02)
+            data = cache.get(key)
+            if data is not None:
+                return data
+        return compute()
+
+    try:
+        data = compute()
+        cache.set(key, data, settings.JOB_CACHE_TIMEOUT)
+    finally:
+        cache.delete(lock_key)
+    return data
+
+
+async def aget_or_compute(key, compute):
+    """get_or_compute() for async views: `compute` is a coroutine function."""
+    data = await cache.aget(key)
+    _record_lookup(key, data)
+    if data is not None:
+        return data
+
+    lock_key = f'{key}:lock'
+    if not await cache.aadd(lock_key, 1, settings.JOB_CACHE_LOCK_TIMEOUT):
+        deadline = time.monotonic() + settings.JOB_CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+            data = await cache.aget(key)
+            if data is not None:
+                return data
+        return await compute()
+
+    try:
+        data = await compute()
+        await cache.aset(key, data, settings.JOB_CACHE_TIMEOUT)
+    finally:
+        await cache.adelete(lock_key)
+    return data
+
+
+def _record_lookup(key, data):
+    cache_name = f'job_{key.split(":")[1]}' # job_list / job_detail
+    metrics.increment('cache_requests_total', cache=cache_name, result='miss' if data is None else 'hit')
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from apps.users.checks import PROCESS_LOCAL_CACHES
+
+
+@register(Tags.caches)
+def check_listing_cache(app_configs, **kwargs):
+    """
+    Job writes make cached listings stale by bumping a version in the default cache
+    (apps/jobs/cache.py): workers that keep their own copy would serve stale listings.
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend in PROCESS_LOCAL_CACHES:
+        return [Error(
+            f"The job listing cache needs a cache shared by all workers, but CACHES['default'] is {backend}.",
+            hint="Set CACHE_BACKEND to a file-based, database, Redis or Memcached cache.",
+            id='jobs.E001',
+        )]
+    return []
+
+
+@register
+def check_autocomplete_dir(app_configs, **kwargs):
+    """Workers keep their suggestions current through the files in AUTOCOMPLETE_DIR."""
+    if not settings.AUTOCOMPLETE_DIR:
+        return [Error(
+            "AUTOCOMPLETE_DIR is not set: each worker would only see its own job changes.",
+            hint="Point AUTOCOMPLETE_DIR at a directory every worker on the host can write to.",
+            id='jobs.E002',
+        )]
+    return []
+
+
+@register
+def check_recommendation_index_dir(app_configs, **kwargs):
+    """Workers memory-map the index that build_recommendation_index writes to RECOMMENDATION_INDEX_DIR."""
+    if not settings.RECOMMENDATION_INDEX_DIR:
+        return [Error(
+            "RECOMMENDATION_INDEX_DIR is not set: there is nowhere to build the job recommendation index.",
+            hint="Point RECOMMENDATION_INDEX_DIR at a directory every worker on the host can read, then run build_recommendation_index.",
+            id='jobs.E003',
+        )]
+    return []
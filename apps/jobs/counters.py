@@ -0,0 +1,86 @@
+from django.db.models import Count, F, Q
+
+from .models import Job
+
+# Application status -> Job counter field
+STATUS_COUNTER_FIELDS = {
+    'Applied': 'appliedCount',
+    'Reviewed': 'reviewedCount',
+    'Interview': 'interviewCount',
+    'Rejected': 'rejectedCount',
+    'Hired': 'hiredCount',
+}
+COUNTER_FIELDS = ['applicationCount', *STATUS_COUNTER_FIELDS.values()]
+
+
+def record_new_applications(job_id, status, count=1):
+    """Adds newly created applications to the job's total and per-status counters."""
+    field = STATUS_COUNTER_FIELDS[status]
+    Job.objects.filter(pk=job_id).update(
+        applicationCount=F('applicationCount') + count,
+        **{field: F(field) + count},
+    )
+
+
+def record_status_change(job_id, old_status, new_status, count=1):
+    """Moves `count` applications of a job from one status counter to another."""
+    if old_status == new_status:
+        return
+    old_field, new_field = STATUS_COUNTER_FIELDS[old_status], STATUS_COUNTER_FIELDS[new_status]
+    Job.objects.filter(pk=job_id).update(**{
+        old_field: F(old_field) - count,
+        new_field: F(new_field) + count,
+    })
+
+
+def record_status_changes(job_id, old_status_counts, new_status):
+    """
+    Moves applications of a job from several statuses to `new_status` with one UPDATE.
+    `old_status_counts` maps each old status to the number of applications leaving it.
+    """
+    changes = {}
+    for old_status, count in old_status_counts.items():
+        if old_status == new_status or not count:
+            continue
+        field = STATUS_COUNTER_FIELDS[old_status]
+        changes[field] = changes.get(field, 0) - count
+        new_field = STATUS_COUNTER_FIELDS[new_status]
+        changes[new_field] = changes.get(new_field, 0) + count
+    if changes:
+        Job.objects.filter(pk=job_id).update(**{field: F(field) + delta for field, delta in changes.items()})
+
+
+def actual_counters(job_ids):
+    """Counts applications per job and status with one conditional aggregation query."""
+    from apps.applications.models import Application
+
+    aggregates = {'applicationCount': Count('id')}
+    for status, field in STATUS_COUNTER_FIELDS.items():
+        aggregates[field] = Count('id', filter=Q(status=status))
+    rows = Application.objects.filter(job_id__in=job_ids).values('job_id').annotate(**aggregates).order_by()
+    return {row.pop('job_id'): row for row in rows}
+
+
+def reconcile_counters(batch_size=1000):
+    """
+    Recomputes every job's counters from the applications table in batches and rewrites
+    the ones that drifted. Returns the number of jobs fixed.
+    """
+    fixed = 0
+    last_id = None
+    zero = dict.fromkeys(COUNTER_FIELDS, 0)
+    while True:
+        jobs = Job.objects.order_by('id').values('id', *COUNTER_FIELDS)
+        if last_id is not None:
+            jobs = jobs.filter(id__gt=last_id)
+        jobs = list(jobs[:batch_size])
+        if not jobs:
+            return fixed
+        last_id = jobs[-1]['id']
+
+        actual = actual_counters([job['id'] for job in jobs])
+        for job in jobs:
+            expected = actual.get(job['id'], zero)
+            if any(job[field] != expected[field] for field in COUNTER_FIELDS):
+                Job.objects.filter(pk=job['id']).update(**expected)
+                fixed += 1
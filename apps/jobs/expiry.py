@@ -0,0 +1,43 @@
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import autocomplete, cache, recommendations
+from .models import Job
+
+# Open jobs whose closesAt has passed are closed by the `close_expired_jobs` command, a
+# bounded batch per short transaction, so browsing never waits long on jobs_job's locks.
+
+
+def close_expired_batch(batch_size, now=None):
+    """
+    Closes up to `batch_size` Open jobs whose closesAt has passed, in one transaction, and
+    returns how many it closed. Only Open jobs are touched (Open -> Closed is the only
+    transition allowed, see JobCreateUpdateSerializer.validate_status); Draft jobs with
+    a past deadline stay Draft. Concurrent sweepers skip each other's rows where the
+    database supports SKIP LOCKED.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        expired = Job.objects.filter(status=Job.JobStatus.OPEN, closesAt__lte=now).order_by('closesAt')
+        if connection.features.has_select_for_update_skip_locked:
+            expired = expired.select_for_update(skip_locked=True)
+        jobs = list(expired.values_list('id', 'title', 'createdBy_id')[:batch_size])
+        if not jobs:
+            return 0
+        # The indexes below need the closed jobs' titles, which an UPDATE cannot return:
+        # the batch is read (and locked) first, then closed by id
+        closed = Job.objects.filter(pk__in=[job_id for job_id, _, _ in jobs], status=Job.JobStatus.OPEN).update(
+            status=Job.JobStatus.CLOSED, updatedAt=now,
+        )
+        if closed != len(jobs):
+            # Without row locks another sweeper may have closed some of the batch first: only
+            # the jobs this UPDATE closed (the ones stamped with `now`) leave the indexes here
+            closed_ids = set(Job.objects.filter(
+                pk__in=[job_id for job_id, _, _ in jobs], status=Job.JobStatus.CLOSED, updatedAt=now,
+            ).values_list('id', flat=True))
+            jobs = [job for job in jobs if job[0] in closed_ids]
+        # update() skips model signals: keep cached listings and the job indexes in step
+        cache.invalidate_job_listings()
+        autocomplete.record_changes(removed=[(title, company_id) for _, title, company_id in jobs])
+        recommendations.record_changes(closed=[job_id for job_id, _, _ in jobs])
+    return closed
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.db.models import Case, CharField, Count, F, Value, When, Window
+from django.db.models.functions import Concat, RowNumber
+from rest_framework.exceptions import ValidationError
+
+# Facet counts for the job list (`facets=status,location,companyName`). Every requested
+# facet is a GROUP BY over the same filtered queryset keeping its JOB_FACET_LIMIT most
+# frequent values (ORDER BY count DESC LIMIT n), and the groups are combined with UNION
+# ALL, so any number of facets costs one query that returns at most n rows per facet.
+# Facets are named after the JobFilter parameters that select them.
+
+FACETS = {
+    'status': F('status'),
+    # Jobs are counted per gazetteer place ('Lagos', 'lagos, NG' and 'Remote - Lagos' are all
+    # 'Lagos, NG', which the `location` filter resolves back to the place); unresolved
+    # locations keep their text
+    'location': Case(
+        When(place__isnull=False, then=Concat('place__name', Value(', '), 'place__countryCode')), default=F('location'),
+    ),
+    'companyName': F('createdBy__name'),
+}
+
+
+def parse_facets(value):
+    """The facet names in a `facets=` parameter, in order and without duplicates."""
+    names = list(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+    unknown = [name for name in names if name not in FACETS]
+    if unknown:
+        raise ValidationError({'facets': [f"Unknown facet(s): {', '.join(unknown)}. Choose from: {', '.join(FACETS)}."]})
+    return names
+
+
+def facet_queryset(queryset, names):
+    """
+    One UNION ALL query returning the {'facet', 'value', 'count'} rows of the JOB_FACET_LIMIT
+    most frequent values of every facet in `names`.
+    """
+    queryset = queryset.order_by()
+    groups = [
+        queryset.annotate(facet=Value(name, output_field=CharField()), value=FACETS[name])
+        .values('facet', 'value').annotate(count=Count('pk'))
+        # Not a slice: backends like SQLite don't allow LIMIT in the parts of a UNION
+        .annotate(rank=Window(RowNumber(), order_by=[F('count').desc(), F('value').asc(nulls_last=True)]))
+        .filter(rank__lte=settings.JOB_FACET_LIMIT).values('facet', 'value', 'count').order_by()
+        for name in names
+    ]
+    return groups[0].union(*groups[1:], all=True)
+
+
+def group_facets(rows, names):
+    """{facet: [{'value', 'count'}, ...]}, most frequent values first."""
+    facets = {name: [] for name in names}
+    for row in rows:
+        facets[row['facet']].append({'value': row['value'], 'count': row['count']})
+    for name, values in facets.items():
+        values.sort(key=lambda item: (-item['count'], item['value'] is None, item['value'] or ''))
+    return facets
+
+
+def facet_counts(queryset, names):
+    return group_facets(facet_queryset(queryset, names), names)
+
+
+async def afacet_counts(queryset, names):
+    return group_facets([row async for row in facet_queryset(queryset, names)], names)
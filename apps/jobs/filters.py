@@ -1,12 +1,62 @@
+from django.conf import settings
+from django.db.models import Q
 from django_filters import rest_framework as filters
-from .models import Job
+from rest_framework.exceptions import ValidationError
+
+from .locations import places_within, resolve_all
+from .models import Job, JobPlace
+from .search import search_jobs
+
+
+def at_places(place_ids):
+    """A Q for the jobs at any of `place_ids` (ids or a subquery of them)."""
+    return Q(pk__in=Job.objects.filter(place_id__in=place_ids).values('pk').union(
+        JobPlace.objects.filter(place_id__in=place_ids).values('job_id'),
+    ))
+
 
 class JobFilter(filters.FilterSet):
+    q = filters.CharFilter(method='filter_search')
     title = filters.CharFilter(lookup_expr='icontains')
-    location = filters.CharFilter(lookup_expr='icontains')
+    location = filters.CharFilter(method='filter_location')
     companyName = filters.CharFilter(field_name='createdBy__name', lookup_expr='icontains')
     status = filters.CharFilter(lookup_expr='iexact')
+    near = filters.CharFilter(method='filter_near')
+    radius = filters.NumberFilter(method='filter_radius')
 
     class Meta:
         model = Job
-        fields = ['title', 'location', 'companyName', 'status']
\ No newline at end of file
+        fields = ['q', 'title', 'location', 'companyName', 'status', 'near', 'radius']
+
+    def filter_search(self, queryset, name, value):
+        """Indexed full-text search across title, description and location, ranked by relevance."""
+        return search_jobs(queryset, value)
+
+    def filter_location(self, queryset, name, value):
+        """
+        Jobs at the gazetteer places `value` names, by index: through Job.place, or JobPlace for
+        locations that name several ('Remote (Nairobi or Lagos)'). Else a substring match on
+        the location text.
+        """
+        place_ids = resolve_all(value)
+        if place_ids:
+            return queryset.filter(at_places(place_ids))
+        return queryset.filter(location__icontains=value)
+
+    def filter_near(self, queryset, name, value):
+        """`near=lat,lng` (with `radius=` km): jobs at gazetteer places within the radius."""
+        try:
+            latitude, longitude = (float(part) for part in value.split(','))
+        except ValueError:
+            raise ValidationError({'near': ['Expected "latitude,longitude", e.g. near=6.45,3.38.']})
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValidationError({'near': ['Latitude must be within [-90, 90] and longitude within [-180, 180].']})
+        radius = self.form.cleaned_data.get('radius')
+        radius = settings.JOB_NEAR_DEFAULT_RADIUS_KM if radius is None else float(radius)
+        if not 0 < radius <= settings.JOB_NEAR_MAX_RADIUS_KM:
+            raise ValidationError({'radius': [f'Ensure the radius is above 0 and at most {settings.JOB_NEAR_MAX_RADIUS_KM} km.']})
+        return queryset.filter(at_places(places_within(latitude, longitude, radius)))
+
+    def filter_radius(self, queryset, name, value):
+        """Read by filter_near."""
+        return queryset
\ No newline at end of file
@@ -0,0 +1,131 @@
+import json
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+
+from . import autocomplete, cache, recommendations, search
+from .locations import link_places, resolve
+from .models import Job
+from .serializers import JobCreateUpdateSerializer
+
+# Bulk create/update of a company's jobs from an NDJSON feed (one JSON object per line),
+# keyed on the posting's `externalId` in the company's ATS. Every row is validated by
+# JobCreateUpdateSerializer, against the existing job when there is one, so the
+# Draft -> Open -> Closed rules apply exactly as they do to PATCH /api/jobs/{id}/.
+
+IMPORT_FIELDS = ('title', 'description', 'location', 'status', 'closesAt')
+
+
+def _parse_line(line):
+    try:
+        row = json.loads(line)
+    except ValueError as exc:
+        return None, {'line': [f'Invalid JSON: {exc}']}
+    if not isinstance(row, dict):
+        return None, {'line': ['Each line must be a JSON object.']}
+
+    external_id = row.get('externalId')
+    if not isinstance(external_id, str) or not external_id.strip():
+        return None, {'externalId': ['This field is required.']}
+    if len(external_id) > Job._meta.get_field('externalId').max_length:
+        return None, {'externalId': ['Ensure this field has no more than 255 characters.']}
+    return row, None
+
+
+def import_jobs(company_id, lines, batch_size=None):
+    """
+    Creates or updates `company_id`'s jobs from an iterable of NDJSON lines and returns
+    {'created', 'updated', 'failed', 'errors'}, where each error names its 1-based line.
+    Rows are handled in batches of JOB_IMPORT_BATCH_SIZE: one SELECT for the batch's
+    existing jobs, then one INSERT ... ON CONFLICT (createdBy, externalId) DO UPDATE.
+    A batch commits on its own, so invalid rows never hold back the valid ones.
+    """
+    batch_size = batch_size or settings.JOB_IMPORT_BATCH_SIZE
+    summary = {'created': 0, 'updated': 0, 'failed': 0, 'errors': []}
+    seen = set()
+    batch = []
+
+    def fail(line_number, external_id, errors):
+        summary['failed'] += 1
+        summary['errors'].append({'line': line_number, 'externalId': external_id, 'errors': errors})
+
+    for line_number, line in enumerate(lines, 1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        if not line.strip():
+            continue
+        row, errors = _parse_line(line)
+        if errors:
+            fail(line_number, None, errors)
+            continue
+        if row['externalId'] in seen:
+            fail(line_number, row['externalId'], {'externalId': ['Duplicate externalId in this import.']})
+            continue
+        seen.add(row['externalId'])
+        batch.append((line_number, row))
+        if len(batch) >= batch_size:
+            _import_batch(company_id, batch, summary, fail)
+            batch = []
+    if batch:
+        _import_batch(company_id, batch, summary, fail)
+    summary['errors'].sort(key=lambda error: error['line']) # Parse errors are found before a batch's validation errors
+    return summary
+
+
+def _import_batch(company_id, batch, summary, fail):
+    existing = {
+        job.externalId: job
+        for job in Job.objects.filter(createdBy_id=company_id, externalId__in=[row['externalId'] for _, row in batch])
+        .only('id', 'externalId', 'title', 'status', 'closesAt')
+    }
+
+    jobs = []
+    created = 0
+    for line_number, row in batch:
+        instance = existing.get(row['externalId'])
+        serializer = JobCreateUpdateSerializer(instance, data={field: row[field] for field in IMPORT_FIELDS if field in row})
+        if not serializer.is_valid():
+            fail(line_number, row['externalId'], serializer.errors)
+            continue
+        data = serializer.validated_data
+        jobs.append(Job(
+            id=instance.id if instance else uuid.uuid4(),
+            createdBy_id=company_id,
+            externalId=row['externalId'],
+            title=data['title'],
+            description=data['description'],
+            location=data.get('location'),
+            place_id=resolve(data.get('location')),
+            status=data.get('status', instance.status if instance else Job.JobStatus.DRAFT),
+            closesAt=data['closesAt'] if 'closesAt' in data else instance.closesAt if instance else None,
+        ))
+        created += instance is None
+    if not jobs:
+        return
+
+    # Jobs that were Open before this batch and the batch's Open jobs, for the job indexes
+    imported_ids = {job.id for job in jobs}
+    was_open = [job for job in existing.values() if job.id in imported_ids and job.status == Job.JobStatus.OPEN]
+    now_open = [job for job in jobs if job.status == Job.JobStatus.OPEN]
+    closed_ids = {job.id for job in was_open} - {job.id for job in now_open}
+    with transaction.atomic():
+        Job.objects.bulk_create(
+            jobs,
+            update_conflicts=True,
+            unique_fields=['createdBy', 'externalId'],
+            update_fields=['title', 'description', 'location', 'place', 'status', 'closesAt', 'updatedAt'],
+        )
+        link_places(jobs)
+        # bulk_create skips model signals: keep the search index and cached listings in step
+        search.index_jobs((job.id, job.title, job.description, job.location) for job in jobs)
+        cache.invalidate_job_listings()
+        autocomplete.record_changes(
+            removed=[(job.title, company_id) for job in was_open], added=[(job.title, company_id) for job in now_open],
+        )
+        recommendations.record_changes(
+            opened=[(job.id, job.title, job.description) for job in now_open],
+            closed=closed_ids,
+        )
+    summary['created'] += created
+    summary['updated'] += len(jobs) - created
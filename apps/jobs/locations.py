@@ -0,0 +1,195 @@
+import csv
+import functools
+import math
+import os
+
+from django.db.models import Q
+from django.db.models.functions import ASin, Cos, Radians, Sin, Sqrt
+
+from .autocomplete import normalize
+
+# Jobs keep the location their company typed ('Lagos', 'lagos, NG', 'Lagos Nigeria',
+# 'Remote - Lagos') and are linked to the place it names in the Location table, loaded
+# from the offline gazetteer bundled in data/gazetteer.csv, or through JobPlace to each
+# place when it names several. Free-text locations are resolved against the CSV itself,
+# so resolving never costs a query; the table exists for its indexed coordinates (radius
+# search) and the foreign keys. Rows are keyed by the CSV's stable ids: after editing the
+# CSV, add a data migration that loads a copy of it, as 0008_locations does.
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(__file__), 'data', 'gazetteer.csv')
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+MAX_NAME_WORDS = 4 # Longest place name, in words
+
+# Common ways of writing a country besides its name and ISO code
+COUNTRY_ALIASES = {
+    'GB': ['uk', 'england', 'scotland', 'great britain', 'britain'],
+    'US': ['usa', 'united states of america', 'america'],
+    'AE': ['uae'],
+    'CD': ['drc', 'democratic republic of the congo'],
+    'CI': ['ivory coast'],
+    'CZ': ['czech republic'],
+    'NL': ['holland', 'the netherlands'],
+}
+
+# States and provinces that tell apart places sharing a name ('London, Ontario')
+REGION_NAMES = {
+    'CA': [
+        'alberta', 'british columbia', 'manitoba', 'new brunswick', 'newfoundland and labrador', 'nova scotia',
+        'ontario', 'prince edward island', 'quebec', 'saskatchewan', 'northwest territories', 'nunavut', 'yukon',
+    ],
+    'US': [
+        'alabama', 'alaska', 'arizona', 'arkansas', 'california', 'colorado', 'connecticut', 'delaware', 'florida',
+        'georgia', 'hawaii', 'idaho', 'illinois', 'indiana', 'iowa', 'kansas', 'kentucky', 'louisiana', 'maine',
+        'maryland', 'massachusetts', 'michigan', 'minnesota', 'mississippi', 'missouri', 'montana', 'nebraska',
+        'nevada', 'new hampshire', 'new jersey', 'new mexico', 'new york', 'north carolina', 'north dakota', 'ohio',
+        'oklahoma', 'oregon', 'pennsylvania', 'rhode island', 'south carolina', 'south dakota', 'tennessee', 'texas',
+        'utah', 'vermont', 'virginia', 'washington', 'west virginia', 'wisconsin', 'wyoming',
+    ],
+    'AU': ['new south wales', 'queensland', 'south australia', 'tasmania', 'victoria', 'western australia'],
+}
+
+
+@functools.lru_cache(maxsize=None)
+def gazetteer():
+    """The bundled places as dicts with the Location model's field names."""
+    with open(GAZETTEER_PATH, newline='', encoding='utf-8') as gazetteer_file:
+        return tuple(
+            {
+                'id': row['id'],
+                'name': row['name'],
+                'countryCode': row['countryCode'],
+                'country': row['country'],
+                'latitude': float(row['latitude']),
+                'longitude': float(row['longitude']),
+                'population': int(row['population']),
+                'alternateNames': [name for name in row['alternateNames'].split('|') if name],
+            }
+            for row in csv.DictReader(gazetteer_file)
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def _lookup_tables():
+    places, countries = {}, {}
+    for place in gazetteer():
+        for name in [place['name'], *place['alternateNames']]:
+            places.setdefault(normalize(name), []).append(place)
+        for name in [place['countryCode'], place['country'], *COUNTRY_ALIASES.get(place['countryCode'], [])]:
+            countries[normalize(name)] = place['countryCode']
+    for country_code, regions in REGION_NAMES.items():
+        for region in regions:
+            countries.setdefault(region, country_code) # A country of the same name wins ('Georgia')
+    for candidates in places.values():
+        candidates.sort(key=lambda place: -place['population'])
+    return places, countries
+
+
+def _phrases(words):
+    """The longest known place, country or region name at each position, left to right: [(phrase, is_place)]."""
+    places, countries = _lookup_tables()
+    phrases, start = [], 0
+    while start < len(words):
+        for end in range(min(len(words), start + MAX_NAME_WORDS), start, -1):
+            phrase = ' '.join(words[start:end])
+            if phrase in places or phrase in countries:
+                phrases.append((phrase, phrase in places))
+                start = end
+                break
+        else:
+            start += 1
+    return phrases
+
+
+@functools.lru_cache(maxsize=10000)
+def resolve_all(text):
+    """
+    The ids of the gazetteer places `text` names, in order. Names of countries or regions
+    ('Lagos, Nigeria', 'Seattle, Washington', 'London, Ontario') pick among the places of
+    each name, else the most populous one is taken ('London'). A single place in a country
+    where the gazetteer has none of that name ('Lagos, Portugal') resolves to nothing.
+    """
+    places, countries = _lookup_tables()
+    phrases = _phrases(normalize(text).split())
+    place_names = [phrase for phrase, is_place in phrases if is_place]
+    if not place_names:
+        return ()
+    # A later name that is also a country or region qualifies the place ('New York, New York')
+    names = list(dict.fromkeys([place_names[0], *(phrase for phrase in place_names[1:] if phrase not in countries)]))
+    named = {countries[phrase] for phrase, _ in phrases if phrase not in names and phrase in countries}
+    if len(names) == 1 and named:
+        in_country = [place for place in places[names[0]] if place['countryCode'] in named]
+        return (in_country[0]['id'],) if in_country else ()
+    ids = []
+    for name in names:
+        in_country = [place for place in places[name] if place['countryCode'] in named]
+        ids.append((in_country or places[name])[0]['id'])
+    return tuple(dict.fromkeys(ids))
+
+
+def resolve(text):
+    """
+    The id of the one gazetteer place `text` names (see resolve_all), or None: text naming
+    several places ('Remote (Nairobi or Lagos)') is linked to each of them through JobPlace.
+    """
+    place_ids = resolve_all(text)
+    return place_ids[0] if len(place_ids) == 1 else None
+
+
+def names_several(text):
+    """Whether `text` names several places, which link_places() records in JobPlace."""
+    return len(resolve_all(text)) > 1
+
+
+def link_places(jobs, created=False):
+    """
+    Replaces the JobPlace rows of saved `jobs`: one per place for each job whose location
+    names several. `created` skips deleting rows that new jobs can't have yet.
+    """
+    from .models import JobPlace
+    if not created:
+        JobPlace.objects.filter(job__in=[job.pk for job in jobs]).delete()
+    JobPlace.objects.bulk_create([
+        JobPlace(job_id=job.pk, place_id=place_id)
+        for job in jobs if names_several(job.location) for place_id in resolve_all(job.location)
+    ])
+
+
+def distance_km(latitude, longitude):
+    """The great-circle (haversine) distance in km from a point to a Location row, as an expression."""
+    half_latitude = Sin((Radians('latitude') - math.radians(latitude)) / 2)
+    half_longitude = Sin((Radians('longitude') - math.radians(longitude)) / 2)
+    a = (half_latitude * half_latitude
+         + math.cos(math.radians(latitude)) * Cos(Radians('latitude')) * half_longitude * half_longitude)
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a))
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """A Q on latitude/longitude for a box around the circle (split in two across the antimeridian)."""
+    delta_latitude = radius_km / KM_PER_DEGREE
+    box = Q(latitude__gte=latitude - delta_latitude, latitude__lte=latitude + delta_latitude)
+    if abs(latitude) + delta_latitude >= 90: # The circle contains a pole: every longitude
+        return box
+    delta_longitude = delta_latitude / math.cos(math.radians(abs(latitude) + delta_latitude))
+    if delta_longitude >= 180:
+        return box
+    west, east = longitude - delta_longitude, longitude + delta_longitude
+    if west < -180:
+        return box & (Q(longitude__gte=west + 360) | Q(longitude__lte=east))
+    if east > 180:
+        return box & (Q(longitude__gte=west) | Q(longitude__lte=east - 360))
+    return box & Q(longitude__gte=west, longitude__lte=east)
+
+
+def places_within(latitude, longitude, radius_km):
+    """
+    The ids of the places within `radius_km` of a point, as a subquery: the (latitude,
+    longitude) index narrows the table to a bounding box, then the exact distance decides.
+    """
+    from .models import Location
+    return (
+        Location.objects.filter(bounding_box(latitude, longitude, radius_km))
+        .annotate(distance=distance_km(latitude, longitude))
+        .filter(distance__lte=radius_km)
+        .values('id')
+    )
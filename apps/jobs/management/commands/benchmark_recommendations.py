@@ -0,0 +1,73 @@
+import os
+import random
+import shutil
+import tempfile
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from apps.core.benchmark import time_calls, summarize, format_summary
+from apps.core.seeding import TITLES, SENIORITY, SKILLS, LOCATIONS
+from apps.jobs import recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks job recommendation ranking: builds the index for synthetic open jobs in a "
+        "temporary RECOMMENDATION_INDEX_DIR, memory-maps it and times ranking for synthetic applicants."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=1_000_000)
+        parser.add_argument('--profiles', type=int, default=200, help='Applicants ranked (one timing each).')
+        parser.add_argument('--applications', type=int, default=10, help='Applications per applicant profile.')
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if recommendations.np is None:
+            raise CommandError("Job recommendations need numpy (pip install numpy).")
+        rng = random.Random(options['seed'])
+        jobs = [self.job(rng) for _ in range(options['jobs'])]
+
+        directory = tempfile.mkdtemp(prefix='recommendations-')
+        try:
+            with override_settings(RECOMMENDATION_INDEX_DIR=directory):
+                start = time.perf_counter()
+                arrays = recommendations.build_arrays(jobs)
+                recommendations._write_build(arrays)
+                self.stdout.write(f"Built the index for {len(jobs)} jobs in {time.perf_counter() - start:.1f}s "
+                                  f"({self.size(directory) / 2 ** 20:.0f} MiB on disk)")
+
+                recommendations.reset()
+                with recommendations._index.lock:
+                    recommendations._sync()
+                index = recommendations._index
+                profiles = []
+                for _ in range(options['profiles']):
+                    applied = rng.sample(jobs, options['applications'])
+                    profile = {}
+                    for _, title, description in applied:
+                        for feature, weight in recommendations.job_terms(title, description).items():
+                            profile[feature] = profile.get(feature, 0) + weight
+                    profiles.append((profile, {str(job_id) for job_id, _, _ in applied}, options['limit']))
+
+                index.rank(*profiles[0]) # Fault the mapped pages in
+                summary = summarize(time_calls(index.rank, profiles))
+                self.stdout.write(format_summary(f"rank ({len(jobs)} open jobs)", summary))
+        finally:
+            recommendations.reset()
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def job(self, rng):
+        title = f'{rng.choice(SENIORITY)} {rng.choice(TITLES)}'
+        description = (
+            f'We are hiring a {title.lower()} in {rng.choice(LOCATIONS)} '
+            f'with experience in {", ".join(rng.sample(SKILLS, 4))}.'
+        )
+        return uuid.UUID(int=rng.getrandbits(128)), title, description
+
+    def size(self, directory):
+        return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names)
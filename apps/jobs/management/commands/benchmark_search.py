@@ -0,0 +1,90 @@
+import random
+import uuid
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.core.benchmark import isolated_database, time_calls, summarize, format_summary
+from apps.core.seeding import TITLES, SENIORITY, SKILLS, LOCATIONS
+from apps.jobs import search
+from apps.jobs.filters import JobFilter
+from apps.jobs.models import Job
+from apps.users.models import User
+
+# One niche product word per job, so each matches roughly 1% of the corpus.
+NICHE = [
+    f'{a}{b}' for a in ('data', 'cloud', 'ledger', 'pay', 'geo', 'bio', 'agri', 'edu', 'med', 'retail')
+    for b in ('ops', 'kit', 'flow', 'base', 'stack', 'hub', 'link', 'sense', 'grid', 'forge')
+]
+QUERIES = {
+    'selective': ['payflow', 'geogrid', 'medkit python', 'agrihub lagos', 'ledgerops'],
+    'broad': ['python', 'senior backend', 'react developer', 'kubernetes', 'security analyst'],
+}
+
+
+class Command(BaseCommand):
+    help = "Benchmarks indexed job search (?q=) against the legacy icontains title filter on a throwaway database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=1_000_000)
+        parser.add_argument('--companies', type=int, default=1000)
+        parser.add_argument('--queries', type=int, default=100)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        with isolated_database():
+            self.populate(options['jobs'], options['companies'], options['batch_size'])
+            self.run_queries(options['queries'])
+
+    def populate(self, job_count, company_count, batch_size):
+        password = make_password(None)
+        companies = [
+            User(email=f'company{i}@bench.local', name=f'Company {i}', role=User.Role.COMPANY, password=password)
+            for i in range(company_count)
+        ]
+        User.objects.bulk_create(companies, batch_size=batch_size)
+        company_ids = [company.id for company in companies]
+
+        created = 0
+        while created < job_count:
+            size = min(batch_size, job_count - created)
+            jobs = []
+            for _ in range(size):
+                title = f'{random.choice(SENIORITY)} {random.choice(TITLES)}'
+                skills = ' '.join(random.sample(SKILLS, 4))
+                jobs.append(Job(
+                    id=uuid.uuid4(),
+                    title=title,
+                    description=f'We are hiring a {title.lower()} for {random.choice(NICHE)} with experience in {skills}.',
+                    location=random.choice(LOCATIONS),
+                    status=random.choice([Job.JobStatus.OPEN] * 8 + [Job.JobStatus.CLOSED, Job.JobStatus.DRAFT]),
+                    createdBy_id=random.choice(company_ids),
+                ))
+            with transaction.atomic():
+                Job.objects.bulk_create(jobs)
+                # bulk_create skips model signals, so index explicitly.
+                search.index_jobs((job.id, job.title, job.description, job.location) for job in jobs)
+            created += size
+            self.stdout.write(f"Seeded {created}/{job_count} jobs", ending='\r')
+        self.stdout.write('')
+
+    def run_queries(self, query_count):
+        base = Job.objects.select_related('createdBy').filter(status=Job.JobStatus.OPEN)
+
+        def indexed(term):
+            qs = JobFilter({'q': term}, queryset=base).qs
+            qs.count()
+            list(qs[:10])
+
+        def legacy(term):
+            qs = JobFilter({'title': term}, queryset=base).qs
+            qs.count()
+            list(qs[:10])
+
+        for kind, queries in QUERIES.items():
+            terms = [(random.choice(queries),) for _ in range(query_count)]
+            self.stdout.write(format_summary(f'{kind}: indexed (q=)', summarize(time_calls(indexed, terms))))
+            self.stdout.write(format_summary(f'{kind}: icontains (title=)', summarize(time_calls(legacy, terms))))
@@ -0,0 +1,65 @@
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+
+from apps.applications.models import Application
+from apps.applications.serializers import ApplicationSerializer, ApplicationListSerializer
+from apps.core.benchmark import isolated_database, time_calls, summarize, format_summary
+from apps.jobs.models import Job
+from apps.jobs.serializers import JobSerializer, JobListSerializer
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = "Benchmarks the ModelSerializer list path against the .values() fast path on a throwaway database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 10_000])
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        rows = max(options['sizes'])
+        with isolated_database():
+            self.populate(rows)
+            jobs = Job.objects.select_related('createdBy').order_by('-createdAt', '-id')
+            applications = Application.objects.select_related('applicant', 'job__createdBy').order_by('-appliedAt', '-id')
+
+            for size in options['sizes']:
+                calls = [()] * options['repeat']
+                for label, queryset, serializer_class, values_serializer_class in (
+                    ('jobs', jobs, JobSerializer, JobListSerializer),
+                    ('applications', applications, ApplicationSerializer, ApplicationListSerializer),
+                ):
+                    def model_path():
+                        return serializer_class(list(queryset[:size]), many=True).data
+
+                    def values_path():
+                        return values_serializer_class(list(values_serializer_class.values(queryset)[:size])).data
+
+                    self.stdout.write(format_summary(f'{label} x{size}: ModelSerializer', summarize(time_calls(model_path, calls))))
+                    self.stdout.write(format_summary(f'{label} x{size}: values()', summarize(time_calls(values_path, calls))))
+
+    def populate(self, rows):
+        password = make_password(None)
+        company = User.objects.create(email='company@bench.local', name='Company', role=User.Role.COMPANY, password=password)
+        applicants = User.objects.bulk_create([
+            User(email=f'applicant{i}@bench.local', name=f'Applicant {i}', role=User.Role.APPLICANT, password=password)
+            for i in range(100)
+        ])
+        jobs = Job.objects.bulk_create([
+            Job(
+                title=f'Job {i}', description='We are hiring. ' * 20, location=random.choice(['Lagos', 'Remote', None]),
+                status=Job.JobStatus.OPEN, createdBy=company,
+            )
+            for i in range(rows)
+        ], batch_size=5000)
+        Application.objects.bulk_create([
+            Application(
+                applicant=applicants[i % len(applicants)], job=jobs[i], resumeLink='https://example.com/cv.pdf',
+                coverLetter='I would love to join your team.',
+            )
+            for i in range(rows)
+        ], batch_size=5000)
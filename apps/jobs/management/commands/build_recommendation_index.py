@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jobs import recommendations
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the shared job recommendation index in RECOMMENDATION_INDEX_DIR from the Open jobs."
+
+    def handle(self, *args, **options):
+        if recommendations.np is None:
+            raise CommandError("Job recommendations need numpy (pip install numpy).")
+        if not settings.RECOMMENDATION_INDEX_DIR:
+            raise CommandError("Set RECOMMENDATION_INDEX_DIR to the directory the workers read the index from.")
+        total = recommendations.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} open jobs."))
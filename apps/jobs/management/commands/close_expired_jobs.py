@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.jobs.expiry import close_expired_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Closes Open jobs whose closesAt has passed, one short transaction per batch. "
+        "Run it from cron, or keep one running with --loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.JOB_EXPIRY_BATCH_SIZE)
+        parser.add_argument('--pause', type=float, default=settings.JOB_EXPIRY_BATCH_PAUSE,
+                            help="Seconds between batches, so other writers get the table in between.")
+        parser.add_argument('--loop', action='store_true', help="Keep sweeping instead of exiting when nothing has expired.")
+        parser.add_argument('--interval', type=float, default=60.0, help="Seconds between sweeps when looping.")
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            closed = close_expired_batch(options['batch_size'])
+            total += closed
+            if closed == options['batch_size']:
+                time.sleep(options['pause'])
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f"Closed {total} expired jobs."))
@@ -0,0 +1,33 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jobs.importer import import_jobs
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = "Creates or updates a company's jobs from an NDJSON file (one job per line, keyed on externalId)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="NDJSON file, or '-' for stdin")
+        parser.add_argument('--company', required=True, help="Email of the company that owns the jobs")
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        try:
+            company = User.objects.get(email=options['company'], role=User.Role.COMPANY)
+        except User.DoesNotExist:
+            raise CommandError(f"No company with email {options['company']}.")
+
+        if options['path'] == '-':
+            summary = import_jobs(company.pk, sys.stdin.buffer, batch_size=options['batch_size'])
+        else:
+            with open(options['path'], 'rb') as lines:
+                summary = import_jobs(company.pk, lines, batch_size=options['batch_size'])
+
+        for error in summary['errors']:
+            self.stderr.write(f"line {error['line']} ({error['externalId']}): {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary['created']} job(s) created, {summary['updated']} updated, {summary['failed']} failed."
+        ))
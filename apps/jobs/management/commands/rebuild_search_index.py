@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.jobs import search
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the SQLite full-text job search index from the jobs table (no-op on PostgreSQL)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        total = search.rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} jobs."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.jobs.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Recomputes the denormalized per-job application counters and fixes any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        fixed = reconcile_counters(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Fixed counters on {fixed} jobs."))
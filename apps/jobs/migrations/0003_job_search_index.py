@@ -0,0 +1,52 @@
+from django.db import migrations
+
+
+PG_SEARCH_VECTOR = (
+    "to_tsvector('english', coalesce(title, '') || ' ' || "
+    "coalesce(description, '') || ' ' || coalesce(location, ''))"
+)
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_job_fts USING fts5("
+            "job_id UNINDEXED, title, description, location, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        Job = apps.get_model('jobs', 'Job')
+        rows = [
+            (job_id.int >> 65, job_id.hex, title, description, location or '')
+            for job_id, title, description, location in
+            Job.objects.values_list('id', 'title', 'description', 'location').iterator()
+        ]
+        if rows:
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    'INSERT OR REPLACE INTO jobs_job_fts(rowid, job_id, title, description, location) '
+                    'VALUES (%s, %s, %s, %s, %s)',
+                    rows,
+                )
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS jobs_job_search_idx ON jobs_job USING GIN ({PG_SEARCH_VECTOR})"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS jobs_job_fts")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS jobs_job_search_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
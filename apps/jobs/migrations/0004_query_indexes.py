@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_job_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', '-createdAt', '-id'], name='jobs_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['createdBy', '-createdAt', '-id'], name='jobs_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('status', 'Open')), fields=['-createdAt', '-id'], name='jobs_open_created_idx'),
+        ),
+    ]
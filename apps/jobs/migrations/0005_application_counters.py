@@ -0,0 +1,65 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:49
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+STATUS_COUNTER_FIELDS = {
+    'Applied': 'appliedCount',
+    'Reviewed': 'reviewedCount',
+    'Interview': 'interviewCount',
+    'Rejected': 'rejectedCount',
+    'Hired': 'hiredCount',
+}
+
+
+def backfill_counters(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    Application = apps.get_model('applications', 'Application')
+    aggregates = {'applicationCount': Count('id')}
+    for status, field in STATUS_COUNTER_FIELDS.items():
+        aggregates[field] = Count('id', filter=Q(status=status))
+    for row in Application.objects.values('job_id').annotate(**aggregates).order_by().iterator():
+        Job.objects.filter(pk=row.pop('job_id')).update(**row)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_query_indexes'),
+        ('applications', '0004_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='applicationCount',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='appliedCount',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='hiredCount',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='interviewCount',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='rejectedCount',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='reviewedCount',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:59
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Existing rows were last changed at some unknown point; createdAt is the best lower bound
+    apps.get_model('jobs', 'Job').objects.update(updatedAt=F('createdAt'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_application_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='updatedAt',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,125 @@
+# Generated by Django 4.2.30 on 2026-10-17 19:49
+
+import csv
+import os
+import re
+import unicodedata
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# A frozen copy of the gazetteer and of apps/jobs/locations.py's resolver as they were
+# when this migration was written, so it behaves the same whatever they become
+GAZETTEER_PATH = os.path.join(os.path.dirname(__file__), '0008_gazetteer.csv')
+BATCH_SIZE = 1000
+MAX_NAME_WORDS = 4
+COUNTRY_ALIASES = {
+    'GB': ['uk', 'england', 'scotland', 'great britain', 'britain'],
+    'US': ['usa', 'united states of america', 'america'],
+    'AE': ['uae'],
+    'CD': ['drc', 'democratic republic of the congo'],
+    'CI': ['ivory coast'],
+    'CZ': ['czech republic'],
+    'NL': ['holland', 'the netherlands'],
+}
+
+
+def read_gazetteer():
+    with open(GAZETTEER_PATH, newline='', encoding='utf-8') as gazetteer_file:
+        return list(csv.DictReader(gazetteer_file))
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(re.findall(r'\w+', text.casefold()))
+
+
+def lookup_tables(rows):
+    places, countries = {}, {}
+    for row in rows:
+        for name in [row['name'], *row['alternateNames'].split('|')]:
+            if name:
+                places.setdefault(normalize(name), []).append(row)
+        for name in [row['countryCode'], row['country'], *COUNTRY_ALIASES.get(row['countryCode'], [])]:
+            countries[normalize(name)] = row['countryCode']
+    for candidates in places.values():
+        candidates.sort(key=lambda row: -int(row['population']))
+    return places, countries
+
+
+def resolve(text, places, countries):
+    words = normalize(text).split()
+    for start in range(len(words)):
+        for end in range(min(len(words), start + MAX_NAME_WORDS), start, -1):
+            candidates = places.get(' '.join(words[start:end]))
+            if candidates:
+                rest = words[end:]
+                named = {countries.get(' '.join(rest[index:stop])) for index in range(len(rest))
+                         for stop in range(index + 1, len(rest) + 1)}
+                in_country = [row for row in candidates if row['countryCode'] in named]
+                return (in_country or candidates)[0]['id']
+    return None
+
+
+def load_locations(apps, schema_editor):
+    Location = apps.get_model('jobs', 'Location')
+    fields = ['name', 'countryCode', 'country', 'latitude', 'longitude', 'population']
+    Location.objects.bulk_create(
+        [
+            Location(id=row['id'], name=row['name'], countryCode=row['countryCode'], country=row['country'],
+                     latitude=float(row['latitude']), longitude=float(row['longitude']), population=int(row['population']))
+            for row in read_gazetteer()
+        ],
+        update_conflicts=True, unique_fields=['id'], update_fields=fields,
+    )
+
+
+def link_jobs(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    places, countries = lookup_tables(read_gazetteer())
+    job_ids = {}
+    for job_id, location in Job.objects.exclude(location=None).values_list('id', 'location').iterator():
+        place_id = resolve(location, places, countries)
+        if place_id:
+            job_ids.setdefault(place_id, []).append(job_id)
+    for place_id, ids in job_ids.items():
+        for start in range(0, len(ids), BATCH_SIZE):
+            Job.objects.filter(pk__in=ids[start:start + BATCH_SIZE]).update(place_id=place_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_job_external_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100)),
+                ('countryCode', models.CharField(max_length=2)),
+                ('country', models.CharField(max_length=100)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('population', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['latitude', 'longitude'], name='locations_coordinates_idx'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='place',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='jobs.location'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['place', 'status', '-createdAt', '-id'], name='jobs_place_status_idx'),
+        ),
+        migrations.RunPython(load_locations, migrations.RunPython.noop),
+        migrations.RunPython(link_jobs, migrations.RunPython.noop),
+    ]
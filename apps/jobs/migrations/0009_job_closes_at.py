@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-17 19:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_locations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='closesAt',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'closesAt'], name='jobs_status_closes_idx'),
+        ),
+    ]
@@ -0,0 +1,130 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:24
+
+import csv
+import os
+import re
+import unicodedata
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# A frozen copy of apps/jobs/locations.py's resolve_all() as it was when this migration was
+# written (it knows regions and several places per location), over 0008's gazetteer copy
+GAZETTEER_PATH = os.path.join(os.path.dirname(__file__), '0008_gazetteer.csv')
+BATCH_SIZE = 1000
+MAX_NAME_WORDS = 4
+COUNTRY_ALIASES = {
+    'GB': ['uk', 'england', 'scotland', 'great britain', 'britain'],
+    'US': ['usa', 'united states of america', 'america'],
+    'AE': ['uae'],
+    'CD': ['drc', 'democratic republic of the congo'],
+    'CI': ['ivory coast'],
+    'CZ': ['czech republic'],
+    'NL': ['holland', 'the netherlands'],
+}
+REGION_NAMES = {
+    'CA': [
+        'alberta', 'british columbia', 'manitoba', 'new brunswick', 'newfoundland and labrador', 'nova scotia',
+        'ontario', 'prince edward island', 'quebec', 'saskatchewan', 'northwest territories', 'nunavut', 'yukon',
+    ],
+    'US': [
+        'alabama', 'alaska', 'arizona', 'arkansas', 'california', 'colorado', 'connecticut', 'delaware', 'florida',
+        'georgia', 'hawaii', 'idaho', 'illinois', 'indiana', 'iowa', 'kansas', 'kentucky', 'louisiana', 'maine',
+        'maryland', 'massachusetts', 'michigan', 'minnesota', 'mississippi', 'missouri', 'montana', 'nebraska',
+        'nevada', 'new hampshire', 'new jersey', 'new mexico', 'new york', 'north carolina', 'north dakota', 'ohio',
+        'oklahoma', 'oregon', 'pennsylvania', 'rhode island', 'south carolina', 'south dakota', 'tennessee', 'texas',
+        'utah', 'vermont', 'virginia', 'washington', 'west virginia', 'wisconsin', 'wyoming',
+    ],
+    'AU': ['new south wales', 'queensland', 'south australia', 'tasmania', 'victoria', 'western australia'],
+}
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(re.findall(r'\w+', text.casefold()))
+
+
+def lookup_tables():
+    places, countries = {}, {}
+    with open(GAZETTEER_PATH, newline='', encoding='utf-8') as gazetteer_file:
+        for row in csv.DictReader(gazetteer_file):
+            for name in [row['name'], *row['alternateNames'].split('|')]:
+                if name:
+                    places.setdefault(normalize(name), []).append(row)
+            for name in [row['countryCode'], row['country'], *COUNTRY_ALIASES.get(row['countryCode'], [])]:
+                countries[normalize(name)] = row['countryCode']
+    for country_code, regions in REGION_NAMES.items():
+        for region in regions:
+            countries.setdefault(region, country_code)
+    for candidates in places.values():
+        candidates.sort(key=lambda row: -int(row['population']))
+    return places, countries
+
+
+def resolve_all(text, places, countries):
+    words, phrases, start = normalize(text).split(), [], 0
+    while start < len(words):
+        for end in range(min(len(words), start + MAX_NAME_WORDS), start, -1):
+            phrase = ' '.join(words[start:end])
+            if phrase in places or phrase in countries:
+                phrases.append((phrase, phrase in places))
+                start = end
+                break
+        else:
+            start += 1
+    place_names = [phrase for phrase, is_place in phrases if is_place]
+    if not place_names:
+        return ()
+    names = list(dict.fromkeys([place_names[0], *(phrase for phrase in place_names[1:] if phrase not in countries)]))
+    named = {countries[phrase] for phrase, _ in phrases if phrase not in names and phrase in countries}
+    if len(names) == 1 and named:
+        in_country = [row for row in places[names[0]] if row['countryCode'] in named]
+        return (in_country[0]['id'],) if in_country else ()
+    ids = []
+    for name in names:
+        in_country = [row for row in places[name] if row['countryCode'] in named]
+        ids.append((in_country or places[name])[0]['id'])
+    return tuple(dict.fromkeys(ids))
+
+
+def link_places(apps, schema_editor):
+    """Relinks Job.place to the one place a location names, and JobPlace to each of several."""
+    Job = apps.get_model('jobs', 'Job')
+    JobPlace = apps.get_model('jobs', 'JobPlace')
+    places, countries = lookup_tables()
+    job_ids, links = {}, []
+    for job_id, location, current in Job.objects.values_list('id', 'location', 'place_id').iterator():
+        place_ids = resolve_all(location, places, countries)
+        place_id = place_ids[0] if len(place_ids) == 1 else None
+        if place_id != current:
+            job_ids.setdefault(place_id, []).append(job_id)
+        if len(place_ids) > 1:
+            links.extend(JobPlace(job_id=job_id, place_id=linked) for linked in place_ids)
+    for place_id, ids in job_ids.items():
+        for start in range(0, len(ids), BATCH_SIZE):
+            Job.objects.filter(pk__in=ids[start:start + BATCH_SIZE]).update(place_id=place_id)
+    JobPlace.objects.bulk_create(links, batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_job_closes_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobPlace',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='jobs.job')),
+                ('place', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='jobs.location')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='jobplace',
+            constraint=models.UniqueConstraint(fields=('place', 'job'), name='jobs_jobplace_place_job_uniq'),
+        ),
+        migrations.RunPython(link_places, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,27 @@ import uuid
 from django.db import models
 from django.conf import settings
 
+from .locations import resolve
+
+class Location(models.Model):
+    """A place from the bundled gazetteer (see apps/jobs/locations.py), keyed by its stable id, e.g. 'lagos-ng'."""
+    id = models.CharField(primary_key=True, max_length=64)
+    name = models.CharField(max_length=100)
+    countryCode = models.CharField(max_length=2)
+    country = models.CharField(max_length=100)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    population = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Radius search: bounding-box prefilter
+            models.Index(fields=['latitude', 'longitude'], name='locations_coordinates_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name}, {self.country}'
+
 class Job(models.Model):
     class JobStatus(models.TextChoices):
         DRAFT = 'Draft', 'Draft'
@@ -12,6 +33,9 @@ class Job(models.Model):
     title = models.CharField(max_length=100)
     description = models.TextField(max_length=2000)
     location = models.CharField(max_length=255, blank=True, null=True)
+    place = models.ForeignKey( # The gazetteer place `location` names, set on save (see apps/jobs/locations.py)
+        Location, on_delete=models.SET_NULL, related_name='jobs', blank=True, null=True, db_index=False,
+    )
     status = models.CharField(max_length=10, choices=JobStatus.choices, default=JobStatus.DRAFT)
     createdBy = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -20,6 +44,56 @@ class Job(models.Model):
         limit_choices_to={'role': 'company'}
     )
     createdAt = models.DateTimeField(auto_now_add=True)
+    closesAt = models.DateTimeField(blank=True, null=True) # Open jobs are closed once it passes (see apps/jobs/expiry.py)
+    externalId = models.CharField(max_length=255, blank=True, null=True) # The posting's id in the company's ATS (bulk import upsert key)
+    updatedAt = models.DateTimeField(auto_now=True) # Bulk .update()s of serialized fields must set it too (ETags, detail cache)
+
+    # Denormalized application counters (see apps/jobs/counters.py)
+    applicationCount = models.PositiveIntegerField(default=0)
+    appliedCount = models.PositiveIntegerField(default=0)
+    reviewedCount = models.PositiveIntegerField(default=0)
+    interviewCount = models.PositiveIntegerField(default=0)
+    rejectedCount = models.PositiveIntegerField(default=0)
+    hiredCount = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Browse: status filter, newest first (also the keyset for cursor pagination)
+            models.Index(fields=['status', '-createdAt', '-id'], name='jobs_status_created_idx'),
+            # my-jobs: a company's own jobs, newest first
+            models.Index(fields=['createdBy', '-createdAt', '-id'], name='jobs_owner_created_idx'),
+            # Applicants only ever browse open jobs
+            models.Index(fields=['-createdAt', '-id'], condition=models.Q(status='Open'), name='jobs_open_created_idx'),
+            # Location filter and radius search: jobs at a few places, newest first (also the FK's index)
+            models.Index(fields=['place', 'status', '-createdAt', '-id'], name='jobs_place_status_idx'),
+            # close_expired_jobs: Open jobs past their closesAt, earliest first
+            models.Index(fields=['status', 'closesAt'], name='jobs_status_closes_idx'),
+        ]
+        constraints = [
+            # Jobs without an externalId (NULL) are never considered duplicates
+            models.UniqueConstraint(fields=['createdBy', 'externalId'], name='jobs_owner_external_id_uniq'),
+        ]
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if 'location' not in self.get_deferred_fields() and (update_fields is None or 'location' in update_fields):
+            self.place_id = resolve(self.location) # From the bundled gazetteer, no query
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'place'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+
+class JobPlace(models.Model):
+    """A place named by a job location that names several ('Remote (Nairobi or Lagos)'), see apps/jobs/locations.py."""
+    # Removed by the post_delete signal, only for the jobs that have rows: a cascade would cost every delete a query
+    job = models.ForeignKey(Job, on_delete=models.DO_NOTHING, related_name='+', db_constraint=False)
+    place = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='+', db_index=False)
+
+    class Meta:
+        constraints = [
+            # Location filter and radius search: the jobs at a place (also the place FK's index)
+            models.UniqueConstraint(fields=['place', 'job'], name='jobs_jobplace_place_job_uniq'),
+        ]
\ No newline at end of file
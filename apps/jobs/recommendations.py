@@ -0,0 +1,372 @@
+import functools
+import glob
+import json
+import math
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+
+from apps.core import sharedfiles
+
+try:
+    import numpy as np
+except ImportError: # Optional: without it /api/jobs/recommended/ answers 503
+    np = None
+
+# Open jobs ranked for an applicant by TF-IDF similarity to the jobs they applied to and
+# their cover letters. Job texts are hashed into N_FEATURES term columns and stored as an
+# inverted index in NumPy arrays (the job-by-term matrix in CSC layout: per term, the rows
+# of the jobs using it and their weights), so scoring every job against a profile is one
+# sparse matrix-vector product: gather the profile terms' columns and np.bincount them.
+# IDF is applied on the profile side at query time, so the arrays never need reweighting.
+#
+# build_recommendation_index writes the arrays to a build directory in
+# RECOMMENDATION_INDEX_DIR (required, system check jobs.E003) that every gunicorn worker
+# memory-maps, so they share one copy in the page cache. Requests never build it (that would
+# hold every worker's lock for the whole build): until the command has run, recommend()
+# raises IndexNotBuilt and the endpoint answers 503. Jobs opened, edited or closed afterwards
+# are appended to the build's change log (see apps/core/sharedfiles.py), which each worker
+# applies in memory before ranking; the next build folds them in.
+
+N_FEATURES = 2 ** 20
+TOKEN_RE = re.compile(r'[^\W\d_]{2,}', re.UNICODE)
+STOPWORDS = frozenset('''
+    a about an and are as at be by for from has have in is it its of on or our that the their this to
+    we will with you your who what which all any can into more not us job role team work working
+'''.split())
+TITLE_WEIGHT = 2 # A title word counts as much as this many description words
+BLOCK_ROWS = 2 ** 14 # Jobs scored at a time: their float64 scores fit in L1/L2 cache
+
+
+@functools.lru_cache(maxsize=100_000)
+def _feature(token):
+    return zlib.crc32(token.encode()) % N_FEATURES # Stable across processes, unlike hash()
+
+
+def term_weights(*weighted_texts):
+    """{feature: weight} of (text, weight) pairs: log-scaled term counts, L2-normalized."""
+    counts = Counter()
+    for text, weight in weighted_texts:
+        for token in TOKEN_RE.findall((text or '').lower()):
+            if token not in STOPWORDS:
+                counts[_feature(token)] += weight
+    terms = {feature: 1 + math.log(count) for feature, count in counts.items()}
+    norm = math.sqrt(sum(weight * weight for weight in terms.values())) or 1.0
+    return {feature: weight / norm for feature, weight in terms.items()}
+
+
+def job_terms(title, description):
+    return term_weights((title, TITLE_WEIGHT), (description, 1))
+
+
+def build_arrays(jobs, chunk_size=10_000):
+    """The index arrays for an iterable of (job id, title, description) rows."""
+    ids, rows, features, weights = [], [], [], []
+    chunk_ids, chunk_rows, chunk_features, chunk_weights = [], [], [], []
+
+    def flush():
+        ids.append(np.frombuffer(b''.join(chunk_ids), dtype=np.uint8).reshape(-1, 16))
+        rows.append(np.array(chunk_rows, dtype=np.int32))
+        features.append(np.array(chunk_features, dtype=np.int64))
+        weights.append(np.array(chunk_weights, dtype=np.float32))
+        for chunk in (chunk_ids, chunk_rows, chunk_features, chunk_weights):
+            chunk.clear()
+
+    for row, (job_id, title, description) in enumerate(jobs):
+        terms = job_terms(title, description)
+        chunk_ids.append(uuid.UUID(str(job_id)).bytes)
+        chunk_rows.extend([row] * len(terms))
+        chunk_features.extend(terms.keys())
+        chunk_weights.extend(terms.values())
+        if len(chunk_ids) >= chunk_size:
+            flush()
+    flush()
+
+    features = np.concatenate(features)
+    order = np.argsort(features, kind='stable')
+    document_frequency = np.bincount(features, minlength=N_FEATURES)
+    indptr = np.zeros(N_FEATURES + 1, dtype=np.int64)
+    np.cumsum(document_frequency, out=indptr[1:])
+    return {
+        'indptr': indptr,
+        'rows': np.concatenate(rows)[order],
+        'weights': np.concatenate(weights)[order],
+        'df': document_frequency.astype(np.int32),
+        'job_ids': np.concatenate(ids),
+    }
+
+
+class RecommendationIndex:
+    """One process's view of the index: the built arrays plus the changes logged since."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ready = False
+        self.arrays = None
+        self.opened = {} # job id -> (features, weights) of jobs opened or edited since the build
+        self.closed = set() # ids of jobs closed or deleted since the build
+        self.log_path = None
+        self.offset = 0
+
+    def load(self, arrays, log_path=None):
+        self.arrays, self.opened, self.closed = arrays, {}, set()
+        self.log_path, self.offset = log_path, 0
+        if log_path is not None:
+            self.read_changes()
+        self.ready = True
+
+    def read_changes(self):
+        """Applies the changes appended to the log since the last call (FileNotFoundError once replaced)."""
+        changes, self.offset = sharedfiles.read_records(self.log_path, self.offset)
+        for change in changes:
+            self.apply(change)
+
+    def apply(self, change):
+        if change[0] == 'open':
+            terms = job_terms(change[2], change[3])
+            self.opened[change[1]] = (np.fromiter(terms.keys(), np.int64), np.fromiter(terms.values(), np.float32))
+            self.closed.discard(change[1])
+        else:
+            self.opened.pop(change[1], None)
+            self.closed.add(change[1])
+
+    def rank(self, profile, exclude, limit):
+        """[(job id, score)] of the `limit` best jobs for `profile` ({feature: weight}) not in `exclude`."""
+        arrays = self.arrays
+        count = len(arrays['job_ids'])
+        query = self.query_vector(profile, count)
+        if not query:
+            return []
+        scores = self.score_built(query, count)
+        superseded = exclude | self.closed | self.opened.keys() # Their built rows no longer count
+        candidates = min(count, limit + len(superseded))
+        if candidates:
+            best = np.argpartition(scores, count - candidates)[count - candidates:]
+        else:
+            best = []
+        ranked = [
+            (str(uuid.UUID(bytes=arrays['job_ids'][row].tobytes())), float(scores[row])) for row in best if scores[row] > 0
+        ]
+        ranked = [(job_id, score) for job_id, score in ranked if job_id not in superseded]
+
+        # Jobs opened or edited since the build
+        for job_id, (job_features, job_weights) in self.opened.items():
+            if job_id not in exclude:
+                score = float(sum(query.get(feature, 0.0) * weight for feature, weight in zip(job_features.tolist(), job_weights)))
+                if score > 0:
+                    ranked.append((job_id, score))
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked[:limit]
+
+    def score_built(self, query, count):
+        """
+        Every built job's score: the query terms' columns summed per job row. Terms are taken
+        by decreasing query weight until RECOMMENDATION_MAX_POSTINGS postings, which bounds
+        the work for profiles made of very common terms; the sum is done in blocks of
+        BLOCK_ROWS jobs so the scores being added to stay in the CPU cache.
+        """
+        arrays = self.arrays
+        features = np.fromiter(query.keys(), np.int64)
+        query_weights = np.fromiter(query.values(), np.float32)
+        starts, ends = arrays['indptr'][features], arrays['indptr'][features + 1]
+        kept = max(1, int(np.searchsorted(np.cumsum(ends - starts), settings.RECOMMENDATION_MAX_POSTINGS, side='right')))
+        columns = [
+            (arrays['rows'][start:end], arrays['weights'][start:end], weight)
+            for start, end, weight in zip(starts[:kept], ends[:kept], query_weights[:kept])
+        ]
+        edges = np.arange(0, count + BLOCK_ROWS, BLOCK_ROWS) # Job rows are sorted within each column
+        cuts = [np.searchsorted(rows, edges) for rows, _, _ in columns]
+        scores = np.zeros(count)
+        for block, low in enumerate(edges[:-1]):
+            high = min(low + BLOCK_ROWS, count)
+            rows = np.concatenate([column[0][cut[block]:cut[block + 1]] for column, cut in zip(columns, cuts)])
+            weights = np.concatenate([column[1][cut[block]:cut[block + 1]] * column[2] for column, cut in zip(columns, cuts)])
+            scores[low:high] = np.bincount(rows - low, weights=weights, minlength=high - low)
+        return scores
+
+    def query_vector(self, profile, count):
+        """The profile's RECOMMENDATION_QUERY_TERMS most distinctive terms, weighted by IDF squared, best first."""
+        document_frequency = self.arrays['df']
+        query = {}
+        for feature, weight in profile.items():
+            idf = math.log((1 + count) / (1 + int(document_frequency[feature]))) + 1
+            query[feature] = weight * idf * idf
+        best = sorted(query, key=query.get, reverse=True)[:settings.RECOMMENDATION_QUERY_TERMS]
+        return {feature: query[feature] for feature in best}
+
+
+class IndexNotBuilt(Exception):
+    """RECOMMENDATION_INDEX_DIR has no build yet: run build_recommendation_index."""
+
+
+_index = RecommendationIndex()
+os.register_at_fork(after_in_child=lambda: globals().update(_index=RecommendationIndex()))
+
+ARRAY_NAMES = ('indptr', 'rows', 'weights', 'df', 'job_ids')
+
+
+def _path(*names):
+    return os.path.join(settings.RECOMMENDATION_INDEX_DIR, *names)
+
+
+def _open_jobs():
+    from .models import Job
+    return Job.objects.filter(status=Job.JobStatus.OPEN).order_by().values_list('id', 'title', 'description').iterator(chunk_size=5000)
+
+
+def _current_build():
+    try:
+        with open(_path('current.json')) as manifest:
+            return json.load(manifest)['build']
+    except FileNotFoundError:
+        return None
+
+
+def _write_build(arrays, changes=()):
+    """
+    Saves `arrays` as a new build whose change log starts with `changes`, and makes it
+    current. Call with the lock held.
+    """
+    name = f'build-{time.time_ns()}'
+    os.makedirs(_path(name))
+    for array_name in ARRAY_NAMES:
+        np.save(_path(name, f'{array_name}.npy'), arrays[array_name])
+    open(_path(name, 'changes.log'), 'wb').close()
+    sharedfiles.append_records(_path(name, 'changes.log'), changes)
+    sharedfiles.write_atomically(_path('current.json'), json.dumps({'build': name}).encode())
+    for old_build in glob.glob(_path('build-*')): # Workers still mapping them keep their pages until they reload
+        if os.path.basename(old_build) != name:
+            shutil.rmtree(old_build, ignore_errors=True)
+
+
+def _load_shared():
+    """Call with the lock held."""
+    name = _current_build()
+    if name is None:
+        raise IndexNotBuilt
+    arrays = {array_name: np.load(_path(name, f'{array_name}.npy'), mmap_mode='r') for array_name in ARRAY_NAMES}
+    _index.load(arrays, _path(name, 'changes.log'))
+
+
+def _read_new_changes():
+    try:
+        _index.read_changes()
+    except FileNotFoundError: # Rebuilt by another process
+        return False
+    return True
+
+
+def _sync(locked=False):
+    if _index.ready and _read_new_changes():
+        return
+    if locked:
+        _load_shared()
+    else:
+        with sharedfiles.exclusive_lock(settings.RECOMMENDATION_INDEX_DIR):
+            _load_shared()
+
+
+def applicant_profile(applicant_id):
+    """
+    The applicant's term weights, from their RECOMMENDATION_PROFILE_SIZE latest applications
+    (job title, description and cover letter), and the ids of every job they applied to.
+    """
+    from apps.applications.models import Application
+    applications = (
+        Application.objects.filter(applicant_id=applicant_id).order_by('-appliedAt')
+        .values_list('job_id', 'job__title', 'job__description', 'coverLetter')
+    )
+    profile = Counter()
+    applied = set()
+    for position, (job_id, title, description, cover_letter) in enumerate(applications):
+        applied.add(str(job_id))
+        if position < settings.RECOMMENDATION_PROFILE_SIZE:
+            profile.update(job_terms(title, description))
+            profile.update(term_weights((cover_letter, 1)))
+    return dict(profile), applied
+
+
+def recommend(applicant_id, limit):
+    """
+    [(job id, score)] of the best Open jobs for the applicant, best first. Raises
+    IndexNotBuilt until build_recommendation_index has run.
+    """
+    profile, applied = applicant_profile(applicant_id)
+    if not profile:
+        return []
+    with _index.lock:
+        _sync()
+        index = RecommendationIndex() # Rank a consistent copy without holding the lock
+        index.arrays, index.opened, index.closed = _index.arrays, dict(_index.opened), set(_index.closed)
+    return index.rank(profile, applied, limit)
+
+
+def record_changes(opened=(), closed=(), reload=()):
+    """
+    Queues index changes for when the current transaction commits: `opened` (job id,
+    title, description) for jobs that became Open or were edited while Open, `closed` ids
+    of jobs no longer Open (or deleted), and `reload` ids whose state is read back then.
+    """
+    if np is None:
+        return
+    changes = [['open', str(job_id), title, description] for job_id, title, description in opened]
+    changes.extend(['close', str(job_id)] for job_id in closed)
+    if changes or reload:
+        transaction.on_commit(lambda: _publish(changes, reload))
+
+
+def _publish(changes, reload):
+    if reload:
+        from .models import Job
+        rows = Job.objects.filter(pk__in=reload).values_list('id', 'title', 'description', 'status')
+        reloaded = {str(job_id): (title, description, status) for job_id, title, description, status in rows}
+        for job_id in map(str, reload):
+            title, description, status = reloaded.get(job_id, (None, None, None))
+            changes.append(['open', job_id, title, description] if status == Job.JobStatus.OPEN else ['close', job_id])
+
+    with _index.lock, sharedfiles.exclusive_lock(settings.RECOMMENDATION_INDEX_DIR):
+        if _current_build() is None:
+            return # build_recommendation_index reads them from the database
+        _sync(locked=True)
+        sharedfiles.append_records(_index.log_path, changes)
+        _sync(locked=True)
+
+
+def rebuild():
+    """
+    Builds the index from the current Open jobs, folding in every logged change, and
+    returns the number of jobs indexed.
+    """
+    if np is None:
+        return
+    # Building takes a while at scale, so writers keep logging meanwhile; whatever they
+    # log after the build started is carried over (replaying a change is harmless).
+    with sharedfiles.exclusive_lock(settings.RECOMMENDATION_INDEX_DIR):
+        build = _current_build()
+        old_log = _path(build, 'changes.log') if build else None
+        start = os.path.getsize(old_log) if old_log else 0
+    arrays = build_arrays(_open_jobs())
+    with _index.lock, sharedfiles.exclusive_lock(settings.RECOMMENDATION_INDEX_DIR):
+        changes = sharedfiles.read_records(old_log, start)[0] if old_log else []
+        _write_build(arrays, changes)
+        _index.ready = False
+    return len(arrays['job_ids'])
+
+
+def reset():
+    """Deletes the shared index and forgets this process's copy (tests); requests answer 503 until the next build."""
+    with _index.lock, sharedfiles.exclusive_lock(settings.RECOMMENDATION_INDEX_DIR):
+        for name in glob.glob(_path('build-*')):
+            shutil.rmtree(name, ignore_errors=True)
+        for name in glob.glob(_path('current.json')):
+            os.remove(name)
+        _index.arrays, _index.opened, _index.closed = None, {}, set()
+        _index.ready = False
@@ -0,0 +1,116 @@
+import re
+import uuid
+from django.db import connection
+
+# Full-text search over job title, description and location.
+# - SQLite: an FTS5 table (jobs_job_fts) kept in sync from the Job signals.
+# - PostgreSQL: a GIN index over the tsvector expression below, maintained by Postgres itself.
+# Any other backend falls back to the old icontains filtering.
+
+FTS_TABLE = 'jobs_job_fts'
+PG_SEARCH_VECTOR = (
+    "to_tsvector('english', coalesce(jobs_job.title, '') || ' ' || "
+    "coalesce(jobs_job.description, '') || ' ' || coalesce(jobs_job.location, ''))"
+)
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def fts_rowid(job_id):
+    """
+    Maps a job UUID to a stable FTS5 rowid (top 63 bits of the UUID), so index rows
+    can be replaced or deleted by rowid without depending on jobs_job's own rowid.
+    """
+    if not isinstance(job_id, uuid.UUID):
+        job_id = uuid.UUID(str(job_id))
+    return job_id.int >> 65
+
+
+def _fts_match_expression(query):
+    """Turns free text into a safe FTS5 query: every word must match, as a prefix."""
+    tokens = TOKEN_RE.findall(query.lower())
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def search_jobs(queryset, query):
+    """
+    Filters a Job queryset to the jobs matching `query`, ordered by relevance.
+    The rank is exposed as the `search_rank` column (lower is better on SQLite,
+    higher is better on PostgreSQL, which is why the ordering differs).
+    """
+    vendor = connection.vendor
+    if vendor == 'sqlite':
+        match = _fts_match_expression(query)
+        if not match:
+            return queryset
+        return queryset.extra(
+            select={'search_rank': f'{FTS_TABLE}.rank'},
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.job_id = jobs_job.id', f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+        ).order_by('search_rank')
+
+    if vendor == 'postgresql':
+        if not TOKEN_RE.search(query):
+            return queryset
+        return queryset.extra(
+            select={'search_rank': f"ts_rank({PG_SEARCH_VECTOR}, plainto_tsquery('english', %s))"},
+            select_params=[query],
+            where=[f"{PG_SEARCH_VECTOR} @@ plainto_tsquery('english', %s)"],
+            params=[query],
+        ).order_by('-search_rank')
+
+    return queryset.filter(title__icontains=query)
+
+
+def index_jobs(jobs):
+    """
+    Adds or replaces index entries for an iterable of (id, title, description, location)
+    tuples. Only needed on SQLite; bulk writes that skip model signals must call this.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    rows = [
+        (fts_rowid(job_id), uuid.UUID(str(job_id)).hex, title, description, location or '')
+        for job_id, title, description, location in jobs
+    ]
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT OR REPLACE INTO {FTS_TABLE}(rowid, job_id, title, description, location) VALUES (%s, %s, %s, %s, %s)',
+            rows,
+        )
+
+
+def unindex_jobs(job_ids):
+    """Removes the index entries for the given job ids (SQLite only)."""
+    if connection.vendor != 'sqlite':
+        return
+    rows = [(fts_rowid(job_id),) for job_id in job_ids]
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', rows)
+
+
+def rebuild_index(batch_size=5000):
+    """Rebuilds the whole SQLite index from jobs_job. Returns the number of jobs indexed."""
+    from .models import Job
+
+    if connection.vendor != 'sqlite':
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+    total = 0
+    batch = []
+    rows = Job.objects.values_list('id', 'title', 'description', 'location').iterator(chunk_size=batch_size)
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            index_jobs(batch)
+            total += len(batch)
+            batch = []
+    index_jobs(batch)
+    return total + len(batch)
@@ -1,5 +1,7 @@
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Job
+from apps.core.serializers import ValuesSerializer, datetime_representation, uuid_representation
 
 class JobSerializer(serializers.ModelSerializer):
     """Serializer for displaying job details."""
@@ -9,14 +11,35 @@ class JobSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Job
-        fields = ('id', 'title', 'description', 'location', 'status', 'createdAt', 'companyName', 'application_count')
+        fields = ('id', 'title', 'description', 'location', 'status', 'createdAt', 'closesAt', 'companyName', 'application_count')
         read_only_fields = ('id', 'createdAt', 'companyName', 'application_count')
 
+class JobListSerializer(ValuesSerializer):
+    """Fast list counterpart of JobSerializer, built from .values() rows (same output)."""
+    fields = (
+        ('id', 'id', uuid_representation),
+        ('title', 'title', str),
+        ('description', 'description', str),
+        ('location', 'location', str),
+        ('status', 'status', str),
+        ('createdAt', 'createdAt', datetime_representation),
+        ('closesAt', 'closesAt', datetime_representation),
+        ('companyName', 'createdBy__name', str),
+        ('application_count', 'application_count', int),
+    )
+    annotations = ('application_count',)
+
 class JobCreateUpdateSerializer(serializers.ModelSerializer):
     """Serializer for creating and updating jobs."""
     class Meta:
         model = Job
-        fields = ('title', 'description', 'location', 'status')
+        fields = ('title', 'description', 'location', 'status', 'closesAt')
+
+    def validate_closesAt(self, value):
+        """A new deadline must be in the future (an unchanged past one is kept as it is)."""
+        if value and value <= timezone.now() and not (self.instance and value == self.instance.closesAt):
+            raise serializers.ValidationError("The closing date must be in the future.")
+        return value
 
     def validate_status(self, value):
         """
@@ -0,0 +1,99 @@
+from django.db.models.signals import post_init, post_save, post_delete
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.users.models import User
+from .locations import link_places, names_several
+from .models import Job, JobPlace
+from . import autocomplete, cache, recommendations, search
+
+
+@receiver(post_save, sender=Job)
+def index_saved_job(sender, instance, **kwargs):
+    """Keeps the full-text search index in sync with created/updated jobs."""
+    search.index_jobs([(instance.id, instance.title, instance.description, instance.location)])
+
+
+@receiver(post_delete, sender=Job)
+def unindex_deleted_job(sender, instance, **kwargs):
+    """Removes deleted jobs from the full-text search index."""
+    search.unindex_jobs([instance.id])
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_cached_listings(sender, instance, **kwargs):
+    """Creates, edits, status transitions and deletes all make cached listings stale."""
+    cache.invalidate_job_listings()
+
+
+NOT_LOADED = object()
+
+
+def _open_state(job):
+    """
+    What the job puts in the suggestion and recommendation indexes while it is Open
+    ((title, company id, description)), else None; NOT_LOADED when fields are deferred.
+    """
+    if not {'title', 'description', 'status', 'createdBy_id'} <= job.__dict__.keys():
+        return NOT_LOADED
+    return (job.title, job.createdBy_id, job.description) if job.status == Job.JobStatus.OPEN else None
+
+
+@receiver(post_init, sender=Job)
+def remember_open_state(sender, instance, **kwargs):
+    instance._open_state = _open_state(instance)
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def update_job_indexes(sender, instance, created=False, **kwargs):
+    """Suggestions and recommendations follow jobs being opened, edited, closed and deleted."""
+    before = None if created else instance._open_state
+    after = None if kwargs['signal'] is post_delete else _open_state(instance)
+    if NOT_LOADED in (before, after): # Saved with deferred fields: read it back
+        transaction.on_commit(autocomplete.rebuild)
+        recommendations.record_changes(reload=[instance.pk])
+    elif before != after:
+        listed_before, listed_after = before and before[:2], after and after[:2]
+        if listed_before != listed_after:
+            autocomplete.record_changes(
+                removed=[listed_before] if listed_before else [], added=[listed_after] if listed_after else [],
+            )
+        if after:
+            recommendations.record_changes(opened=[(instance.pk, after[0], after[2])])
+        else:
+            recommendations.record_changes(closed=[instance.pk])
+    instance._open_state = after
+
+
+@receiver(post_init, sender=Job)
+def remember_location(sender, instance, **kwargs):
+    instance._saved_location = instance.__dict__.get('location', NOT_LOADED)
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def link_job_places(sender, instance, created=False, update_fields=None, **kwargs):
+    """JobPlace rows follow locations naming several places; other saves and deletes cost no query."""
+    linked = not created and (instance._saved_location is NOT_LOADED or names_several(instance._saved_location))
+    if kwargs['signal'] is post_delete:
+        if linked:
+            JobPlace.objects.filter(job_id=instance.pk).delete()
+        return
+    if 'location' not in instance.__dict__ or (update_fields is not None and 'location' not in update_fields):
+        return
+    if linked or names_several(instance.location):
+        link_places([instance], created=not linked)
+    instance._saved_location = instance.location
+
+
+@receiver(post_save, sender=User)
+def touch_company_jobs(sender, instance, created, update_fields=None, **kwargs):
+    """Jobs embed the company name, so a rename changes them (and their ETags) too."""
+    if created or instance.role != User.Role.COMPANY or (update_fields and 'name' not in update_fields):
+        return
+    instance.jobs.update(updatedAt=timezone.now())
+    cache.invalidate_job_listings()
+    autocomplete.record_changes(renamed=[(instance.pk, instance.name)])
@@ -1,3 +1,831 @@
-from django.test import TestCase
+import csv
+import datetime
+import glob
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.applications.models import Application
+from apps.core.testing import BaseAPITestCase, QueryPlanTestMixin
+from . import autocomplete, cache as job_cache, recommendations, search
+from .checks import check_autocomplete_dir, check_listing_cache, check_recommendation_index_dir
+from .counters import COUNTER_FIELDS, actual_counters, record_new_applications
+from .expiry import close_expired_batch
+from .locations import places_within, resolve
+from .models import Job, JobPlace
+
+
+class JobQueryPlanTests(QueryPlanTestMixin, BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = cls.create_company()
+        cls.applicant = cls.create_applicant()
+        for i in range(30):
+            Job.objects.create(
+                title=f'Job {i}', description='Description', createdBy=cls.company,
+                status=[Job.JobStatus.OPEN, Job.JobStatus.DRAFT, Job.JobStatus.CLOSED][i % 3],
+            )
+        cls.job = Job.objects.filter(status=Job.JobStatus.OPEN).first()
+        for i in range(5):
+            applicant = cls.create_applicant('Applicant', f'a{i}@example.com')
+            Application.objects.create(applicant=applicant, job=cls.job, resumeLink='https://example.com/cv.pdf')
+
+    def test_browse_uses_open_jobs_index(self):
+        self.authenticate(self.applicant)
+        self.assertEndpointUsesIndex('/api/jobs/', 'jobs_job', ['jobs_open_created_idx', 'jobs_status_created_idx'])
+
+    def test_browse_cursor_mode_uses_open_jobs_index(self):
+        self.authenticate(self.applicant)
+        self.assertEndpointUsesIndex('/api/jobs/', 'jobs_job', ['jobs_open_created_idx', 'jobs_status_created_idx'], {'cursor': ''})
+
+    def test_my_jobs_uses_owner_index(self):
+        self.authenticate(self.company)
+        self.assertEndpointUsesIndex('/api/jobs/my-jobs/', 'jobs_job', ['jobs_owner_created_idx'])
+
+    def test_applications_for_job_uses_job_status_index(self):
+        self.authenticate(self.company)
+        self.assertEndpointUsesIndex(
+            f'/api/jobs/{self.job.id}/applications/', 'applications_application', ['apps_job_status_idx'],
+            {'status': Application.ApplicationStatus.APPLIED},
+        )
+
+    def test_applications_for_job_uses_job_applied_index(self):
+        self.authenticate(self.company)
+        self.assertEndpointUsesIndex(
+            f'/api/jobs/{self.job.id}/applications/', 'applications_application', ['apps_job_applied_idx', 'apps_job_status_idx'],
+        )
+
+
+class JobSearchTests(BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = cls.create_company()
+        cls.applicant = cls.create_applicant()
+        cls.titled = Job.objects.create(
+            title='Django Engineer', description='Django services on Postgres.', createdBy=cls.company, status='Open',
+        )
+        cls.mentioned = Job.objects.create(
+            title='Data Analyst', description='Reporting, dashboards and SQL. Some Django is a plus, as is Excel.',
+            createdBy=cls.company, status='Open', location='Lagos',
+        )
+
+    def search(self, query):
+        return [job.id for job in search.search_jobs(Job.objects.all(), query)]
+
+    def test_signals_keep_the_index_in_sync(self):
+        job = Job.objects.create(title='Kotlin Developer', description='Android apps.', createdBy=self.company)
+        self.assertEqual(self.search('kotlin'), [job.id])
+        job.title = 'Swift Developer'
+        job.save()
+        self.assertEqual(self.search('kotlin'), [])
+        self.assertEqual(self.search('swif'), [job.id]) # Words match as prefixes
+        job.delete()
+        self.assertEqual(self.search('swift'), [])
+
+    def test_q_ranks_by_relevance(self):
+        self.authenticate(self.applicant)
+        response = self.client.get('/api/jobs/', {'q': 'django'})
+        self.assertEqual([job['id'] for job in response.json()['object']], [str(self.titled.id), str(self.mentioned.id)])
+        response = self.client.get('/api/jobs/', {'q': 'django lagos'}) # Every word must match
+        self.assertEqual([job['id'] for job in response.json()['object']], [str(self.mentioned.id)])
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'Only the SQLite index is maintained by the app')
+    def test_rebuild_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {search.FTS_TABLE}')
+        self.assertEqual(self.search('django'), [])
+        out = io.StringIO()
+        call_command('rebuild_search_index', batch_size=1, stdout=out)
+        self.assertIn('Indexed 2 jobs', out.getvalue())
+        self.assertCountEqual(self.search('django'), [self.titled.id, self.mentioned.id])
+
+
+class JobResponseCacheTests(BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = cls.create_company()
+        cls.applicant = cls.create_applicant()
+        cls.job = Job.objects.create(title='Backend Engineer', description='Django', createdBy=cls.company, status=Job.JobStatus.OPEN)
+
+    def test_applicant_list_and_detail_are_served_from_cache(self):
+        self.authenticate(self.applicant)
+        first = self.client.get('/api/jobs/', {'title': 'Backend '})
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/jobs/', {'title': 'backend', 'unknown': 'x'})
+        self.assertEqual(cached.content, first.content)
+
+        detail = self.client.get(f'/api/jobs/{self.job.id}/')
+        with self.assertNumQueries(1): # The updatedAt lookup behind the ETag
+            self.assertEqual(self.client.get(f'/api/jobs/{self.job.id}/').content, detail.content)
+
+    def test_company_responses_are_not_cached(self):
+        self.authenticate(self.company)
+        self.client.get('/api/jobs/')
+        with self.assertNumQueries(2):
+            self.client.get('/api/jobs/')
+
+    def test_writes_invalidate_listing_and_detail(self):
+        self.authenticate(self.applicant)
+        self.assertEqual(len(self.client.get('/api/jobs/').json()['object']), 1)
+        self.client.get(f'/api/jobs/{self.job.id}/')
+
+        self.authenticate(self.company)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/jobs/', {'title': 'Frontend', 'description': 'React', 'status': 'Open'}, format='json')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/jobs/{self.job.id}/', {'title': 'Staff Engineer'}, format='json')
+
+        self.authenticate(self.applicant)
+        self.assertEqual(len(self.client.get('/api/jobs/').json()['object']), 2)
+        self.assertEqual(self.client.get(f'/api/jobs/{self.job.id}/').json()['object']['title'], 'Staff Engineer')
+
+        self.authenticate(self.company)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/jobs/{self.job.id}/', {'status': 'Closed'}, format='json')
+        self.authenticate(self.applicant)
+        self.assertEqual(self.client.get(f'/api/jobs/{self.job.id}/').status_code, 404)
+        self.assertEqual([job['title'] for job in self.client.get('/api/jobs/').json()['object']], ['Frontend'])
+
+    def test_concurrent_misses_wait_for_the_first_computation(self):
+        key = 'jobs:test:single-flight'
+        cache.add(f'{key}:lock', 1) # Another request is computing this key
+        threading.Timer(0.1, cache.set, (key, 'computed elsewhere')).start()
+
+        def compute():
+            raise AssertionError('the key should not be computed twice')
+
+        self.assertEqual(job_cache.get_or_compute(key, compute), 'computed elsewhere')
+
+
+    def test_listing_cache_must_be_shared(self):
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp/job-cache'}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_listing_cache(None), [])
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            self.assertEqual([error.id for error in check_listing_cache(None)], ['jobs.E001'])
+
+
+class JobFacetTests(BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.acme = cls.create_company()
+        cls.globex = cls.create_company('Globex')
+        cls.applicant = cls.create_applicant()
+        for company, location, status in [
+            (cls.acme, 'Lagos', 'Open'), (cls.acme, 'Lagos', 'Open'), (cls.acme, 'Nairobi', 'Closed'),
+            (cls.globex, 'Lagos', 'Open'), (cls.globex, None, 'Draft'),
+        ]:
+            Job.objects.create(title='Engineer', description='D', location=location, createdBy=company, status=status)
+
+    def test_counts_every_filtered_job_in_one_extra_query(self):
+        self.authenticate(self.acme)
+        with CaptureQueriesContext(connection) as plain:
+            self.client.get('/api/jobs/', {'pageSize': 1})
+        with CaptureQueriesContext(connection) as faceted:
+            response = self.client.get('/api/jobs/', {'pageSize': 1, 'facets': 'status,location,companyName'})
+        self.assertEqual(len(faceted), len(plain) + 1)
+        self.assertEqual(len(response.json()['object']), 1)
+        self.assertEqual(response.json()['facets'], {
+            'status': [{'value': 'Open', 'count': 3}, {'value': 'Closed', 'count': 1}, {'value': 'Draft', 'count': 1}],
+            'location': [{'value': 'Lagos, NG', 'count': 3}, {'value': 'Nairobi, KE', 'count': 1}, {'value': None, 'count': 1}],
+            'companyName': [{'value': 'Acme', 'count': 3}, {'value': 'Globex', 'count': 2}],
+        })
+
+    def test_facets_follow_filters_and_cache_key(self):
+        self.authenticate(self.applicant)
+        self.assertNotIn('facets', self.client.get('/api/jobs/').json())
+        response = self.client.get('/api/jobs/', {'facets': 'companyName', 'location': 'lagos'})
+        self.assertEqual(response.json()['facets'], {'companyName': [{'value': 'Acme', 'count': 2}, {'value': 'Globex', 'count': 1}]})
+
+    @override_settings(JOB_FACET_LIMIT=1)
+    def test_locations_are_grouped_by_place_and_limited_in_sql(self):
+        for location in ['lagos, NG', 'Remote - Lagos', 'Somewhere unknown']:
+            Job.objects.create(title='Engineer', description='D', location=location, createdBy=self.globex, status='Open')
+        self.authenticate(self.applicant)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/jobs/', {'facets': 'location,companyName'})
+        self.assertEqual(response.json()['facets'], {
+            'location': [{'value': 'Lagos, NG', 'count': 5}], 'companyName': [{'value': 'Globex', 'count': 4}],
+        })
+        facet_sql = next(q['sql'] for q in queries.captured_queries if 'UNION ALL' in q['sql'])
+        self.assertIn('ROW_NUMBER()', facet_sql)
+
+        with override_settings(JOB_FACET_LIMIT=5):
+            cache.clear()
+            locations = self.client.get('/api/jobs/', {'facets': 'location'}).json()['facets']['location']
+        self.assertEqual(locations, [{'value': 'Lagos, NG', 'count': 5}, {'value': 'Somewhere unknown', 'count': 1}])
+
+    def test_rejects_unknown_facets(self):
+        self.authenticate(self.applicant)
+        response = self.client.get('/api/jobs/', {'facets': 'status,salary'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('salary', str(response.json()['errors']))
+
+
+class JobLocationTests(QueryPlanTestMixin, BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = cls.create_company()
+        cls.applicant = cls.create_applicant()
+        cls.jobs = {
+            location: Job.objects.create(title='Engineer', description='D', location=location, createdBy=cls.company, status='Open')
+            for location in ['Lagos', 'lagos, NG', 'Remote - Lagos, Nigeria', 'Ibadan', 'Nairobi', 'London, CA', 'Remote']
+        }
+
+    def test_links_jobs_to_gazetteer_places(self):
+        self.assertEqual({location: job.place_id for location, job in self.jobs.items()}, {
+            'Lagos': 'lagos-ng', 'lagos, NG': 'lagos-ng', 'Remote - Lagos, Nigeria': 'lagos-ng',
+            'Ibadan': 'ibadan-ng', 'Nairobi': 'nairobi-ke', 'London, CA': 'london-ca', 'Remote': None,
+        })
+        job = self.jobs['Remote']
+        job.location = 'Kigali, Rwanda'
+        job.save(update_fields=['location'])
+        job.refresh_from_db()
+        self.assertEqual(job.place.name, 'Kigali')
+
+    def test_resolves_regions_and_ambiguous_locations(self):
+        self.assertEqual(resolve('London, Ontario'), 'london-ca')
+        self.assertEqual(resolve('London'), 'london-gb')
+        self.assertEqual(resolve('Seattle, Washington'), 'seattle-us')
+        self.assertIsNone(resolve('Remote (Nairobi or Lagos)')) # Several places
+        self.assertIsNone(resolve('Lagos, Portugal')) # No Lagos in that country
+
+    def test_location_filter_uses_the_places(self):
+        self.authenticate(self.applicant)
+        either = Job.objects.create(title='Engineer', description='D', location='Remote (Nairobi or Lagos)', createdBy=self.company, status='Open')
+        self.assertIsNone(either.place_id)
+        self.assertCountEqual(JobPlace.objects.filter(job=either).values_list('place_id', flat=True), ['nairobi-ke', 'lagos-ng'])
+        self.assertEndpointUsesIndex('/api/jobs/', 'jobs_job', ['jobs_place_status_idx'], {'location': 'lagos'})
+        for value in ['lagos', 'Lagos Nigeria']:
+            response = self.client.get('/api/jobs/', {'location': value})
+            self.assertCountEqual(
+                [job['location'] for job in response.json()['object']],
+                ['Lagos', 'lagos, NG', 'Remote - Lagos, Nigeria', 'Remote (Nairobi or Lagos)'],
+            )
+        response = self.client.get('/api/jobs/', {'location': 'remo'}) # No place: substring match
+        self.assertCountEqual(
+            [job['location'] for job in response.json()['object']], ['Remote - Lagos, Nigeria', 'Remote (Nairobi or Lagos)', 'Remote'],
+        )
+        either.location = 'Ibadan'
+        either.save()
+        self.assertFalse(JobPlace.objects.filter(job=either).exists())
+        response = self.client.get('/api/jobs/', {'location': 'nairobi'})
+        self.assertEqual([job['location'] for job in response.json()['object']], ['Nairobi'])
+        either.location = 'Nairobi or Ibadan'
+        either.save(update_fields=['location'])
+        self.assertCountEqual(JobPlace.objects.filter(job=either).values_list('place_id', flat=True), ['nairobi-ke', 'ibadan-ng'])
+        Job.objects.filter(pk=either.pk).delete()
+        self.assertFalse(JobPlace.objects.exists())
+
+    def test_radius_search(self):
+        self.authenticate(self.applicant)
+        self.assertEndpointUsesIndex('/api/jobs/', 'jobs_job', ['locations_coordinates_idx'], {'near': '6.52,3.37', 'radius': '150'})
+        near_lagos = self.client.get('/api/jobs/', {'near': '6.52,3.37'}) # 50 km by default
+        self.assertEqual(len(near_lagos.json()['object']), 3)
+        wider = self.client.get('/api/jobs/', {'near': '6.52,3.37', 'radius': '150'}) # Ibadan is ~115 km away
+        self.assertCountEqual(
+            [job['location'] for job in wider.json()['object']], ['Lagos', 'lagos, NG', 'Remote - Lagos, Nigeria', 'Ibadan'],
+        )
+        self.assertEqual(self.client.get('/api/jobs/', {'near': '-1.3,36.8', 'radius': '5'}).json()['object'][0]['location'], 'Nairobi')
+
+    def test_rejects_invalid_points_and_radii(self):
+        self.authenticate(self.applicant)
+        for params in [{'near': 'lagos'}, {'near': '91,0'}, {'near': '6.5,3.4', 'radius': '0'}, {'near': '6.5,3.4', 'radius': '5000'}]:
+            self.assertEqual(self.client.get('/api/jobs/', params).status_code, 400, params)
+
+    def test_bounding_box_wraps_around_the_antimeridian(self):
+        self.assertEqual([row['id'] for row in places_within(-36.85, -179.9, 600)], ['auckland-nz'])
+
+
+class JobAutocompleteTests(BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.acme = cls.create_company('Acme Robotics', 'acme@example.com')
+        cls.globex = cls.create_company('Globex')
+        cls.applicant = cls.create_applicant()
+        for company, title, status in [
+            (cls.acme, 'Senior Backend Engineer', 'Open'), (cls.acme, 'senior backend  engineer', 'Open'),
+            (cls.globex, 'Backend Developer', 'Open'), (cls.globex, 'Backend Intern', 'Draft'),
+        ]:
+            Job.objects.create(title=title, description='D', createdBy=company, status=status)
+
+    def setUp(self):
+        super().setUp()
+        autocomplete.reset()
+        self.addCleanup(autocomplete.reset)
+
+    def suggest(self, query, **params):
+        response = self.client.get('/api/jobs/autocomplete/', {'q': query, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [(item['type'], item['value'], item['jobCount']) for item in response.json()['object']]
+
+    def test_matches_word_prefixes_of_open_titles_and_companies(self):
+        self.authenticate(self.applicant)
+        self.assertEqual(self.suggest('BACK'), [
+            ('title', 'Senior Backend Engineer', 2), ('title', 'Backend Developer', 1),
+        ])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.suggest('eng'), [('title', 'Senior Backend Engineer', 2)])
+            self.assertEqual(self.suggest('robo'), [('company', 'Acme Robotics', 2)])
+            self.assertEqual(self.suggest('backend', limit=1), [('title', 'Senior Backend Engineer', 2)])
+            self.assertEqual(self.suggest(' '), [])
+
+    def test_follows_job_writes(self):
+        self.authenticate(self.applicant)
+        self.assertEqual(self.suggest('developer'), [('title', 'Backend Developer', 1)])
+
+        job = Job.objects.get(title='Backend Developer')
+        intern = Job.objects.get(title='Backend Intern')
+        with self.captureOnCommitCallbacks(execute=True):
+            job.status = Job.JobStatus.CLOSED
+            job.save()
+            intern.status = Job.JobStatus.OPEN
+            intern.save()
+            Job.objects.create(title='Data Engineer', description='D', createdBy=self.globex, status='Open')
+            self.globex.name = 'Globex Corporation'
+            self.globex.save()
+        self.assertEqual(self.suggest('developer'), [])
+        self.assertEqual(self.suggest('corp'), [('company', 'Globex Corporation', 2)])
+        self.assertEqual(self.suggest('engineer'), [('title', 'Senior Backend Engineer', 2), ('title', 'Data Engineer', 1)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Job.objects.filter(createdBy=self.globex).delete()
+        self.assertEqual(self.suggest('globex'), [])
+
+    def test_processes_share_changes_through_the_snapshot_files(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        other_process = autocomplete.AutocompleteIndex()
+        with override_settings(AUTOCOMPLETE_DIR=directory, AUTOCOMPLETE_COMPACT_EVERY=6):
+            self.assertEqual(len(autocomplete.suggest('backend')), 2)
+            for count, title in enumerate(['Go Developer', 'Rust Developer', 'Zig Developer'], 2): # 2 lines each: compacts on the third
+                with mock.patch.object(autocomplete, '_index', other_process), self.captureOnCommitCallbacks(execute=True):
+                    Job.objects.create(title=title, description='D', createdBy=self.acme, status='Open')
+                self.assertEqual(len(autocomplete.suggest('developer')), count)
+            self.assertEqual(autocomplete.suggest('acme'), [{'type': 'company', 'value': 'Acme Robotics', 'jobCount': 5}])
+            self.assertEqual(len([name for name in os.listdir(directory) if name.startswith('changes-')]), 1)
+
+    def test_lookups_do_not_wait_for_a_thread_applying_changes(self):
+        self.assertEqual(len(autocomplete.suggest('backend')), 2)
+        with mock.patch.object(autocomplete, '_index', autocomplete.AutocompleteIndex()), self.captureOnCommitCallbacks(execute=True):
+            Job.objects.create(title='Go Developer', description='D', createdBy=self.acme, status='Open')
+        with autocomplete._index.lock: # Held by another thread catching up
+            with self.assertNumQueries(0):
+                self.assertEqual(autocomplete.suggest('go'), [])
+        self.assertEqual(autocomplete.suggest('go'), [{'type': 'title', 'value': 'Go Developer', 'jobCount': 1}])
+
+    @override_settings(AUTOCOMPLETE_MAX_LIMIT=3)
+    def test_short_prefix_lists_follow_changes(self):
+        rng = random.Random(7)
+        words = ['alpha', 'alps', 'beta', 'best', 'bet', 'gamma', 'game']
+        titles = [' '.join(rng.sample(words, 2)) for _ in range(30)]
+        suggestions = autocomplete.Suggestions.from_snapshot({'titles': [(title, 1) for title in titles[:10]], 'companies': []})
+        for _ in range(40):
+            changes = [[autocomplete.TITLE, rng.choice(titles), rng.choice([1, 1, -1, -2])] for _ in range(3)]
+            suggestions = suggestions.changed(changes)
+            rebuilt = autocomplete.Suggestions(dict(suggestions.counts), dict(suggestions.labels))
+            self.assertEqual(suggestions.entries, rebuilt.entries)
+            self.assertEqual(suggestions.top, rebuilt.top)
+        self.assertEqual(len(suggestions.lookup('a', 10)), len(rebuilt.top['a']))
+        self.assertLessEqual(len(rebuilt.top['a']), 3)
+
+    def test_shared_directory_is_required(self):
+        self.assertEqual(check_autocomplete_dir(None), [])
+        with override_settings(AUTOCOMPLETE_DIR=''):
+            self.assertEqual([error.id for error in check_autocomplete_dir(None)], ['jobs.E002'])
+
+
+@unittest.skipIf(recommendations.np is None, 'numpy is not installed')
+class JobRecommendationTests(BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = cls.create_company()
+        cls.applicant = cls.create_applicant()
+        jobs = {}
+        for key, title, description, status in [
+            ('applied', 'Python Backend Engineer', 'Django APIs on Postgres.', 'Open'),
+            ('django', 'Django Developer', 'Build Django and Postgres services.', 'Open'),
+            ('python', 'Python Data Analyst', 'Reporting with pandas.', 'Open'),
+            ('android', 'Android Developer', 'Kotlin mobile apps.', 'Open'),
+            ('closed', 'Django Postgres Engineer', 'Django on Postgres.', 'Closed'),
+        ]:
+            jobs[key] = Job.objects.create(title=title, description=description, createdBy=cls.company, status=status)
+        cls.jobs = jobs
+        Application.objects.create(
+            applicant=cls.applicant, job=jobs['applied'], resumeLink='https://example.com/cv.pdf',
+            coverLetter='Five years of Django and Postgres.',
+        )
+
+    def setUp(self):
+        super().setUp()
+        recommendations.reset()
+        self.addCleanup(recommendations.reset)
+
+    def build(self):
+        call_command('build_recommendation_index', stdout=io.StringIO())
+
+    def recommended(self):
+        response = self.client.get('/api/jobs/recommended/')
+        self.assertEqual(response.status_code, 200, response.content)
+        return [job['title'] for job in response.json()['object']]
+
+    def test_ranks_open_jobs_by_similarity_to_the_applicants_history(self):
+        self.build()
+        self.authenticate(self.applicant)
+        self.assertEqual(self.recommended(), ['Django Developer', 'Python Data Analyst'])
+
+        self.authenticate(self.company)
+        self.assertEqual(self.client.get('/api/jobs/recommended/').status_code, 403)
+        self.authenticate(self.applicant)
+        with mock.patch.object(recommendations, 'np', None):
+            self.assertEqual(self.client.get('/api/jobs/recommended/').status_code, 503)
+
+    def test_requests_never_build_the_index(self):
+        self.authenticate(self.applicant)
+        with mock.patch.object(recommendations, 'build_arrays', wraps=recommendations.build_arrays) as build_arrays:
+            self.assertEqual(self.client.get('/api/jobs/recommended/').status_code, 503)
+            self.assertEqual(self.client.get('/api/jobs/recommended/').status_code, 503)
+        build_arrays.assert_not_called()
+        self.assertFalse(glob.glob(os.path.join(settings.RECOMMENDATION_INDEX_DIR, 'build-*')))
+
+        with self.captureOnCommitCallbacks(execute=True): # Nothing to log to yet: the build reads it
+            Job.objects.create(title='Senior Django Engineer', description='Django and Postgres.', createdBy=self.company, status='Open')
+        self.build()
+        self.assertEqual(self.recommended(), ['Senior Django Engineer', 'Django Developer', 'Python Data Analyst'])
+
+    def test_follows_jobs_opening_and_closing(self):
+        self.build()
+        self.authenticate(self.applicant)
+        self.recommended() # Maps the index in this process
+        with self.captureOnCommitCallbacks(execute=True):
+            Job.objects.create(title='Senior Django Engineer', description='Django and Postgres.', createdBy=self.company, status='Open')
+            self.jobs['django'].status = Job.JobStatus.CLOSED
+            self.jobs['django'].save()
+        self.assertEqual(self.recommended(), ['Senior Django Engineer', 'Python Data Analyst'])
+
+    def test_processes_share_a_memory_mapped_index(self):
+        directory = settings.RECOMMENDATION_INDEX_DIR
+        self.authenticate(self.applicant)
+        self.build()
+        self.assertEqual(self.recommended(), ['Django Developer', 'Python Data Analyst'])
+        self.assertIsInstance(recommendations._index.arrays['rows'], recommendations.np.memmap)
+
+        with mock.patch.object(recommendations, '_index', recommendations.RecommendationIndex()):
+            with self.captureOnCommitCallbacks(execute=True):
+                Job.objects.create(title='Django Lead', description='Django, Postgres.', createdBy=self.company, status='Open')
+                self.jobs['python'].status = Job.JobStatus.CLOSED
+                self.jobs['python'].save()
+        self.assertEqual(self.recommended(), ['Django Lead', 'Django Developer'])
+
+        self.build()
+        self.assertCountEqual(self.recommended(), ['Django Developer', 'Django Lead']) # IDF is recomputed
+        self.assertEqual(len(recommendations._index.arrays['job_ids']), Job.objects.filter(status='Open').count())
+        self.assertEqual(len([name for name in os.listdir(directory) if name.startswith('build-')]), 1)
+
+    def test_index_directory_is_required(self):
+        self.assertEqual(check_recommendation_index_dir(None), [])
+        with override_settings(RECOMMENDATION_INDEX_DIR=''):
+            self.assertEqual([error.id for error in check_recommendation_index_dir(None)], ['jobs.E003'])
+
+
+class ConditionalGetTests(BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = cls.create_company()
+        cls.applicant = cls.create_applicant()
+        cls.job = Job.objects.create(title='Backend Engineer', description='Django', createdBy=cls.company, status=Job.JobStatus.OPEN)
+
+    def test_job_detail_not_modified_until_the_job_changes(self):
+        self.authenticate(self.applicant)
+        url = f'/api/jobs/{self.job.id}/'
+        response = self.client.get(url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        with self.assertNumQueries(1):
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b'')
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+        self.job.title = 'Staff Engineer'
+        self.job.save()
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+        self.assertEqual(changed.json()['object']['title'], 'Staff Engineer')
+
+    def test_company_rename_changes_job_etag(self):
+        self.authenticate(self.applicant)
+        etag = self.client.get(f'/api/jobs/{self.job.id}/')['ETag']
+        self.company.name = 'Acme Holdings'
+        self.company.save()
+        response = self.client.get(f'/api/jobs/{self.job.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.json()['object']['companyName'], 'Acme Holdings')
+
+
+class ApplicationExportTests(BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = cls.create_company()
+        cls.job = Job.objects.create(title='Backend Engineer', description='Django', createdBy=cls.company, status=Job.JobStatus.OPEN)
+        for i in range(12):
+            applicant = cls.create_applicant(f'Applicant {i}', f'a{i}@example.com')
+            Application.objects.create(
+                applicant=applicant, job=cls.job, resumeLink='https://example.com/cv.pdf',
+                coverLetter='=HYPERLINK("http://evil")' if i == 0 else None,
+                status=Application.ApplicationStatus.HIRED if i % 4 == 0 else Application.ApplicationStatus.APPLIED,
+            )
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate(self.company)
+        self.url = f'/api/jobs/{self.job.id}/applications/export/'
+
+    def test_ndjson_matches_listing(self):
+        listing = self.client.get(f'/api/jobs/{self.job.id}/applications/', {'pageSize': 100}).json()['object']
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'exportFormat': 'ndjson'})
+            body = b''.join(response.streaming_content)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual([json.loads(line) for line in body.splitlines()], listing)
+
+    def test_csv_with_status_filter(self):
+        with mock.patch('apps.applications.export.ROWS_PER_WRITE', 2):
+            response = self.client.get(self.url, {'status': 'Hired'})
+            rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertIn('attachment', response['Content-Disposition'])
+        self.assertEqual(len(rows), 3)
+        self.assertEqual({row['status'] for row in rows}, {'Hired'})
+        self.assertIn('\'=HYPERLINK("http://evil")', [row['coverLetter'] for row in rows])
+        self.assertTrue(all(row['appliedAt'].endswith('Z') for row in rows))
+
+    def test_rejects_unknown_format_and_other_companies(self):
+        self.assertEqual(self.client.get(self.url, {'exportFormat': 'xlsx'}).status_code, 400)
+        other = self.create_company('Other')
+        self.authenticate(other)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class JobImportTests(BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = cls.create_company()
+        cls.closed = Job.objects.create(
+            title='Old role', description='Gone', createdBy=cls.company, status=Job.JobStatus.CLOSED, externalId='ats-closed',
+        )
+
+    def post_ndjson(self, rows):
+        body = '\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows)
+        return self.client.post('/api/jobs/import/', body, content_type='application/x-ndjson')
+
+    def test_creates_updates_and_reports_row_errors(self):
+        self.authenticate(self.company)
+        response = self.post_ndjson([
+            {'externalId': 'ats-1', 'title': 'Backend Engineer', 'description': 'Django', 'status': 'Open'},
+            {'externalId': 'ats-2', 'title': 'Designer', 'description': 'Figma', 'location': 'Lagos'},
+            {'externalId': 'ats-closed', 'title': 'Old role', 'description': 'Back', 'status': 'Open'},
+            {'externalId': 'ats-3', 'description': 'No title'},
+            '{not json',
+            {'externalId': 'ats-1', 'title': 'Duplicate', 'description': 'Again'},
+        ])
+        self.assertEqual(response.status_code, 200, response.content)
+        body = response.json()
+        self.assertEqual(body['object'], {'created': 2, 'updated': 0, 'failed': 4})
+        self.assertEqual([error['line'] for error in body['errors']], [3, 4, 5, 6])
+        self.assertIn('status', body['errors'][0]['errors'])
+        self.assertEqual(Job.objects.get(externalId='ats-2').status, Job.JobStatus.DRAFT)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post_ndjson([
+                {'externalId': 'ats-1', 'title': 'Senior Backend Engineer', 'description': 'Django', 'status': 'Closed'},
+            ])
+        self.assertEqual(response.json()['object'], {'created': 0, 'updated': 1, 'failed': 0})
+        job = Job.objects.get(externalId='ats-1')
+        self.assertEqual((job.title, job.status), ('Senior Backend Engineer', Job.JobStatus.CLOSED))
+        self.assertEqual(Job.objects.filter(createdBy=self.company).count(), 3)
+
+        # Imported jobs are searchable like ones created through the API
+        self.assertEqual(
+            [row['id'] for row in search.search_jobs(Job.objects.all(), 'senior backend').values('id')], [job.id]
+        )
+
+    def test_command_upserts_in_batches(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as feed:
+            for i in range(5):
+                feed.write(json.dumps({'externalId': f'ats-{i}', 'title': f'Job {i}', 'description': 'D', 'status': 'Open'}) + '\n')
+        self.addCleanup(os.unlink, feed.name)
+        out = io.StringIO()
+        call_command('import_jobs', feed.name, company=self.company.email, batch_size=2, stdout=out)
+        self.assertIn('5 job(s) created', out.getvalue())
+        call_command('import_jobs', feed.name, company=self.company.email, stdout=out)
+        self.assertIn('0 job(s) created, 5 updated', out.getvalue())
+        self.assertEqual(Job.objects.filter(createdBy=self.company, status=Job.JobStatus.OPEN).count(), 5)
+
+    def test_rows_that_fail_validation_stay_in_autocomplete(self):
+        Job.objects.create(
+            title='Platform Engineer', description='K8s', createdBy=self.company, status=Job.JobStatus.OPEN, externalId='ats-open',
+        )
+        autocomplete.reset()
+        self.addCleanup(autocomplete.reset)
+        self.authenticate(self.company)
+        self.client.get('/api/jobs/autocomplete/', {'q': 'platform'}) # Builds the index before the import
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post_ndjson([
+                {'externalId': 'ats-open', 'description': 'No title'},
+                {'externalId': 'ats-new', 'title': 'Data Engineer', 'description': 'SQL', 'status': 'Open'},
+            ])
+        self.assertEqual(response.json()['object'], {'created': 1, 'updated': 0, 'failed': 1})
+        suggestions = self.client.get('/api/jobs/autocomplete/', {'q': 'platform'}).json()['object']
+        self.assertEqual([(item['value'], item['jobCount']) for item in suggestions], [('Platform Engineer', 1)])
+
+    def test_rows_without_a_deadline_keep_the_existing_one(self):
+        closes_at = timezone.now() + datetime.timedelta(days=7)
+        Job.objects.create(title='Analyst', description='D', createdBy=self.company, externalId='ats-deadline', closesAt=closes_at)
+        self.authenticate(self.company)
+        response = self.post_ndjson([{'externalId': 'ats-deadline', 'title': 'Senior Analyst', 'description': 'D'}])
+        self.assertEqual(response.json()['object'], {'created': 0, 'updated': 1, 'failed': 0})
+        job = Job.objects.get(externalId='ats-deadline')
+        self.assertEqual((job.title, job.closesAt), ('Senior Analyst', closes_at))
+        self.post_ndjson([{'externalId': 'ats-deadline', 'title': 'Analyst', 'description': 'D', 'closesAt': None}])
+        self.assertIsNone(Job.objects.get(externalId='ats-deadline').closesAt)
+
+    def test_applicants_cannot_import(self):
+        applicant = self.create_applicant()
+        self.authenticate(applicant)
+        self.assertEqual(self.post_ndjson([{'externalId': 'x', 'title': 'T', 'description': 'D'}]).status_code, 403)
+
+
+class JobExpiryTests(QueryPlanTestMixin, BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = cls.create_company()
+        cls.applicant = cls.create_applicant()
+        past, future = timezone.now() - datetime.timedelta(hours=1), timezone.now() + datetime.timedelta(days=7)
+        cls.jobs = {
+            name: Job.objects.create(title=name, description='D', createdBy=cls.company, status=status, closesAt=closes_at)
+            for name, status, closes_at in [
+                ('Expired 1', 'Open', past), ('Expired 2', 'Open', past), ('Expired 3', 'Open', past),
+                ('Open until next week', 'Open', future), ('Open for good', 'Open', None),
+                ('Expired draft', 'Draft', past), ('Already closed', 'Closed', past),
+            ]
+        }
+
+    def setUp(self):
+        super().setUp()
+        autocomplete.reset()
+        self.addCleanup(autocomplete.reset)
+
+    def statuses(self):
+        return dict(Job.objects.values_list('title', 'status'))
+
+    def test_closes_expired_open_jobs_in_batches(self):
+        self.authenticate(self.applicant)
+        self.assertEqual(len(self.client.get('/api/jobs/').json()['object']), 5) # Cached until the sweep
+        self.assertEqual(len(self.client.get('/api/jobs/autocomplete/', {'q': 'expired'}).json()['object']), 3)
+
+        out = io.StringIO()
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            call_command('close_expired_jobs', batch_size=2, pause=0, stdout=out)
+        self.assertIn('Closed 3 expired jobs', out.getvalue())
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "jobs_job"')]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(self.statuses(), {
+            'Expired 1': 'Closed', 'Expired 2': 'Closed', 'Expired 3': 'Closed',
+            'Open until next week': 'Open', 'Open for good': 'Open', 'Expired draft': 'Draft', 'Already closed': 'Closed',
+        })
+        self.assertGreater(Job.objects.get(title='Expired 1').updatedAt, self.jobs['Expired 1'].updatedAt)
+
+        self.assertEqual(
+            [job['title'] for job in self.client.get('/api/jobs/').json()['object']], ['Open for good', 'Open until next week'],
+        )
+        self.assertEqual(self.client.get('/api/jobs/autocomplete/', {'q': 'expired'}).json()['object'], [])
+
+    def test_jobs_closed_by_another_sweeper_are_not_recorded_twice(self):
+        update = QuerySet.update
+
+        def close_first_elsewhere(queryset, **kwargs):
+            # Another sweeper closes 'Expired 1' between this one's read and its UPDATE
+            patched.stop()
+            Job.objects.filter(title='Expired 1').update(status='Closed', updatedAt=timezone.now() - datetime.timedelta(minutes=1))
+            return update(queryset, **kwargs)
+
+        patched = mock.patch.object(QuerySet, 'update', close_first_elsewhere)
+        patched.start()
+        with mock.patch.object(autocomplete, 'record_changes') as autocomplete_changes, \
+                mock.patch.object(recommendations, 'record_changes') as recommendation_changes:
+            self.assertEqual(close_expired_batch(3), 2)
+        self.assertCountEqual([title for title, _ in autocomplete_changes.call_args.kwargs['removed']], ['Expired 2', 'Expired 3'])
+        self.assertCountEqual(
+            recommendation_changes.call_args.kwargs['closed'], [self.jobs['Expired 2'].id, self.jobs['Expired 3'].id],
+        )
+
+    def test_finds_expired_jobs_by_index(self):
+        with CaptureQueriesContext(connection) as queries:
+            call_command('close_expired_jobs', stdout=io.StringIO())
+        select = next(q['sql'] for q in queries.captured_queries if q['sql'].startswith('SELECT') and '"closesAt"' in q['sql'])
+        self.assertIn('jobs_status_closes_idx', self.explain(select))
+
+    def test_deadlines_must_be_in_the_future(self):
+        self.authenticate(self.company)
+        yesterday = (timezone.now() - datetime.timedelta(days=1)).isoformat()
+        tomorrow = (timezone.now() + datetime.timedelta(days=1)).isoformat()
+        response = self.client.post('/api/jobs/', {'title': 'T', 'description': 'D', 'closesAt': yesterday})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('closesAt', str(response.json()['errors']))
+        response = self.client.post('/api/jobs/', {'title': 'T', 'description': 'D', 'closesAt': tomorrow})
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertIsNotNone(response.json()['object']['closesAt'])
+        # An unchanged past deadline does not block other edits
+        job = self.jobs['Expired draft']
+        response = self.client.patch(f'/api/jobs/{job.id}/', {'title': 'Renamed', 'closesAt': job.closesAt.isoformat()})
+        self.assertEqual(response.status_code, 200, response.content)
+
+
+class JobCounterTests(BaseAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = cls.create_company()
+        cls.applicants = [cls.create_applicant(f'Applicant {i}', f'applicant{i}@example.com') for i in range(3)]
+        cls.job = Job.objects.create(title='Backend Engineer', description='Django', createdBy=cls.company, status='Open')
+        cls.applications = [
+            Application.objects.create(applicant=applicant, job=cls.job, resumeLink='https://example.com/cv.pdf')
+            for applicant in cls.applicants
+        ]
+        record_new_applications(cls.job.id, 'Applied', count=len(cls.applications))
+
+    def counters(self):
+        job = Job.objects.get(pk=self.job.pk)
+        return {field: getattr(job, field) for field in COUNTER_FIELDS}
+
+    def assertCountersMatch(self):
+        self.assertEqual(self.counters(), actual_counters([self.job.id])[self.job.id])
+
+    def update_status(self, application, status):
+        self.authenticate(self.company)
+        response = self.client.patch(f'/api/applications/{application.id}/update-status/', {'status': status}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response
+
+    def test_status_updates_move_counters(self):
+        self.update_status(self.applications[0], 'Interview')
+        self.update_status(self.applications[0], 'Hired')
+        self.update_status(self.applications[1], 'Rejected')
+        self.update_status(self.applications[1], 'Rejected')
+        self.assertEqual(self.counters(), {
+            'applicationCount': 3, 'appliedCount': 1, 'reviewedCount': 0, 'interviewCount': 0, 'rejectedCount': 1, 'hiredCount': 1,
+        })
+        self.assertCountersMatch()
+
+    def test_concurrent_status_updates_keep_counters_exact(self):
+        from apps.applications.views import UpdateApplicationStatusView
+        stale = Application.objects.select_related('applicant', 'job__createdBy').get(pk=self.applications[0].pk)
+        # Another request moves the application after this one has read it
+        self.update_status(self.applications[0], 'Reviewed')
+        with mock.patch.object(UpdateApplicationStatusView, 'get_object', return_value=stale):
+            response = self.update_status(self.applications[0], 'Interview')
+        self.assertEqual(response.json()['object']['status'], 'Interview')
+        self.assertEqual(self.counters()['reviewedCount'], 0)
+        self.assertCountersMatch()
+
+    def test_status_changes_only_go_forward(self):
+        from apps.applications.views import UpdateApplicationStatusView
+        self.update_status(self.applications[0], 'Hired')
+        response = self.client.patch(f'/api/applications/{self.applications[0].id}/update-status/', {'status': 'Applied'}, format='json')
+        self.assertEqual(response.status_code, 400, response.content)
+
+        # Re-checked against the status a concurrent request left
+        stale = Application.objects.select_related('applicant', 'job__createdBy').get(pk=self.applications[1].pk)
+        self.update_status(self.applications[1], 'Rejected')
+        with mock.patch.object(UpdateApplicationStatusView, 'get_object', return_value=stale):
+            response = self.client.patch(f'/api/applications/{self.applications[1].id}/update-status/', {'status': 'Interview'}, format='json')
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertEqual(Application.objects.get(pk=self.applications[1].pk).status, 'Rejected')
+        self.assertCountersMatch()
+
+    def test_reconcile_job_counters(self):
+        other = Job.objects.create(title='Designer', description='Figma', createdBy=self.company, status='Open')
+        Job.objects.filter(pk=self.job.pk).update(appliedCount=7, hiredCount=4)
+        Job.objects.filter(pk=other.pk).update(applicationCount=2)
+        out = io.StringIO()
+        call_command('reconcile_job_counters', batch_size=1, stdout=out)
+        self.assertIn('Fixed counters on 2 jobs', out.getvalue())
+        self.assertCountersMatch()
+        self.assertEqual(Job.objects.get(pk=other.pk).applicationCount, 0)
+        out = io.StringIO()
+        call_command('reconcile_job_counters', stdout=out)
+        self.assertIn('Fixed counters on 0 jobs', out.getvalue())
@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import JobViewSet
+from .views import JobViewSet, AsyncJobViewSet
+from apps.core.routing import with_async_reads
 from apps.applications.views import ApplyForJobView # Import the apply view
 
 router = DefaultRouter()
@@ -9,5 +10,5 @@ router.register('', JobViewSet, basename='job')
 urlpatterns = [
     # US6: The endpoint to apply for a job is nested under the job
     path('<uuid:job_id>/apply/', ApplyForJobView.as_view(), name='apply-for-job'),
-    path('', include(router.urls)),
+    path('', include(with_async_reads(router.urls, AsyncJobViewSet))),
 ]
\ No newline at end of file
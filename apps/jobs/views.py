@@ -2,16 +2,24 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Count
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.conf import settings
+from django.db.models import F
 
 from .models import Job
-from .serializers import JobSerializer, JobCreateUpdateSerializer
-from apps.core.permissions import IsCompanyUser, IsJobOwner
+from .serializers import JobSerializer, JobListSerializer, JobCreateUpdateSerializer
+from apps.core.mixins import FastListMixin, ConditionalGetMixin, AsyncAPIViewMixin
+from apps.core.parsers import NDJSONParser
+from apps.core.permissions import IsCompanyUser, IsApplicantUser, IsJobOwner
 from apps.applications.models import Application
-from apps.applications.serializers import ApplicationSerializer # Import from applications app
+from apps.applications.serializers import ApplicationSerializer, ApplicationListSerializer # Import from applications app
+from apps.applications.export import EXPORT_FORMATS, stream_applications
 from .filters import JobFilter
+from .importer import import_jobs
+from .facets import parse_facets, facet_counts, afacet_counts
+from . import cache as job_cache, autocomplete as job_autocomplete, recommendations as job_recommendations
 
-class JobViewSet(viewsets.ModelViewSet):
+class JobViewSet(FastListMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for handling Jobs.
     - US3: Create Job
@@ -23,14 +31,28 @@ class JobViewSet(viewsets.ModelViewSet):
     """
     filter_backends = [DjangoFilterBackend]
     filterset_class = JobFilter
+    # Max queries per action, asserted in apps/core/tests.py (transaction statements excluded)
+    query_budgets = {
+        'list': 2, 'retrieve': 2, 'create': 2, 'update': 3, 'partial_update': 3, 'destroy': 4,
+        'my_jobs': 2, 'applications_for_job': 3, 'export_applications': 2,
+        'autocomplete': 2, # Only when the process builds its suggestion index; 0 afterwards
+        'recommended': 2, # Profile and jobs (requests never build the index)
+    }
+
+    @property
+    def cursor_ordering(self):
+        # Keyset used by CustomPagination's opt-in cursor mode
+        if self.action == 'applications_for_job':
+            return ('appliedAt', 'id')
+        return ('createdAt', 'id')
 
     def get_queryset(self):
         user = self.request.user
-        queryset = Job.objects.select_related('createdBy').all()
+        queryset = Job.objects.select_related('createdBy').order_by('-createdAt', '-id')
 
-        if self.action in ['my_jobs', 'applications_for_job']:
-            # Companies see their own jobs with application counts
-            return queryset.filter(createdBy=user).annotate(application_count=Count('applications'))
+        if self.action in ['my_jobs', 'applications_for_job', 'export_applications']:
+            # Companies see their own jobs with application counts (denormalized on Job)
+            return queryset.filter(createdBy_id=user.pk).annotate(application_count=F('applicationCount'))
         elif user.is_authenticated and user.role == 'company':
              # Companies see all jobs, but 'my_jobs' is the dedicated endpoint for their own
              return queryset
@@ -38,14 +60,22 @@ class JobViewSet(viewsets.ModelViewSet):
             # Applicants and unauthenticated users see only 'Open' jobs
             return queryset.filter(status=Job.JobStatus.OPEN)
 
+    def filter_queryset(self, queryset):
+        # On the applications actions, `status` filters the applications, not the job lookup
+        if self.action in ['applications_for_job', 'export_applications']:
+            return queryset
+        return super().filter_queryset(queryset)
+
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
             return JobCreateUpdateSerializer
         return JobSerializer
 
     def get_permissions(self):
-        if self.action in ['create', 'my_jobs', 'applications_for_job']:
+        if self.action in ['create', 'my_jobs', 'applications_for_job', 'export_applications', 'bulk_import']:
             self.permission_classes = [permissions.IsAuthenticated, IsCompanyUser]
+        elif self.action == 'recommended':
+            self.permission_classes = [permissions.IsAuthenticated, IsApplicantUser]
         elif self.action in ['update', 'partial_update', 'destroy']:
             self.permission_classes = [permissions.IsAuthenticated, IsJobOwner]
         else: # list, retrieve
@@ -53,38 +83,118 @@ class JobViewSet(viewsets.ModelViewSet):
         return super().get_permissions()
 
     def perform_create(self, serializer):
-        serializer.save(createdBy=self.request.user)
+        serializer.save(createdBy_id=self.request.user.pk)
 
     # Custom action for a company to view their posted jobs (US8)
     @action(detail=False, methods=['get'], url_path='my-jobs')
     def my_jobs(self, request):
         queryset = self.filter_queryset(self.get_queryset())
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.list_response(queryset, JobSerializer, JobListSerializer)
+
+    # Search-box suggestions (job titles and company names of open jobs) from an in-process index
+    @action(detail=False, methods=['get'], url_path='autocomplete')
+    def autocomplete(self, request):
+        limit = self.get_limit(settings.AUTOCOMPLETE_LIMIT, settings.AUTOCOMPLETE_MAX_LIMIT)
+        suggestions = job_autocomplete.suggest(request.query_params.get('q', ''), limit)
+        return Response({
+            "success": True, "message": "Suggestions retrieved successfully.", "object": suggestions, "errors": None
+        })
+
+    # Open jobs ranked for an applicant by similarity to the jobs they applied to (see recommendations.py)
+    @action(detail=False, methods=['get'], url_path='recommended')
+    def recommended(self, request):
+        if job_recommendations.np is None:
+            return Response({
+                "success": False, "message": "Recommendations are not available.",
+                "object": None, "errors": ["Recommendations need numpy installed on the server."]
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        limit = self.get_limit(settings.RECOMMENDATION_LIMIT, settings.RECOMMENDATION_MAX_LIMIT)
+        try:
+            ranked = job_recommendations.recommend(request.user.pk, limit)
+        except job_recommendations.IndexNotBuilt:
+            return Response({
+                "success": False, "message": "Recommendations are not available yet.",
+                "object": None, "errors": ["The recommendation index has not been built yet."]
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        jobs = {}
+        if ranked:
+            queryset = self.get_queryset().filter(pk__in=[job_id for job_id, _ in ranked]) # Open jobs only
+            jobs = {str(row['id']): row for row in JobListSerializer.values(queryset)}
+        rows = [jobs[job_id] for job_id, _ in ranked if job_id in jobs]
+        return Response({
+            "success": True, "message": "Recommended jobs retrieved successfully.",
+            "object": JobListSerializer(rows).data, "errors": None
+        })
+
+    def get_limit(self, default, maximum):
+        # Like pageSize: a missing or invalid `limit` means the default
+        try:
+            return max(1, min(int(self.request.query_params['limit']), maximum))
+        except (KeyError, ValueError):
+            return default
 
+    # Custom action for a company to sync many jobs at once from its ATS (NDJSON, one job per line)
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[NDJSONParser])
+    def bulk_import(self, request):
+        lines = request.data if not isinstance(request.data, dict) else [] # Empty body: nothing to parse
+        summary = import_jobs(request.user.pk, lines)
+        return Response({
+            "success": not summary['failed'],
+            "message": f"{summary['created']} job(s) created, {summary['updated']} updated, {summary['failed']} failed.",
+            "object": {key: summary[key] for key in ('created', 'updated', 'failed')},
+            "errors": summary['errors'] or None
+        })
 
     # Custom action for a company to view applications for one of their jobs (US10)
     @action(detail=True, methods=['get'], url_path='applications')
     def applications_for_job(self, request, pk=None):
         job = self.get_object() # This already checks ownership via get_permissions
-        applications = Application.objects.filter(job=job).select_related('applicant')
+        return self.list_response(self.get_job_applications(job), ApplicationSerializer, ApplicationListSerializer)
+
+    def get_job_applications(self, job):
+        applications = Application.objects.filter(job=job).select_related('applicant', 'job__createdBy').order_by('-appliedAt', '-id')
 
         # Optional filtering by application status
+        status_filter = self.request.query_params.get('status')
+        if status_filter:
+            applications = applications.filter(status=status_filter)
+        return applications
+
+    # Custom action for a company to download every application for one of their jobs at once
+    @action(detail=True, methods=['get'], url_path='applications/export')
+    def export_applications(self, request, pk=None):
+        job = self.get_object()
+        export_format = request.query_params.get('exportFormat', 'csv') # `format` is DRF's renderer override
+        if export_format not in EXPORT_FORMATS:
+            return Response({
+                "success": False, "message": f"exportFormat must be one of: {', '.join(EXPORT_FORMATS)}.",
+                "object": None, "errors": ["Invalid export format."]
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        applications = Application.objects.filter(job=job).order_by('-appliedAt', '-id')
         status_filter = request.query_params.get('status')
         if status_filter:
             applications = applications.filter(status=status_filter)
+        return stream_applications(applications, export_format, f'applications-{job.id}')
 
-        page = self.paginate_queryset(applications)
-        if page is not None:
-            serializer = ApplicationSerializer(page, many=True) # Use ApplicationSerializer
-            return self.get_paginated_response(serializer.data)
+    def use_response_cache(self):
+        # Everyone but companies gets the same Open-jobs data, so it can be shared (see cache.py)
+        return self.request.user.role != 'company'
 
-        serializer = ApplicationSerializer(applications, many=True)
-        return Response(serializer.data)
+    def list(self, request, *args, **kwargs):
+        facets = parse_facets(request.query_params.get('facets', ''))
+        if self.use_response_cache():
+            key = job_cache.list_cache_key(request.query_params, JobFilter.base_filters)
+            return Response(job_cache.get_or_compute(key, lambda: self.list_jobs(facets).data))
+        return self.list_jobs(facets)
+
+    def list_jobs(self, facets=()):
+        queryset = self.filter_queryset(self.get_queryset())
+        response = self.list_response(queryset, JobSerializer, JobListSerializer)
+        if facets: # Counts over every filtered job, not just this page, in one extra query (see facets.py)
+            response.data['facets'] = facet_counts(queryset, facets)
+        return response
 
     # Overriding default responses to match the required format
     def create(self, request, *args, **kwargs):
@@ -94,10 +204,31 @@ class JobViewSet(viewsets.ModelViewSet):
         })
 
     def retrieve(self, request, *args, **kwargs):
-        response = super().retrieve(request, *args, **kwargs)
-        return Response({
+        # Polled by clients: answer If-None-Match/If-Modified-Since from the job's updatedAt alone
+        updated_at = self.get_updated_at(kwargs['pk'])
+        if updated_at is None: # Missing, not visible to this user, or a malformed id: the usual 404
+            return Response(self.retrieve_job())
+
+        def build_response():
+            if self.use_response_cache():
+                key = job_cache.detail_cache_key(kwargs['pk'], updated_at)
+                return Response(job_cache.get_or_compute(key, self.retrieve_job))
+            return Response(self.retrieve_job())
+
+        return self.conditional_response(request, (kwargs['pk'], updated_at), build_response, last_modified=updated_at)
+
+    def get_updated_at(self, pk):
+        try:
+            rows = list(self.get_queryset().filter(pk=pk).order_by().values_list('updatedAt', flat=True))
+        except (ValueError, DjangoValidationError):
+            return None
+        return rows[0] if rows else None
+
+    def retrieve_job(self):
+        response = super().retrieve(self.request, *self.args, **self.kwargs)
+        return {
             "success": True, "message": "Job retrieved successfully.", "object": response.data, "errors": None
-        })
+        }
 
     def update(self, request, *args, **kwargs):
         response = super().update(request, *args, **kwargs)
@@ -111,4 +242,60 @@ class JobViewSet(viewsets.ModelViewSet):
             "success": True, "message": "Job deleted successfully.", "object": None, "errors": None
         }, status=status.HTTP_204_NO_CONTENT)
 
-    # Note: The paginated response for list() is handled by the CustomPagination class.
\ No newline at end of file
+    # Note: The paginated response for list() is handled by the CustomPagination class.
+
+
+class AsyncJobViewSet(AsyncAPIViewMixin, JobViewSet):
+    """
+    Async versions of job browse, job details and a job's applications, with the same
+    responses, caching and ETags. Served on JobViewSet's URLs for GET/HEAD when
+    ASYNC_READ_VIEWS is on (see apps/jobs/urls.py).
+    """
+    async_actions = ('list', 'retrieve', 'applications_for_job')
+
+    async def list(self, request, *args, **kwargs):
+        facets = parse_facets(request.query_params.get('facets', ''))
+        if self.use_response_cache():
+            key = await job_cache.alist_cache_key(request.query_params, JobFilter.base_filters)
+            return Response(await job_cache.aget_or_compute(key, lambda: self.alist_jobs_data(facets)))
+        return await self.alist_jobs(facets)
+
+    async def alist_jobs(self, facets=()):
+        queryset = self.filter_queryset(self.get_queryset())
+        response = await self.alist_response(queryset, JobSerializer, JobListSerializer)
+        if facets:
+            response.data['facets'] = await afacet_counts(queryset, facets)
+        return response
+
+    async def alist_jobs_data(self, facets=()):
+        return (await self.alist_jobs(facets)).data
+
+    async def retrieve(self, request, *args, **kwargs):
+        updated_at = await self.aget_updated_at(kwargs['pk'])
+        if updated_at is None:
+            return Response(await self.aretrieve_job())
+
+        async def build_response():
+            if self.use_response_cache():
+                key = job_cache.detail_cache_key(kwargs['pk'], updated_at)
+                return Response(await job_cache.aget_or_compute(key, self.aretrieve_job))
+            return Response(await self.aretrieve_job())
+
+        return await self.aconditional_response(request, (kwargs['pk'], updated_at), build_response, last_modified=updated_at)
+
+    async def aget_updated_at(self, pk):
+        try:
+            queryset = self.get_queryset().filter(pk=pk).order_by().values_list('updatedAt', flat=True)
+        except (ValueError, DjangoValidationError):
+            return None
+        return await queryset.afirst()
+
+    async def aretrieve_job(self):
+        instance = await self.aget_object()
+        return {
+            "success": True, "message": "Job retrieved successfully.", "object": self.get_serializer(instance).data, "errors": None
+        }
+
+    async def applications_for_job(self, request, pk=None):
+        job = await self.aget_object()
+        return await self.alist_response(self.get_job_applications(job), ApplicationSerializer, ApplicationListSerializer)
\ No newline at end of file
@@ -0,0 +1,102 @@
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+REVOCATION_KEY = 'jwt-revoked:{}'
+# Sub-second issue time: `iat` is whole seconds, too coarse to order a token against a revocation
+ISSUED_AT_CLAIM = 'issued_at'
+
+
+class ClaimsUser(TokenUser):
+    """
+    A request user built from the access token claims set by CustomTokenObtainPairSerializer
+    (`user_id`, `role`, `name`), so permissions and ownership checks need no query.
+    Any other attribute (e.g. `email`) loads the full User row once, on first access.
+    """
+
+    @cached_property
+    def id(self):
+        return uuid.UUID(str(self.token[api_settings.USER_ID_CLAIM]))
+
+    @cached_property
+    def pk(self):
+        return self.id
+
+    @cached_property
+    def role(self):
+        return self.token.get('role')
+
+    @cached_property
+    def name(self):
+        return self.token.get('name')
+
+    @cached_property
+    def instance(self):
+        """The full User model instance (one database query)."""
+        return User.objects.get(pk=self.id)
+
+    def __eq__(self, other):
+        if isinstance(other, User):
+            return self.id == other.pk
+        return super().__eq__(other)
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __getattr__(self, attr):
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        if attr in self.token:
+            return self.token[attr]
+        return getattr(self.instance, attr)
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWT authentication that trusts the token claims instead of loading users_user on every
+    request. Tokens issued before a user's revocation timestamp are rejected.
+    """
+
+    def get_user(self, validated_token):
+        if is_revoked(validated_token):
+            raise AuthenticationFailed('Token has been revoked.', code='token_revoked')
+        return ClaimsUser(validated_token)
+
+
+def revocation_cache():
+    """
+    The cache holding revocation timestamps (JWT_REVOCATION_CACHE). It must be shared by
+    every worker, which the `users.E001` system check enforces.
+    """
+    return caches[settings.JWT_REVOCATION_CACHE]
+
+
+def is_revoked(token):
+    """
+    Whether an access or refresh token was issued before its user's tokens were revoked.
+    Tokens without ISSUED_AT_CLAIM fall back to `iat`, which rounds down, so a token issued
+    in the same second as the revocation counts as older.
+    """
+    revoked_at = revocation_cache().get(REVOCATION_KEY.format(token[api_settings.USER_ID_CLAIM]))
+    return revoked_at is not None and token.get(ISSUED_AT_CLAIM, token.get('iat', 0)) < revoked_at
+
+
+def revoke_user_tokens(*user_ids):
+    """
+    Rejects every access and refresh token issued to the users so far. The entries only
+    need to live as long as the longest-lived token does.
+    """
+    lifetime = max(settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'], settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME'])
+    now = time.time()
+    revocation_cache().set_many(
+        {REVOCATION_KEY.format(user_id): now for user_id in user_ids}, timeout=lifetime.total_seconds()
+    )
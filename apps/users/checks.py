@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Caches whose entries other processes can't see: a token revoked in one worker would
+# still be accepted by the others
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.security)
+def check_revocation_cache(app_configs, **kwargs):
+    """Stateless JWT auth only honours revocations when every worker reads the same cache."""
+    if 'apps.users.authentication.StatelessJWTAuthentication' not in settings.REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES']:
+        return []
+    alias = settings.JWT_REVOCATION_CACHE
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend is None or backend in PROCESS_LOCAL_CACHES:
+        return [Error(
+            f"StatelessJWTAuthentication needs a cache shared by all workers for token revocation, "
+            f"but CACHES[{alias!r}] is {backend or 'not configured'}.",
+            hint="Point JWT_REVOCATION_CACHE at a file-based, database, Redis or Memcached cache.",
+            id='users.E001',
+        )]
+    return []
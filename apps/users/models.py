@@ -2,7 +2,22 @@ import uuid
 from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 
-class UserManager(BaseUserManager):
+# Fields the access token's claims depend on: changing them revokes the user's tokens
+AUTH_FIELDS = ('role', 'password', 'is_active')
+
+class UserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        # Bulk updates skip the post_save signal that revokes tokens (see signals.py)
+        if 'role' not in kwargs and 'password' not in kwargs and kwargs.get('is_active', True) is True:
+            return super().update(**kwargs)
+        from .authentication import revoke_user_tokens
+        user_ids = list(self.values_list('pk', flat=True))
+        updated = super().update(**kwargs)
+        if user_ids:
+            revoke_user_tokens(*user_ids)
+        return updated
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError('The Email field must be set')
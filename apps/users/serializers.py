@@ -1,7 +1,10 @@
 import re
+import time
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 from django.contrib.auth.password_validation import validate_password
+from .authentication import ISSUED_AT_CLAIM, is_revoked
 from .models import User
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -47,8 +50,16 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         token['user_id'] = str(user.id)
         token['role'] = user.role
         token['name'] = user.name
+        token[ISSUED_AT_CLAIM] = time.time() # Copied into the access tokens it mints
         return token
 
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    # The new access token copies the refresh token's claims (e.g. `role`): refuse refresh tokens issued before a revocation
+    def validate(self, attrs):
+        if is_revoked(self.token_class(attrs['refresh'])):
+            raise AuthenticationFailed("Token has been revoked.", code='token_revoked')
+        return super().validate(attrs)
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -0,0 +1,33 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .authentication import revoke_user_tokens
+from .models import AUTH_FIELDS, User
+
+
+def auth_state(user):
+    # Deferred fields are left out rather than loaded
+    return {field: user.__dict__[field] for field in AUTH_FIELDS if field in user.__dict__}
+
+
+@receiver(post_init, sender=User)
+def remember_auth_state(sender, instance, **kwargs):
+    instance._auth_state = auth_state(instance)
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens_on_auth_change(sender, instance, created, **kwargs):
+    """
+    Stateless JWT auth trusts the token's `role` and never re-reads is_active or the
+    password, so deactivating a user or changing either revokes outstanding tokens.
+    """
+    previous, current = instance._auth_state, auth_state(instance)
+    changed = any(previous[field] != value for field, value in current.items() if field in previous)
+    if not created and (changed or current.get('is_active') is False):
+        revoke_user_tokens(instance.pk)
+    instance._auth_state = current
+
+
+@receiver(post_delete, sender=User)
+def revoke_tokens_of_deleted_user(sender, instance, **kwargs):
+    revoke_user_tokens(instance.pk)
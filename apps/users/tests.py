@@ -1,3 +1,93 @@
-from django.test import TestCase
+from django.test import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from apps.core.testing import BaseAPITestCase
+from .authentication import ClaimsUser, StatelessJWTAuthentication, revoke_user_tokens
+from .checks import check_revocation_cache
+from .models import User
+from .serializers import CustomTokenObtainPairSerializer
+
+
+class StatelessJWTAuthenticationTests(BaseAPITestCase):
+    url = '/api/applications/my-applications/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.applicant = cls.create_applicant()
+
+    def setUp(self):
+        super().setUp()
+        self.refresh = CustomTokenObtainPairSerializer.get_token(self.applicant)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.refresh.access_token}')
+
+    def assertRevoked(self):
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        response = self.client.post('/api/auth/token/refresh/', {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_user_comes_from_the_claims(self):
+        token = AccessToken(str(self.refresh.access_token))
+        with self.assertNumQueries(0):
+            user = StatelessJWTAuthentication().get_user(token)
+            self.assertIsInstance(user, ClaimsUser)
+            self.assertEqual((user.pk, user.role, user.name), (self.applicant.pk, 'applicant', 'Jane Doe'))
+            self.assertEqual(user, self.applicant)
+            self.assertTrue(user.is_authenticated)
+        # Anything else loads the row, once
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, 'jane.doe@example.com')
+            self.assertTrue(user.is_verified)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_deactivation_revokes_tokens(self):
+        self.applicant.is_active = False
+        self.applicant.save()
+        self.assertRevoked()
+
+    def test_role_change_revokes_tokens(self):
+        self.applicant.role = User.Role.COMPANY
+        self.applicant.save()
+        self.assertRevoked()
+
+    def test_password_change_revokes_tokens(self):
+        self.applicant.set_password('a new password')
+        self.applicant.save()
+        self.assertRevoked()
+
+    def test_deletion_revokes_tokens(self):
+        User.objects.get(pk=self.applicant.pk).delete()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_bulk_updates_revoke_tokens(self):
+        User.objects.filter(pk=self.applicant.pk).update(is_active=False)
+        self.assertRevoked()
+
+    def test_other_changes_keep_tokens(self):
+        User.objects.filter(pk=self.applicant.pk).update(is_verified=True)
+        self.applicant.name = 'Jane Smith'
+        self.applicant.save()
+        user = User.objects.only('pk').get(pk=self.applicant.pk)
+        user.last_login = user.date_joined
+        user.save(update_fields=['last_login'])
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_tokens_issued_after_a_revocation_are_accepted(self):
+        # Within the same second as the revocation: the login that follows a password change
+        revoke_user_tokens(self.applicant.pk)
+        refresh = CustomTokenObtainPairSerializer.get_token(self.applicant)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        response = self.client.post('/api/auth/token/refresh/', {'refresh': str(refresh)}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.refresh.access_token}')
+        self.assertRevoked()
+
+    def test_revocation_cache_must_be_shared(self):
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                  'revocations': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp/revocations'}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_revocation_cache(None), [])
+        caches = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                  'revocations': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        with override_settings(CACHES=caches):
+            self.assertEqual([error.id for error in check_revocation_cache(None)], ['users.E001'])
@@ -3,6 +3,7 @@ from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.core.signing import TimestampSigner, SignatureExpired, BadSignature
 from django.shortcuts import get_object_or_404
+from django.db import transaction
 
 from .models import User
 from .serializers import UserRegistrationSerializer, CustomTokenObtainPairSerializer, UserSerializer
@@ -11,7 +12,7 @@ from apps.core.utils import send_verification_email
 class UserRegistrationView(generics.CreateAPIView):
     """
     US1: User Registration for 'applicant' or 'company'.
-    Sends a verification email upon successful registration.
+    Queues a verification email upon successful registration.
     """
     queryset = User.objects.all()
     permission_classes = [permissions.AllowAny]
@@ -20,10 +21,12 @@ class UserRegistrationView(generics.CreateAPIView):
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = serializer.save()
 
-        # Send verification email
-        send_verification_email(user, request)
+        with transaction.atomic():
+            user = serializer.save()
+
+            # Queue verification email
+            send_verification_email(user, request)
 
         return Response({
             "success": True,
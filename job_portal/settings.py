@@ -57,6 +57,7 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'users.User'
 
 MIDDLEWARE = [
+    'apps.core.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -68,7 +69,7 @@ MIDDLEWARE = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.StatelessJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -76,11 +77,103 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'EXCEPTION_HANDLER': 'apps.core.exceptions.custom_exception_handler',
     'DEFAULT_PAGINATION_CLASS': 'apps.core.pagination.CustomPagination',
+    # orjson when installed, DRF's stdlib-json classes otherwise
+    'DEFAULT_RENDERER_CLASSES': (
+        'apps.core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'apps.core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+}
+
+# Seconds a cursor-pagination `totalSize` count is reused before COUNT(*) runs again
+PAGINATION_COUNT_CACHE_TIMEOUT = 60
+
+# Job list/detail response cache for applicants (apps/jobs/cache.py). Its listing version must be
+# shared by every worker (system check jobs.E001), e.g. the file backend or Redis/Memcached
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / 'tmp' / 'cache')),
+    },
+    # JWT revocation timestamps (apps/users/authentication.py); must be shared by every worker
+    'revocations': {
+        'BACKEND': os.getenv('REVOCATION_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('REVOCATION_CACHE_LOCATION', str(BASE_DIR / 'tmp' / 'revocations')),
+    },
 }
+JWT_REVOCATION_CACHE = 'revocations'
+JOB_CACHE_TIMEOUT = 60 * 5
+JOB_CACHE_LOCK_TIMEOUT = 10 # Seconds a single-flight lock is held at most
+JOB_CACHE_LOCK_WAIT = 2 # Seconds other requests wait for that result before computing it themselves
+JOB_FACET_LIMIT = 50 # Most frequent values returned per facet with the job list's `facets=`
+JOB_NEAR_DEFAULT_RADIUS_KM = 50 # Radius of the job list's `near=lat,lng` filter without `radius=`
+JOB_NEAR_MAX_RADIUS_KM = 1000
+
+# Job title/company suggestions (see apps/jobs/autocomplete.py). AUTOCOMPLETE_DIR is a directory
+# shared by the gunicorn workers (required, system check jobs.E002) so they see each other's job changes.
+AUTOCOMPLETE_DIR = os.getenv('AUTOCOMPLETE_DIR', str(BASE_DIR / 'tmp' / 'autocomplete'))
+AUTOCOMPLETE_LIMIT = 10 # Default number of suggestions (`limit=`, at most AUTOCOMPLETE_MAX_LIMIT)
+AUTOCOMPLETE_MAX_LIMIT = 50
+AUTOCOMPLETE_COMPACT_EVERY = 1000 # Logged changes before they are folded into a new snapshot
+
+# Job recommendations for applicants (see apps/jobs/recommendations.py, needs numpy). The gunicorn
+# workers memory-map one index in RECOMMENDATION_INDEX_DIR (required, system check jobs.E003), built
+# (before serving: requests answer 503 until then) and rebuilt periodically with `python manage.py build_recommendation_index`.
+RECOMMENDATION_INDEX_DIR = os.getenv('RECOMMENDATION_INDEX_DIR', str(BASE_DIR / 'tmp' / 'recommendations'))
+RECOMMENDATION_LIMIT = 20 # Default number of jobs (`limit=`, at most RECOMMENDATION_MAX_LIMIT)
+RECOMMENDATION_MAX_LIMIT = 100
+RECOMMENDATION_PROFILE_SIZE = 50 # Latest applications that make up an applicant's profile
+RECOMMENDATION_QUERY_TERMS = 64 # Most distinctive profile terms that are scored
+RECOMMENDATION_MAX_POSTINGS = 2_000_000 # (term, job) pairs scored per request at most: bounds latency at scale
+
+# List endpoints serialize .values() rows directly (see apps/core/mixins.py); False uses the ModelSerializers
+FAST_LIST_SERIALIZERS = True
+
+# Rows fetched per round trip when streaming application exports
+EXPORT_CHUNK_SIZE = 2000
+
+# Rows validated and upserted per query by the NDJSON job import (API and `import_jobs` command)
+JOB_IMPORT_BATCH_SIZE = 500
+
+# Open jobs closed per transaction by `close_expired_jobs`, and the pause between batches
+JOB_EXPIRY_BATCH_SIZE = 500
+JOB_EXPIRY_BATCH_PAUSE = 0.05
+
+# Most application ids accepted by one bulk status update request
+BULK_STATUS_UPDATE_MAX_IDS = 1000
+
+# Serve job browse/detail, a job's applications and my-applications with async views
+# (apps/core/routing.py). Only for ASGI servers: under WSGI each request would get its own
+# event loop. Django's async ORM still runs every query in a worker thread, so measure
+# with `benchmark_api --url` before turning it on
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', 'False') == 'True'
+
+# Seconds a stored `Idempotency-Key` response is replayed for
+IDEMPOTENCY_KEY_TTL = 60 * 60 * 24
+
+# Per-request timing (apps/core/middleware.py): an opt-in Server-Timing header with total, SQL and
+# render/serialize/upload time (off by default: it tells clients how the backend spends its time), and a structured warning on the 'apps.core.performance'
+# logger for requests slower than the threshold, listing their most expensive SQL
+PERFORMANCE_INSTRUMENTATION = os.getenv('PERFORMANCE_INSTRUMENTATION', 'True') == 'True'
+SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', 'False') == 'True'
+SLOW_REQUEST_THRESHOLD_MS = int(os.getenv('SLOW_REQUEST_THRESHOLD_MS', '500'))
+SLOW_REQUEST_TOP_QUERIES = 5
+
+# Prometheus metrics at /metrics (apps/core/metrics.py), recorded by the same middleware.
+# Under gunicorn set METRICS_DIR to a directory shared by the workers (on one host).
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+METRICS_DIR = os.getenv('METRICS_DIR') # None: each process reports only its own numbers
+METRICS_FLUSH_INTERVAL = 5 # Seconds between a worker's writes to METRICS_DIR
+METRICS_TOKEN = os.getenv('METRICS_TOKEN') # Bearer token required to scrape; /metrics is closed without it unless DEBUG
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
+    'TOKEN_REFRESH_SERIALIZER': 'apps.users.serializers.CustomTokenRefreshSerializer',
 }
 
 cloudinary.config(
@@ -90,6 +183,22 @@ cloudinary.config(
   secure = True
 )
 
+# Resume storage: 'apps.core.storage.CloudinaryResumeStorage' or the offline
+# 'apps.core.storage.LocalResumeStorage' (files under MEDIA_ROOT).
+RESUME_STORAGE = os.getenv('RESUME_STORAGE', 'apps.core.storage.CloudinaryResumeStorage')
+# When True the apply endpoint only stages the file; `upload_pending_resumes` uploads it.
+RESUME_UPLOAD_DEFERRED = os.getenv('RESUME_UPLOAD_DEFERRED', 'False') == 'True'
+RESUME_STAGING_DIR = BASE_DIR / 'tmp' / 'resumes'
+# Deferred uploads (see `python manage.py upload_pending_resumes`)
+RESUME_UPLOAD_MAX_ATTEMPTS = 5
+RESUME_UPLOAD_BACKOFF_SECONDS = 30
+CLOUDINARY_UPLOAD_CHUNK_SIZE = 6 * 1024 * 1024 # Cloudinary's minimum chunk is 5MB
+
+MEDIA_URL = '/media/'
+# Scheme and host prepended to MEDIA_URL in links stored outside a request (LocalResumeStorage)
+SITE_URL = os.getenv('SITE_URL', 'http://localhost:8000')
+MEDIA_ROOT = BASE_DIR / 'media'
+
 ROOT_URLCONF = 'job_portal.urls'
 
 TEMPLATES = [
@@ -165,3 +274,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 DEFAULT_FROM_EMAIL = 'no-reply@jobportal.com'
+
+# Outbox delivery (see `python manage.py send_queued_emails`)
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_BACKOFF_SECONDS = 30